@@ -0,0 +1,233 @@
+import json
+import os
+import sys
+import time
+from math import floor, sqrt
+from typing import Dict, List, Tuple
+
+from ezdxf.math import Matrix44, Vec3
+
+from dxf_reader import DxfReader
+
+PANEL_PREFIX = '______'  # блоки панелей: _______N и ______N
+GROUP_PREFIX = 'GROUP'
+SEARCH_RADIUS = 5.0  # мм: отверстия дальше друг от друга парой не считаются
+ALIGN_TOLERANCE = 0.5  # мм: допустимое смещение осей ответных отверстий
+ANGLE_TOLERANCE = 0.996  # косинус угла между осями (около 5 градусов)
+
+Cell = Tuple[int, int, int]
+
+
+def panel_placements(reader: DxfReader) -> List[Dict]:
+    """Панели с мировыми матрицами по всей иерархии вставок от modelspace.
+
+    Шкаф - ближайший предок панели, не являющийся блоком толщины; если его
+    нет, шкафом считается весь файл. Толщина берется из имени ближайшего
+    блока толщины.
+    """
+    doc = reader.doc
+    default_cabinet = os.path.splitext(os.path.basename(reader.filename))[0]
+    placements = []
+    stack = [(doc.modelspace(), Matrix44(), (), default_cabinet, reader.DEFAULT_THICKNESS)]
+    while stack:
+        layout, matrix, path, cabinet, thickness = stack.pop()
+        for e in layout:
+            if e.dxftype() != 'INSERT' or e.dxf.name in path or doc.blocks.get(e.dxf.name) is None:
+                continue
+            name = e.dxf.name
+            world = e.matrix44() @ matrix
+            if name.startswith(PANEL_PREFIX):
+                placements.append({'name': name, 'handle': e.dxf.handle, 'cabinet': cabinet,
+                                   'thickness': thickness, 'matrix': world})
+            elif reader.THICKNESS_PATTERN.search(name):
+                stack.append((doc.blocks[name], world, path + (name,), cabinet,
+                              reader._parse_block_thickness(name)))
+            elif not name.startswith(GROUP_PREFIX):
+                stack.append((doc.blocks[name], world, path + (name,), name, thickness))
+    return placements
+
+
+def world_holes(reader: DxfReader, placement: Dict) -> List[Dict]:
+    """Отверстия панели в мировых координатах.
+
+    Вход отверстия - центр окружности, ось - нормаль окружности через
+    вставку группы и панели, так что повернутые группы (торцевое
+    сверление) дают ось в плоскости панели. На пласти ось направлена к
+    средней плоскости панели, на торце - против нормали, внутрь панели.
+    Конец - вход плюс ось на глубину.
+    """
+    doc = reader.doc
+    holes = []
+    for entity in doc.blocks[placement['name']]:
+        if entity.dxftype() != 'INSERT' or not entity.dxf.name.startswith(GROUP_PREFIX):
+            continue
+        group = entity.matrix44()  # система панели
+        to_world = group @ placement['matrix']
+        for e in doc.blocks[entity.dxf.name]:
+            layer = reader.layers.classify(e.dxf.layer)
+            if e.dxftype() != 'CIRCLE' or layer['kind'] != 'hole':
+                continue
+            ocs = e.ocs()
+            local = group.transform(ocs.to_wcs(e.dxf.center))
+            normal = group.transform_direction(Vec3(e.dxf.extrusion)).normalize()  # в системе панели
+            if abs(normal.z) > 0.5:
+                # отверстие в пласти: ось к средней плоскости панели
+                inward = normal if (placement['thickness'] / 2 - local.z) * normal.z > 0 else -normal
+            else:
+                inward = -normal
+            depth = reader._hole_depth(layer, placement['thickness'])
+            entry = to_world.transform(ocs.to_wcs(e.dxf.center))
+            axis = placement['matrix'].transform_direction(inward).normalize()
+            holes.append({
+                'panel': placement['name'],
+                'handle': placement['handle'],
+                'diameter': round(e.dxf.radius * 2, 1),
+                'depth': depth,
+                'through': bool(layer.get('through')),
+                'entry': entry,
+                'end': entry + axis * depth,
+                'axis': axis
+            })
+    return holes
+
+
+class SpatialHash3D:
+    """Хеш точек по кубическим ячейкам: поиск соседей за O(1) на точку"""
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, List] = {}
+
+    def _cell(self, point: Vec3) -> Cell:
+        size = self.cell_size
+        return floor(point.x / size), floor(point.y / size), floor(point.z / size)
+
+    def insert(self, key, point: Vec3):
+        self.cells.setdefault(self._cell(point), []).append(key)
+
+    def near(self, point: Vec3):
+        """Ключи из ячейки точки и 26 соседних"""
+        cx, cy, cz = self._cell(point)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    yield from self.cells.get((cx + dx, cy + dy, cz + dz), ())
+
+
+def _axis_offset(a: Dict, b: Dict) -> float:
+    """Расстояние от входа b до оси a (смещение осей)"""
+    d = b['entry'] - a['entry']
+    along = d.dot(a['axis'])
+    return sqrt(max(d.magnitude_square - along * along, 0.0))
+
+
+def _gap(a: Dict, b: Dict) -> float:
+    """Наименьшее расстояние между концами отверстий a и b"""
+    return min((p - q).magnitude for p in (a['entry'], a['end']) for q in (b['entry'], b['end']))
+
+
+def match_holes(holes: List[Dict], search_radius: float = SEARCH_RADIUS,
+                tolerance: float = ALIGN_TOLERANCE) -> Tuple[List[Dict], List[int]]:
+    """Пары ответных отверстий разных панелей и отверстия без пары.
+
+    Оба конца каждого отверстия кладутся в трехмерный хеш с ячейкой
+    search_radius, кандидаты берутся только из соседних ячеек, поэтому
+    время почти линейно по числу отверстий. Пара - отверстия с
+    параллельными осями, концы которых сходятся ближе search_radius;
+    смещение осей больше tolerance - несоосность.
+    """
+    grid = SpatialHash3D(search_radius)
+    for i, hole in enumerate(holes):
+        grid.insert(i, hole['entry'])
+        grid.insert(i, hole['end'])
+
+    candidates = []
+    for i, hole in enumerate(holes):
+        seen = set()
+        for point in (hole['entry'], hole['end']):
+            for j in grid.near(point):
+                if j <= i or j in seen or holes[j]['handle'] == hole['handle']:
+                    continue
+                seen.add(j)
+                other = holes[j]
+                if abs(hole['axis'].dot(other['axis'])) < ANGLE_TOLERANCE:
+                    continue
+                gap = _gap(hole, other)
+                offset = _axis_offset(hole, other)
+                if gap <= search_radius and offset <= search_radius:
+                    candidates.append((offset, gap, i, j))
+
+    # у отверстия не больше одной пары - сначала самые соосные
+    joints, paired = [], set()
+    for offset, gap, i, j in sorted(candidates):
+        if i in paired or j in paired:
+            continue
+        paired.update((i, j))
+        a, b = holes[i], holes[j]
+        joints.append({
+            'panels': (a['panel'], b['panel']),
+            'holes': (i, j),
+            'diameters': (a['diameter'], b['diameter']),
+            'position': tuple(round(v, 2) for v in a['entry']),
+            'offset': round(offset, 3),
+            'status': 'ok' if offset <= tolerance else 'misaligned'
+        })
+    unmatched = [i for i in range(len(holes)) if i not in paired]
+    return joints, unmatched
+
+
+def joint_report(reader: DxfReader, search_radius: float = SEARCH_RADIUS,
+                 tolerance: float = ALIGN_TOLERANCE) -> List[Dict]:
+    """Отчет о соединениях по каждому шкафу файла"""
+    by_cabinet: Dict[str, List[Dict]] = {}
+    for placement in panel_placements(reader):
+        by_cabinet.setdefault(placement['cabinet'], []).append(placement)
+
+    reports = []
+    for cabinet, placements in sorted(by_cabinet.items()):
+        holes = [hole for placement in placements for hole in world_holes(reader, placement)]
+        joints, unmatched = match_holes(holes, search_radius, tolerance)
+        reports.append({
+            'cabinet': cabinet,
+            'panels': len(placements),
+            'holes': len(holes),
+            'joints': joints,
+            'misaligned': sum(joint['status'] == 'misaligned' for joint in joints),
+            'unmatched': [
+                {'panel': holes[i]['panel'], 'diameter': holes[i]['diameter'],
+                 'position': tuple(round(v, 2) for v in holes[i]['entry'])}
+                for i in unmatched
+            ]
+        })
+    return reports
+
+
+def format_report(reports: List[Dict]) -> str:
+    lines = []
+    for report in reports:
+        lines.append(f"Шкаф {report['cabinet']}: панелей {report['panels']}, отверстий {report['holes']}, "
+                     f"соединений {len(report['joints'])}, несоосных {report['misaligned']}, "
+                     f"без пары {len(report['unmatched'])}")
+        for joint in report['joints']:
+            if joint['status'] == 'misaligned':
+                lines.append(f"  несоосность {joint['offset']} мм: {joint['panels'][0]} / {joint['panels'][1]} "
+                             f"в {joint['position']}")
+    return '\n'.join(lines)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python assembly.py file.dxf [--json]")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    reports = joint_report(DxfReader(sys.argv[1]))
+    if '--json' in sys.argv[2:]:
+        print(json.dumps(reports, ensure_ascii=False))
+    else:
+        print(format_report(reports))
+        print(f"{time.perf_counter() - started:.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MAX_FILE_SIZE = 200 * 1024 * 1024  # байт
+MAX_ENTITIES = 2_000_000  # записей с групповым кодом 0 во всем файле
+MAX_INSERT_DEPTH = 8  # вложенность блоков через INSERT от modelspace
+TIMEOUT = 60.0  # секунд на файл
+MAX_MEMORY_MB = 2048  # память процесса на файл, МБ
+
+CHECK_EVERY = 65536  # строк DXF между проверками времени при предпросмотре
+BINARY_SENTINEL = b'AutoCAD Binary DXF'
+
+
+class BudgetExceeded(Exception):
+    """Файл вышел за один из лимитов; kind - какой именно"""
+
+    def __init__(self, kind: str, limit, value=None, message: str = ''):
+        self.kind = kind
+        self.limit = limit
+        self.value = value
+        super().__init__(message or f"{kind}: {value} превышает лимит {limit}")
+
+    def to_dict(self) -> Dict:
+        return {'kind': self.kind, 'limit': self.limit, 'value': self.value, 'message': str(self)}
+
+
+def current_rss_mb() -> float:
+    """Текущий резидентный размер процесса в МБ (0 - неизвестен)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # ru_maxrss - пиковое значение, в КБ на Linux и в байтах на macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return 0.0
+
+
+class ResourceBudget:
+    """Лимиты на обработку одного файла.
+
+    Проверки кооперативные: размер и число сущностей - до разбора ezdxf
+    (быстрый проход по парам тегов), вложенность INSERT - сразу после
+    разбора, время и память - между панелями в DxfReader.get_panels_data
+    и между шагами соединения подписей. max_memory_mb в этих проверках
+    сравнивается с резидентной памятью (RSS). Жесткие лимиты для зависшего
+    кода дает run_guarded в отдельном процессе; там тот же max_memory_mb
+    ограничивает сегмент данных (RLIMIT_DATA, куча и анонимные mmap), а не
+    RSS. None в любом лимите отключает проверку.
+    """
+
+    def __init__(self, max_file_size: int = MAX_FILE_SIZE, max_entities: int = MAX_ENTITIES,
+                 max_insert_depth: int = MAX_INSERT_DEPTH, timeout: float = TIMEOUT,
+                 max_memory_mb: float = MAX_MEMORY_MB):
+        self.max_file_size = max_file_size
+        self.max_entities = max_entities
+        self.max_insert_depth = max_insert_depth
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.deadline = None
+
+    def start(self):
+        """Запускает отсчет времени на файл"""
+        self.deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+
+    def check(self):
+        """Проверка времени и памяти; вызывается между шагами обработки"""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded('timeout', self.timeout, message=f"обработка дольше {self.timeout} с")
+        if self.max_memory_mb is not None:
+            rss = current_rss_mb()
+            if rss > self.max_memory_mb:
+                raise BudgetExceeded('rss', self.max_memory_mb, round(rss, 1))
+
+    def check_file(self, path: str):
+        """Размер файла и число сущностей до полного разбора"""
+        size = os.path.getsize(path)
+        if self.max_file_size is not None and size > self.max_file_size:
+            raise BudgetExceeded('file_size', self.max_file_size, size)
+        if self.max_entities is None:
+            return
+
+        with open(path, 'rb') as f:
+            binary = f.read(len(BINARY_SENTINEL)) == BINARY_SENTINEL
+            f.seek(0)
+            count = 0
+            if binary:
+                from dxf_binary import binary_tags
+                codes = (tag.code for tag in binary_tags(path))
+                entity = 0
+            else:
+                # DXF - пары строк (групповой код, значение); каждая запись начинается с кода 0
+                codes = (code.strip() for code, _ in zip(f, f))
+                entity = b'0'
+            for i, code in enumerate(codes):
+                if code == entity:
+                    count += 1
+                    if count > self.max_entities:
+                        raise BudgetExceeded('entities', self.max_entities, count,
+                                             f"больше {self.max_entities} сущностей")
+                if i % CHECK_EVERY == 0:
+                    self.check()
+
+    def check_document(self, doc):
+        """Глубина вложенности INSERT начиная с modelspace; цикл блоков - тоже ошибка"""
+        if self.max_insert_depth is None:
+            return
+        depths = {}
+
+        def depth(block_name, path):
+            if block_name in path:
+                raise BudgetExceeded('insert_depth', self.max_insert_depth,
+                                     message=f"циклическая ссылка на блок {block_name}")
+            if block_name not in depths:
+                if len(path) > self.max_insert_depth:
+                    raise BudgetExceeded('insert_depth', self.max_insert_depth, len(path))
+                names = {e.dxf.name for e in doc.blocks[block_name] if e.dxftype() == 'INSERT'}
+                depths[block_name] = 1 + max((depth(n, path | {block_name}) for n in names), default=0)
+            return depths[block_name]
+
+        names = {e.dxf.name for e in doc.modelspace() if e.dxftype() == 'INSERT'}
+        deepest = max((depth(name, frozenset()) for name in names), default=0)
+        if deepest > self.max_insert_depth:
+            raise BudgetExceeded('insert_depth', self.max_insert_depth, deepest)
+
+
+def convert_with_budget(path: str, budget: ResourceBudget, fields=None) -> Dict:
+    """Извлекает панели с лимитами; ошибки возвращаются как структура, а не исключение"""
+    from dxf_reader import DxfReader
+
+    started = time.monotonic()
+    try:
+        panels = DxfReader(path, budget=budget).get_panels_data(fields)
+    except BudgetExceeded as e:
+        return {'path': path, 'ok': False, 'error': e.to_dict(),
+                'seconds': round(time.monotonic() - started, 3)}
+    except Exception as e:
+        return {'path': path, 'ok': False,
+                'error': {'kind': 'error', 'message': f"{type(e).__name__}: {e}"},
+                'seconds': round(time.monotonic() - started, 3)}
+    return {'path': path, 'ok': True, 'panels': panels, 'seconds': round(time.monotonic() - started, 3)}
+
+
+def _guarded_child(conn, func, args, max_memory_mb):
+    if resource is not None and max_memory_mb is not None:
+        limit = int(max_memory_mb * 1024 * 1024)
+        try:
+            resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+        except (ValueError, OSError):
+            pass
+    try:
+        conn.send(('ok', func(*args)))
+    except BudgetExceeded as e:
+        conn.send(('budget', e.to_dict()))
+    except MemoryError:
+        conn.send(('budget', BudgetExceeded('rss', max_memory_mb, message="нехватка памяти").to_dict()))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_guarded(func: Callable, args: tuple, budget: ResourceBudget, grace: float = 5.0):
+    """Выполняет func(*args) в отдельном процессе с жесткими лимитами.
+
+    Память ограничивается RLIMIT_DATA в дочернем процессе, время - ожиданием
+    результата timeout + grace секунд, после чего процесс завершается.
+    Нарушение лимита поднимает BudgetExceeded в вызывающем процессе, падение
+    процесса без ответа (сигнал, аварийный выход) - RuntimeError с кодом
+    завершения.
+    """
+    import multiprocessing
+
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_guarded_child, args=(child, func, args, budget.max_memory_mb))
+    process.start()
+    child.close()
+    wait = budget.timeout + grace if budget.timeout is not None else None
+    try:
+        if not parent.poll(wait):
+            process.terminate()
+            raise BudgetExceeded('timeout', budget.timeout, message=f"процесс не ответил за {wait} с")
+        try:
+            status, payload = parent.recv()
+        except EOFError:
+            # ответа нет - процесс упал; MemoryError внутри него приходит как 'budget'
+            process.join(1.0)
+            status, payload = 'crash', f"процесс обработки завершился аварийно, код {process.exitcode}"
+    finally:
+        process.join(1.0)
+        if process.is_alive():
+            process.kill()
+        parent.close()
+
+    if status == 'ok':
+        return payload
+    if status == 'budget':
+        raise BudgetExceeded(payload['kind'], payload['limit'], payload['value'], payload['message'])
+    raise RuntimeError(payload)
+
+
+OPTIONS = {'--max-size': ('max_file_size', int), '--max-entities': ('max_entities', int),
+           '--max-depth': ('max_insert_depth', int), '--timeout': ('timeout', float),
+           '--max-memory': ('max_memory_mb', float)}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python budget.py file.dxf [--max-size байт] [--max-entities N] "
+              "[--max-depth N] [--timeout с] [--max-memory МБ]")
+        sys.exit(1)
+
+    options = {}
+    args = sys.argv[2:]
+    for option, value in zip(args[::2], args[1::2]):
+        name, kind = OPTIONS[option]
+        options[name] = kind(value)
+
+    result = convert_with_budget(sys.argv[1], ResourceBudget(**options), fields=['size'])
+    if result['ok']:
+        result['panels'] = len(result['panels'])
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
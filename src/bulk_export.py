@@ -0,0 +1,259 @@
+import os
+import sys
+import zipfile
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet недоступен - используем запасной формат .npz
+    pa = None
+    pq = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from dxf_reader import DxfReader
+
+# Схемы колоночных таблиц: (имя колонки, тип). panel_id - внешний ключ на panels
+TABLES: Dict[str, List[Tuple[str, str]]] = {
+    'panels': [
+        ('panel_id', 'int64'), ('source', 'str'), ('name', 'str'),
+        ('width', 'float64'), ('height', 'float64'), ('thickness', 'float64'),
+        ('origin_x', 'float64'), ('origin_y', 'float64')
+    ],
+    'holes': [
+        ('panel_id', 'int64'), ('x', 'float64'), ('y', 'float64'),
+        ('diameter', 'float64'), ('depth', 'float64'), ('through', 'bool')
+    ],
+    'grooves': [
+        ('panel_id', 'int64'), ('start_x', 'float64'), ('start_y', 'float64'),
+        ('end_x', 'float64'), ('end_y', 'float64'),
+        ('width', 'float64'), ('depth', 'float64')
+    ],
+    'edges': [
+        ('panel_id', 'int64'), ('side', 'str'), ('thickness', 'float64'),
+        ('start_x', 'float64'), ('start_y', 'float64'),
+        ('end_x', 'float64'), ('end_y', 'float64')
+    ],
+    'cutouts': [
+        ('panel_id', 'int64'), ('type', 'str'), ('edge', 'str'),
+        ('x', 'float64'), ('y', 'float64'),
+        ('size_x', 'float64'), ('size_y', 'float64'), ('radius', 'float64')
+    ],
+}
+
+NAN = float('nan')
+
+
+def _point(value) -> Tuple[float, float]:
+    """Приводит точку (кортеж или {'x', 'y'}) к кортежу"""
+    if value is None:
+        return NAN, NAN
+    if isinstance(value, dict):
+        return float(value['x']), float(value['y'])
+    return float(value[0]), float(value[1])
+
+
+def _field(item, name, default=None):
+    """Читает поле из словаря или атрибут объекта (Hole, Groove)"""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+def _depth(value, thickness: float) -> Tuple[float, bool]:
+    """Глубина отверстия и признак сквозного: глубина не меньше толщины панели (как в hole_layer)"""
+    depth = float(value)
+    return depth, depth >= thickness
+
+
+def panel_rows(panel_id: int, panel: Dict, source: str = '') -> Dict[str, List[tuple]]:
+    """Раскладывает данные панели из get_panels_data по строкам таблиц"""
+    size = panel.get('size', {})
+    thickness = float(size.get('thickness', NAN))
+    origin_x, origin_y = _point(panel.get('origin_point'))
+    rows = {name: [] for name in TABLES}
+
+    rows['panels'].append((
+        panel_id, source, panel.get('name', ''),
+        float(size.get('width', NAN)), float(size.get('height', NAN)),
+        thickness, origin_x, origin_y
+    ))
+
+    for hole in panel.get('holes', []):
+        x, y = _point(_field(hole, 'center'))
+        depth, through = _depth(_field(hole, 'depth', 0.0), thickness)
+        rows['holes'].append((
+            panel_id, x, y, float(_field(hole, 'diameter', NAN)), depth, through
+        ))
+
+    for groove in panel.get('grooves', []):
+        start_x, start_y = _point(_field(groove, 'start'))
+        end_x, end_y = _point(_field(groove, 'end'))
+        rows['grooves'].append((
+            panel_id, start_x, start_y, end_x, end_y,
+            float(_field(groove, 'width', NAN)), float(_field(groove, 'depth', NAN))
+        ))
+
+    for edge in panel.get('edges', []):
+        coordinates = edge.get('coordinates', {})
+        start_x, start_y = _point(coordinates.get('start', coordinates.get('base1')))
+        end_x, end_y = _point(coordinates.get('end', coordinates.get('base2')))
+        rows['edges'].append((
+            panel_id, edge.get('side', ''), float(edge.get('thickness', NAN)),
+            start_x, start_y, end_x, end_y
+        ))
+
+    for cutout in panel.get('cutouts', []):
+        if 'size' in cutout:
+            size_x, size_y = _point(cutout['size'])
+        else:
+            size_x, size_y = cutout.get('size_x', NAN), cutout.get('size_y', NAN)
+        x, y = _point(cutout.get('position'))
+        radius = cutout.get('radius')
+        rows['cutouts'].append((
+            panel_id, cutout.get('type', ''), cutout.get('edge', ''),
+            x, y, float(size_x), float(size_y),
+            NAN if radius is None else float(radius)
+        ))
+
+    return rows
+
+
+class _ParquetSink:
+    """Пишет таблицу в Parquet группами строк"""
+
+    def __init__(self, path: str, columns: List[Tuple[str, str]]):
+        types = {'int64': pa.int64(), 'float64': pa.float64(),
+                 'bool': pa.bool_(), 'str': pa.string()}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path + '.parquet', self.schema)
+
+    def write(self, columns: Dict[str, list]):
+        self.writer.write_table(pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class _NpzSink:
+    """Пишет таблицу в .npz: каждая группа строк - отдельный массив на колонку"""
+
+    def __init__(self, path: str, columns: List[Tuple[str, str]]):
+        self.columns = columns
+        self.archive = zipfile.ZipFile(path + '.npz', 'w', zipfile.ZIP_STORED, allowZip64=True)
+        self.chunk = 0
+
+    def write(self, columns: Dict[str, list]):
+        for name, kind in self.columns:
+            values = columns[name]
+            array = np.array(values, dtype=kind if kind != 'str' else str)
+            with self.archive.open(f"{name}.{self.chunk:06d}.npy", 'w', force_zip64=True) as f:
+                np.lib.format.write_array(f, array, allow_pickle=False)
+        self.chunk += 1
+
+    def close(self):
+        self.archive.close()
+
+
+def read_npz_table(path: str) -> Dict[str, 'np.ndarray']:
+    """Загружает таблицу из .npz, склеивая группы строк по колонкам"""
+    chunks: Dict[str, list] = {}
+    with np.load(path, allow_pickle=False) as data:
+        for key in sorted(data.files):
+            column = key.rsplit('.', 1)[0]
+            chunks.setdefault(column, []).append(data[key])
+    return {column: np.concatenate(parts) for column, parts in chunks.items()}
+
+
+class BulkExporter:
+    """Колоночный экспорт панелей с внешними ключами panel_id.
+
+    Строки копятся в буфере не длиннее row_group_size и сбрасываются
+    группами, поэтому память не растет с количеством панелей.
+    """
+
+    def __init__(self, out_dir: str, fmt: str = 'auto', row_group_size: int = 65536):
+        if fmt == 'auto':
+            fmt = 'parquet' if pa is not None else 'npz'
+        if fmt == 'parquet' and pa is None:
+            raise ImportError("Для формата parquet нужен пакет pyarrow")
+        if fmt == 'npz' and np is None:
+            raise ImportError("Для формата npz нужен пакет numpy")
+        if fmt not in ('parquet', 'npz'):
+            raise ValueError(f"Неизвестный формат: {fmt}")
+
+        os.makedirs(out_dir, exist_ok=True)
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.next_panel_id = 0
+        sink_class = _ParquetSink if fmt == 'parquet' else _NpzSink
+        self.sinks = {
+            name: sink_class(os.path.join(out_dir, name), columns)
+            for name, columns in TABLES.items()
+        }
+        self.buffers = {name: [] for name in TABLES}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_panels(self, panels: Iterable[Dict], source: str = '') -> int:
+        """Добавляет панели одного файла, возвращает количество"""
+        count = 0
+        for panel in panels:
+            rows = panel_rows(self.next_panel_id, panel, source)
+            self.next_panel_id += 1
+            count += 1
+            for name, table_rows in rows.items():
+                buffer = self.buffers[name]
+                buffer.extend(table_rows)
+                if len(buffer) >= self.row_group_size:
+                    self._flush(name)
+        return count
+
+    def _flush(self, name: str):
+        """Сбрасывает буфер таблицы одной группой строк"""
+        buffer = self.buffers[name]
+        if not buffer:
+            return
+        columns = TABLES[name]
+        values = list(zip(*buffer))
+        self.sinks[name].write({
+            column: list(values[i]) for i, (column, _) in enumerate(columns)
+        })
+        self.buffers[name] = []
+
+    def close(self):
+        for name in TABLES:
+            self._flush(name)
+            self.sinks[name].close()
+
+
+def export_files(paths: Iterable[str], out_dir: str, fmt: str = 'auto',
+                 row_group_size: int = 65536) -> int:
+    """Конвертирует DXF файлы и выгружает все панели в колоночные таблицы"""
+    total = 0
+    with BulkExporter(out_dir, fmt, row_group_size) as exporter:
+        for path in paths:
+            reader = DxfReader(path)
+            total += exporter.add_panels(reader.get_panels_data(), source=path)
+    return total
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Использование: python bulk_export.py <каталог> file1.dxf [file2.dxf ...]")
+        sys.exit(1)
+
+    total = export_files(sys.argv[2:], sys.argv[1])
+    print(f"Выгружено панелей: {total}")
+
+
+if __name__ == "__main__":
+    main()
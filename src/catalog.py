@@ -0,0 +1,250 @@
+import hashlib
+import sqlite3
+import sys
+from typing import Dict, Iterable, List
+
+from bulk_export import TABLES, panel_rows
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    panel_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS panels (
+    panel_id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    name TEXT, width REAL, height REAL, thickness REAL, origin_x REAL, origin_y REAL
+);
+CREATE TABLE IF NOT EXISTS holes (
+    panel_id INTEGER NOT NULL REFERENCES panels(panel_id) ON DELETE CASCADE,
+    x REAL, y REAL, diameter REAL, depth REAL, through INTEGER
+);
+CREATE TABLE IF NOT EXISTS grooves (
+    panel_id INTEGER NOT NULL REFERENCES panels(panel_id) ON DELETE CASCADE,
+    start_x REAL, start_y REAL, end_x REAL, end_y REAL, width REAL, depth REAL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    panel_id INTEGER NOT NULL REFERENCES panels(panel_id) ON DELETE CASCADE,
+    side TEXT, thickness REAL, start_x REAL, start_y REAL, end_x REAL, end_y REAL
+);
+CREATE TABLE IF NOT EXISTS cutouts (
+    panel_id INTEGER NOT NULL REFERENCES panels(panel_id) ON DELETE CASCADE,
+    type TEXT, edge TEXT, x REAL, y REAL, size_x REAL, size_y REAL, radius REAL
+);
+CREATE INDEX IF NOT EXISTS files_hash ON files(content_hash);
+CREATE INDEX IF NOT EXISTS panels_file ON panels(file_id);
+CREATE INDEX IF NOT EXISTS panels_thickness ON panels(thickness);
+CREATE INDEX IF NOT EXISTS holes_panel ON holes(panel_id);
+CREATE INDEX IF NOT EXISTS holes_diameter ON holes(diameter, panel_id);
+CREATE INDEX IF NOT EXISTS grooves_panel ON grooves(panel_id);
+CREATE INDEX IF NOT EXISTS edges_panel ON edges(panel_id);
+CREATE INDEX IF NOT EXISTS edges_thickness ON edges(thickness, panel_id);
+CREATE INDEX IF NOT EXISTS cutouts_panel ON cutouts(panel_id);
+CREATE INDEX IF NOT EXISTS cutouts_type ON cutouts(type, panel_id);
+"""
+
+CHILD_TABLES = ('holes', 'grooves', 'edges', 'cutouts')
+SCHEMA_VERSION = 2  # 2: файлы уникальны по пути, хеш содержимого не уникален
+
+
+def file_hash(path: str) -> str:
+    """Хеш содержимого файла - ключ для повторной загрузки"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PanelCatalog:
+    """Каталог панелей в SQLite.
+
+    Таблицы повторяют схемы bulk_export.TABLES, только панели ссылаются на
+    files вместо строки source. Файл - это путь: одинаковое содержимое под
+    разными путями (один DXF в двух заказах) дает две записи. Загрузка идет
+    пачками executemany в одной транзакции; неизменившийся файл не
+    перечитывается, копия уже известного содержимого копирует строки без
+    разбора DXF, а измененный файл по тому же пути заменяет свои старые
+    строки. Каталог - кеш разбора DXF: базу старой схемы он пересоздает.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            with self.conn:
+                for name in CHILD_TABLES + ('panels', 'files'):
+                    self.conn.execute(f"DROP TABLE IF EXISTS {name}")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.inserts = {
+            name: f"INSERT INTO {name} ({', '.join(col for col, _ in columns)}) "
+                  f"VALUES ({', '.join('?' * len(columns))})"
+            for name, columns in TABLES.items() if name in CHILD_TABLES
+        }
+
+    def has_file(self, path: str, content_hash: str) -> bool:
+        """Файл с этим путем уже загружен именно с этим содержимым"""
+        return self.conn.execute(
+            "SELECT 1 FROM files WHERE path = ? AND content_hash = ?", (path, content_hash)
+        ).fetchone() is not None
+
+    def _same_content(self, content_hash: str):
+        """file_id любого загруженного файла с таким же содержимым или None"""
+        row = self.conn.execute(
+            "SELECT file_id FROM files WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _add_file(self, path: str, content_hash: str) -> int:
+        # по этому пути раньше лежала другая версия - ее строки удаляются каскадом
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return self.conn.execute(
+            "INSERT INTO files (path, content_hash) VALUES (?, ?)", (path, content_hash)
+        ).lastrowid
+
+    def add_panels(self, panels: Iterable[Dict], path: str, content_hash: str) -> int:
+        """Загружает панели одного файла; возвращает число панелей или None, если файл не изменился"""
+        with self.conn:
+            if self.has_file(path, content_hash):
+                return None
+            file_id = self._add_file(path, content_hash)
+
+            next_id = self.conn.execute("SELECT COALESCE(MAX(panel_id), 0) + 1 FROM panels").fetchone()[0]
+            batch = {name: [] for name in TABLES}
+            count = 0
+            for count, panel in enumerate(panels, 1):
+                rows = panel_rows(next_id, panel)
+                for row in rows['panels']:
+                    # (panel_id, source, name, ...) -> (panel_id, file_id, name, ...)
+                    batch['panels'].append((row[0], file_id) + row[2:])
+                for name in CHILD_TABLES:
+                    batch[name].extend(rows[name])
+                next_id += 1
+
+            self.conn.executemany(
+                "INSERT INTO panels (panel_id, file_id, name, width, height, thickness, origin_x, origin_y) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch['panels']
+            )
+            for name in CHILD_TABLES:
+                self.conn.executemany(self.inserts[name], batch[name])
+            self.conn.execute("UPDATE files SET panel_count = ? WHERE file_id = ?", (count, file_id))
+        return count
+
+    def copy_panels(self, source_id: int, path: str, content_hash: str) -> int:
+        """Копирует строки уже загруженного файла с тем же содержимым под новым путем.
+
+        Новые panel_id выдаются через временную таблицу соответствия, и
+        каждая таблица копируется одним INSERT ... SELECT, без запросов на
+        каждую панель.
+        """
+        with self.conn:
+            file_id = self._add_file(path, content_hash)
+            next_id = self.conn.execute("SELECT COALESCE(MAX(panel_id), 0) + 1 FROM panels").fetchone()[0]
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS panel_map (old_id INTEGER PRIMARY KEY, new_id INTEGER)")
+            self.conn.execute("DELETE FROM panel_map")
+            count = self.conn.execute(
+                "INSERT INTO panel_map (old_id, new_id) "
+                "SELECT panel_id, ? + ROW_NUMBER() OVER (ORDER BY panel_id) - 1 FROM panels WHERE file_id = ?",
+                (next_id, source_id)
+            ).rowcount
+            self.conn.execute(
+                "INSERT INTO panels (panel_id, file_id, name, width, height, thickness, origin_x, origin_y) "
+                "SELECT m.new_id, ?, p.name, p.width, p.height, p.thickness, p.origin_x, p.origin_y "
+                "FROM panels p JOIN panel_map m ON m.old_id = p.panel_id ORDER BY m.new_id", (file_id,)
+            )
+            for name in CHILD_TABLES:
+                columns = ', '.join(col for col, _ in TABLES[name][1:])
+                self.conn.execute(
+                    f"INSERT INTO {name} (panel_id, {columns}) SELECT m.new_id, {columns} "
+                    f"FROM {name} t JOIN panel_map m ON m.old_id = t.panel_id ORDER BY t.rowid"
+                )
+            self.conn.execute("UPDATE files SET panel_count = ? WHERE file_id = ?", (count, file_id))
+        return count
+
+    def load_file(self, path: str) -> int:
+        """Читает DXF и загружает его панели, если файл новый или изменился"""
+        from dxf_reader import DxfReader
+
+        content_hash = file_hash(path)
+        if self.has_file(path, content_hash):
+            return None
+        source_id = self._same_content(content_hash)
+        if source_id is not None:
+            return self.copy_panels(source_id, path, content_hash)
+        return self.add_panels(DxfReader(path).get_panels_data(), path, content_hash)
+
+    def find_panels(self, thickness: float = None, hole_diameter: float = None,
+                    edge_thickness: float = None, cutout_type: str = None) -> List[tuple]:
+        """Панели по условиям: (путь, имя, ширина, высота, толщина)"""
+        where, params = [], []
+        if thickness is not None:
+            where.append("p.thickness = ?")
+            params.append(thickness)
+        for table, column, value in (('holes', 'diameter', hole_diameter),
+                                     ('edges', 'thickness', edge_thickness),
+                                     ('cutouts', 'type', cutout_type)):
+            if value is not None:
+                where.append(f"EXISTS (SELECT 1 FROM {table} t WHERE t.{column} = ? AND t.panel_id = p.panel_id)")
+                params.append(value)
+        sql = ("SELECT f.path, p.name, p.width, p.height, p.thickness "
+               "FROM panels p JOIN files f ON f.file_id = p.file_id")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.conn.execute(sql + " ORDER BY f.path, p.name", params).fetchall()
+
+    def query(self, sql: str, params=()) -> List[tuple]:
+        return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+USAGE = """Использование:
+  python catalog.py catalog.db load file1.dxf [file2.dxf ...]
+  python catalog.py catalog.db find [--thickness 16] [--hole 35] [--edge 0.8] [--cutout L]
+  python catalog.py catalog.db sql "SELECT ..."
+"""
+
+FIND_OPTIONS = {'--thickness': ('thickness', float), '--hole': ('hole_diameter', float),
+                '--edge': ('edge_thickness', float), '--cutout': ('cutout_type', str)}
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('load', 'find', 'sql'):
+        print(USAGE)
+        sys.exit(1)
+
+    with PanelCatalog(sys.argv[1]) as catalog:
+        command, args = sys.argv[2], sys.argv[3:]
+        if command == 'load':
+            for path in args:
+                count = catalog.load_file(path)
+                print(f"{path}: {'без изменений' if count is None else f'панелей {count}'}")
+        elif command == 'find':
+            filters = {}
+            for option, value in zip(args[::2], args[1::2]):
+                if option not in FIND_OPTIONS:
+                    print(USAGE)
+                    sys.exit(1)
+                name, kind = FIND_OPTIONS[option]
+                filters[name] = kind(value)
+            for path, name, width, height, thickness in catalog.find_panels(**filters):
+                print(f"{path}\t{name}\t{width}x{height}x{thickness}")
+        else:
+            for row in catalog.query(' '.join(args)):
+                print('\t'.join(str(value) for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import json
+import sys
+import time
+from typing import Dict, Iterator, Tuple
+
+from layer_rules import LayerRegistry
+
+BINARY_SENTINEL = b'AutoCAD Binary DXF'
+MODEL_SPACE = '*Model_Space'
+SUB_ENTITIES = {'VERTEX', 'SEQEND', 'ATTRIB'}  # части POLYLINE/INSERT, не отдельные сущности
+PANEL_PREFIX = '______'  # блоки панелей: _______N и ______N
+GROUP_PREFIX = 'GROUP'
+
+
+class Census:
+    """Счетчики сущностей по блокам, слоям и типам и граф ссылок INSERT.
+
+    Заполняется одним проходом по сущностям файла через add(); блок
+    '*Model_Space' - сущности modelspace.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_type: Dict[str, int] = {}
+        self.by_layer: Dict[str, int] = {}
+        self.blocks: Dict[str, Dict[str, int]] = {}  # блок -> тип -> количество
+        self.inserts: Dict[str, Dict[str, int]] = {}  # блок -> вставленный блок -> количество
+
+    def add(self, block: str, dxftype: str, layer: str, insert_name: str = None):
+        self.total += 1
+        self.by_type[dxftype] = self.by_type.get(dxftype, 0) + 1
+        self.by_layer[layer] = self.by_layer.get(layer, 0) + 1
+        counts = self.blocks.setdefault(block, {})
+        counts[dxftype] = counts.get(dxftype, 0) + 1
+        if insert_name is not None:
+            refs = self.inserts.setdefault(block, {})
+            refs[insert_name] = refs.get(insert_name, 0) + 1
+
+    def depths(self) -> Dict[str, int]:
+        """Глубина вложенности каждого блока, достижимого из modelspace (modelspace = 0)"""
+        depths = {MODEL_SPACE: 0}
+        level = [MODEL_SPACE]
+        while level:
+            following = []
+            for block in level:
+                for child in self.inserts.get(block, {}):
+                    # в цикле ссылок блок получает первую найденную глубину
+                    if child not in depths:
+                        depths[child] = depths[block] + 1
+                        following.append(child)
+            level = following
+        return depths
+
+    def panels(self) -> list:
+        """Иерархия панелей: блок толщины -> панель -> число групп и их состав"""
+        panels = []
+        for parent in sorted(self.inserts.get(MODEL_SPACE, {})):
+            for name in sorted(self.inserts.get(parent, {})):
+                if not name.startswith(PANEL_PREFIX):
+                    continue
+                groups = {g: n for g, n in self.inserts.get(name, {}).items() if g.startswith(GROUP_PREFIX)}
+                group_types: Dict[str, int] = {}
+                for group in groups:
+                    for dxftype, count in self.blocks.get(group, {}).items():
+                        group_types[dxftype] = group_types.get(dxftype, 0) + count
+                panels.append({
+                    'name': name,
+                    'parent': parent,
+                    'groups': sum(groups.values()),
+                    'entities': self.blocks.get(name, {}),
+                    'group_entities': group_types
+                })
+        return panels
+
+    def to_dict(self) -> Dict:
+        depths = self.depths()
+        return {
+            'entities': self.total,
+            'blocks': len(self.blocks),
+            'depth': max(depths.values()),
+            'by_type': dict(sorted(self.by_type.items(), key=lambda item: -item[1])),
+            'by_layer': dict(sorted(self.by_layer.items(), key=lambda item: -item[1])),
+            'inserts': self.inserts,
+            'panels': self.panels(),
+            'unreferenced_blocks': sorted(
+                name for name in self.blocks if name not in depths and not name.startswith('*')
+            )
+        }
+
+
+def _tag_pairs(path: str) -> Iterator[Tuple[bytes, bytes]]:
+    """Пары (групповой код, значение) DXF без разбора; бинарные теги приводятся к тому же виду"""
+    with open(path, 'rb') as f:
+        binary = f.read(len(BINARY_SENTINEL)) == BINARY_SENTINEL
+        if not binary:
+            f.seek(0)
+            for code, value in zip(f, f):
+                yield code.strip(), value.strip()
+            return
+    from dxf_binary import binary_tags
+
+    for tag in binary_tags(path):
+        value = tag.value.encode('utf-8') if isinstance(tag.value, str) else str(tag.value).encode()
+        yield str(tag.code).encode(), value
+
+
+def _decode(value: bytes) -> str:
+    try:
+        return value.decode('utf-8')
+    except UnicodeDecodeError:
+        return value.decode('cp1251', errors='replace')  # старые русские экспорты
+
+
+def census_tags(path: str) -> Census:
+    """Перепись текстового или бинарного DXF за один проход по тегам, без построения документа"""
+    census = Census()
+    section = None
+    block = None
+    entity = None  # [тип, слой, имя вставляемого блока, сущность листа]
+    expect_section_name = expect_block_name = False
+
+    def finish():
+        if entity is not None and entity[0] not in SUB_ENTITIES and not entity[3]:
+            owner = block if section == b'BLOCKS' else MODEL_SPACE
+            census.add(owner, entity[0], entity[1], entity[2] if entity[0] == 'INSERT' else None)
+
+    for code, value in _tag_pairs(path):
+        if code == b'0':
+            finish()
+            entity = None
+            if value == b'SECTION':
+                expect_section_name = True
+            elif value == b'ENDSEC':
+                section = None
+            elif section == b'BLOCKS' and value == b'BLOCK':
+                expect_block_name = True
+            elif section == b'BLOCKS' and value == b'ENDBLK':
+                block = None
+            elif section in (b'BLOCKS', b'ENTITIES') and (block is not None or section == b'ENTITIES'):
+                entity = [_decode(value), '0', None, False]
+        elif code == b'2':
+            if expect_section_name:
+                section, expect_section_name = value, False
+            elif expect_block_name:
+                block, expect_block_name = _decode(value), False
+            elif entity is not None:
+                entity[2] = _decode(value)
+        elif code == b'8' and entity is not None:
+            entity[1] = _decode(value)
+        elif code == b'67' and entity is not None:
+            entity[3] = value == b'1'  # сущности листа (paperspace) не считаем
+    finish()
+    return census
+
+
+def file_census(path: str, layers: LayerRegistry = None) -> Dict:
+    """Перепись файла с замером времени.
+
+    by_kind - число сущностей по смыслу слоя (контур, кромка, отверстие...)
+    по правилам layers; слои без правила считаются как 'unknown'.
+    """
+    layers = layers or LayerRegistry()
+    started = time.perf_counter()
+    census = census_tags(path)
+    result = {'file': path}
+    result.update(census.to_dict())
+    by_kind: Dict[str, int] = {}
+    for layer, count in result['by_layer'].items():
+        kind = layers.classify(layer)['kind'] or 'unknown'
+        by_kind[kind] = by_kind.get(kind, 0) + count
+    result['by_kind'] = dict(sorted(by_kind.items(), key=lambda item: -item[1]))
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def format_tree(result: Dict, max_depth: int = 3) -> str:
+    """Дерево вставок от modelspace с составом блоков"""
+    lines = [f"{result['file']}: сущностей {result['entities']}, блоков {result['blocks']}, "
+             f"глубина {result['depth']}, {result['seconds']} с"]
+    inserts = result['inserts']
+
+    def walk(block, prefix, depth, path):
+        children = sorted(inserts.get(block, {}).items())
+        for i, (child, count) in enumerate(children):
+            last = i == len(children) - 1
+            times = f" x{count}" if count > 1 else ""
+            lines.append(f"{prefix}{'└── ' if last else '├── '}{child}{times}")
+            if child in path:
+                lines.append(f"{prefix}{'    ' if last else '│   '}└── (цикл)")
+            elif depth < max_depth:
+                walk(child, prefix + ('    ' if last else '│   '), depth + 1, path | {child})
+
+    lines.append(MODEL_SPACE)
+    walk(MODEL_SPACE, '', 1, frozenset())
+    lines.append("Типы: " + ', '.join(f"{t} {n}" for t, n in result['by_type'].items()))
+    lines.append("Слои: " + ', '.join(f"{l} {n}" for l, n in result['by_layer'].items()))
+    lines.append("Виды слоев: " + ', '.join(f"{k} {n}" for k, n in result['by_kind'].items()))
+    for panel in result['panels']:
+        lines.append(f"Панель {panel['name']} ({panel['parent']}): групп {panel['groups']}, "
+                     + ', '.join(f"{t} {n}" for t, n in sorted(panel['group_entities'].items())))
+    return '\n'.join(lines)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python census.py file.dxf [--json]")
+        sys.exit(1)
+
+    result = file_census(sys.argv[1])
+    if '--json' in sys.argv[2:]:
+        print(json.dumps(result, ensure_ascii=False, separators=(',', ':')))
+    else:
+        print(format_tree(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+from math import atan, atan2, cos, floor, hypot, pi, radians, sin, tan
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Point = Tuple[float, float]
+Vertex = Tuple[float, float, float]  # x, y, bulge ребра к следующей вершине
+
+TOLERANCE = 0.05  # допуск совпадения точек и попадания на край, мм
+MIN_ARC_TURN = radians(0.1)  # повороты между вершинами ломаной-дуги
+MAX_ARC_TURN = radians(30)
+MIN_BULGE = 1e-9  # меньший bulge считается прямым отрезком
+CUTOUT_TYPES = ('L', 'radius', 'notch', 'inner')  # типы вырезов find_cutouts
+
+
+def _arc_geometry(x0: float, y0: float, x1: float, y1: float, bulge: float) -> Dict:
+    """Точная геометрия одного ребра с bulge (дуга или отрезок)"""
+    chord = hypot(x1 - x0, y1 - y0)
+    if abs(bulge) < MIN_BULGE or chord == 0:
+        return {'length': chord, 'radius': 0.0, 'center_x': (x0 + x1) / 2, 'center_y': (y0 + y1) / 2,
+                'min_x': min(x0, x1), 'min_y': min(y0, y1), 'max_x': max(x0, x1), 'max_y': max(y0, y1)}
+
+    sweep = 4 * atan(bulge)  # центральный угол со знаком (+ против часовой)
+    radius = chord * (1 + bulge * bulge) / (4 * abs(bulge))
+    # центр лежит на нормали к хорде, слева при bulge > 0
+    offset = (1 - bulge * bulge) / (4 * bulge)
+    center_x = (x0 + x1) / 2 - (y1 - y0) * offset
+    center_y = (y0 + y1) / 2 + (x1 - x0) * offset
+
+    min_x, max_x = min(x0, x1), max(x0, x1)
+    min_y, max_y = min(y0, y1), max(y0, y1)
+    start = atan2(y0 - center_y, x0 - center_x)
+    for k, (dx, dy) in enumerate(((1, 0), (0, 1), (-1, 0), (0, -1))):
+        angle = k * pi / 2
+        passed = (angle - start) % (2 * pi) if sweep > 0 else (start - angle) % (2 * pi)
+        if passed <= abs(sweep):
+            min_x, max_x = min(min_x, center_x + dx * radius), max(max_x, center_x + dx * radius)
+            min_y, max_y = min(min_y, center_y + dy * radius), max(max_y, center_y + dy * radius)
+
+    return {'length': radius * abs(sweep), 'radius': radius, 'center_x': center_x, 'center_y': center_y,
+            'min_x': min_x, 'min_y': min_y, 'max_x': max_x, 'max_y': max_y}
+
+
+def segment_geometry(x0: Sequence[float], y0: Sequence[float], x1: Sequence[float],
+                     y1: Sequence[float], bulge: Sequence[float]) -> Dict:
+    """Длины, радиусы, центры и габариты ребер контура одним проходом.
+
+    Принимает колонки начала, конца и bulge всех ребер. С numpy считает
+    векторно, без него - по ребру; результат - колонки той же длины.
+    Для прямых ребер radius = 0.
+    """
+    if np is None:
+        rows = [_arc_geometry(*edge) for edge in zip(x0, y0, x1, y1, bulge)]
+        keys = ('length', 'radius', 'center_x', 'center_y', 'min_x', 'min_y', 'max_x', 'max_y')
+        return {key: [row[key] for row in rows] for key in keys}
+
+    x0, y0, x1, y1, bulge = (np.asarray(v, dtype=float) for v in (x0, y0, x1, y1, bulge))
+    chord = np.hypot(x1 - x0, y1 - y0)
+    is_arc = (np.abs(bulge) >= MIN_BULGE) & (chord > 0)
+    safe = np.where(is_arc, bulge, 1.0)
+
+    sweep = 4 * np.arctan(safe)
+    radius = np.where(is_arc, chord * (1 + safe ** 2) / (4 * np.abs(safe)), 0.0)
+    offset = np.where(is_arc, (1 - safe ** 2) / (4 * safe), 0.0)
+    center_x = (x0 + x1) / 2 - (y1 - y0) * offset
+    center_y = (y0 + y1) / 2 + (x1 - x0) * offset
+
+    min_x, max_x = np.minimum(x0, x1), np.maximum(x0, x1)
+    min_y, max_y = np.minimum(y0, y1), np.maximum(y0, y1)
+    start = np.arctan2(y0 - center_y, x0 - center_x)
+    for k, (dx, dy) in enumerate(((1, 0), (0, 1), (-1, 0), (0, -1))):
+        angle = k * np.pi / 2
+        passed = np.where(sweep > 0, (angle - start) % (2 * np.pi), (start - angle) % (2 * np.pi))
+        extreme = is_arc & (passed <= np.abs(sweep))
+        min_x = np.where(extreme, np.minimum(min_x, center_x + dx * radius), min_x)
+        max_x = np.where(extreme, np.maximum(max_x, center_x + dx * radius), max_x)
+        min_y = np.where(extreme, np.minimum(min_y, center_y + dy * radius), min_y)
+        max_y = np.where(extreme, np.maximum(max_y, center_y + dy * radius), max_y)
+
+    return {'length': np.where(is_arc, radius * np.abs(sweep), chord), 'radius': radius,
+            'center_x': center_x, 'center_y': center_y,
+            'min_x': min_x, 'min_y': min_y, 'max_x': max_x, 'max_y': max_y}
+
+
+def arc_to_bulge(center: Point, radius: float, start_angle: float, end_angle: float) -> Tuple[Point, Point, float]:
+    """Переводит ARC (углы в градусах против часовой) в отрезок с bulge"""
+    a0, a1 = radians(start_angle), radians(end_angle)
+    sweep = (a1 - a0) % (2 * pi)
+    start = (center[0] + radius * cos(a0), center[1] + radius * sin(a0))
+    end = (center[0] + radius * cos(a1), center[1] + radius * sin(a1))
+    return start, end, tan(sweep / 4)
+
+
+def _cell(point: Point, tolerance) -> Tuple[int, int]:
+    """Ячейка хеш-сетки со стороной tolerance.
+
+    Для целых координат (микрометры DxfReader) и целого допуска ячейка
+    считается точным целочисленным делением.
+    """
+    if isinstance(tolerance, int):
+        return point[0] // tolerance, point[1] // tolerance
+    return floor(point[0] / tolerance), floor(point[1] / tolerance)
+
+
+def _distance2(a: Point, b: Point):
+    dx, dy = a[0] - b[0], a[1] - b[1]
+    return dx * dx + dy * dy
+
+
+def build_loops(segments: List[tuple], tolerance: float = TOLERANCE) -> List[List[Vertex]]:
+    """Собирает замкнутые контуры из отрезков по хешу их концов.
+
+    Отрезок - (начало, конец) или (начало, конец, bulge). Концы лежат в
+    ячейках сетки со стороной tolerance; продолжение ищется среди концов
+    своей и восьми соседних ячеек (ближайший не дальше tolerance), поэтому
+    близкие точки по разные стороны границы ячейки тоже склеиваются, а
+    сборка всех контуров занимает O(n). Контур возвращается списком
+    вершин (x, y, bulge); при обходе отрезка в обратную сторону знак
+    bulge меняется. Незамкнутые цепочки отбрасываются.
+    """
+    limit = tolerance * tolerance
+    ends: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}  # ячейка -> (отрезок, 0 - начало / 1 - конец)
+    usable = []
+    for i, segment in enumerate(segments):
+        start, end = segment[0], segment[1]
+        if _distance2(start, end) <= limit:
+            continue  # вырожденный отрезок (например, повтор замыкающей вершины)
+        usable.append(i)
+        ends.setdefault(_cell(start, tolerance), []).append((i, 0))
+        ends.setdefault(_cell(end, tolerance), []).append((i, 1))
+
+    def bulge_of(i: int) -> float:
+        return segments[i][2] if len(segments[i]) > 2 else 0.0
+
+    def nearest_end(point: Point):
+        """Ближайший свободный конец отрезка не дальше tolerance"""
+        cx, cy = _cell(point, tolerance)
+        best, best_distance = None, limit
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for i, which in ends.get((cx + dx, cy + dy), ()):
+                    if i in used:
+                        continue
+                    distance = _distance2(segments[i][which], point)
+                    if distance <= best_distance:
+                        best, best_distance = (i, which), distance
+        return best
+
+    used = set()
+    loops = []
+    for first in usable:
+        if first in used:
+            continue
+        used.add(first)
+        start, current = segments[first][0], segments[first][1]
+        loop = [(start[0], start[1], bulge_of(first))]
+        while _distance2(current, start) > limit:
+            found = nearest_end(current)
+            if found is None:
+                loop = None  # цепочка не замкнулась
+                break
+            nxt, which = found
+            used.add(nxt)
+            if which == 0:
+                loop.append((current[0], current[1], bulge_of(nxt)))
+                current = segments[nxt][1]
+            else:
+                loop.append((current[0], current[1], -bulge_of(nxt)))
+                current = segments[nxt][0]
+        if loop and len(loop) >= 2:
+            loops.append(loop)
+    return loops
+
+
+def _as_vertices(loop) -> List[Vertex]:
+    return [(v[0], v[1], v[2] if len(v) > 2 else 0.0) for v in loop]
+
+
+def _reverse(loop: List[Vertex]) -> List[Vertex]:
+    """Обратный обход: ребро v[i+1] -> v[i] получает bulge -b[i]"""
+    n = len(loop)
+    return [(loop[n - 1 - k][0], loop[n - 1 - k][1], -loop[(n - 2 - k) % n][2]) for k in range(n)]
+
+
+def polygon_area(loop) -> float:
+    """Ориентированная площадь с учетом дуг (положительная против часовой)"""
+    loop = _as_vertices(loop)
+    area = 0.0
+    for i, (x0, y0, bulge) in enumerate(loop):
+        x1, y1, _ = loop[(i + 1) % len(loop)]
+        area += (x0 * y1 - x1 * y0) / 2
+        if abs(bulge) >= MIN_BULGE:
+            # сегмент круга между хордой и дугой
+            sweep = 4 * atan(bulge)
+            radius = hypot(x1 - x0, y1 - y0) * (1 + bulge * bulge) / (4 * abs(bulge))
+            area += radius * radius / 2 * (sweep - sin(sweep))
+    return area
+
+
+def _bounds(loop: List[Vertex], closed: bool = True) -> Tuple[float, float, float, float]:
+    """Точный габарит с учетом выпуклости дуг"""
+    edges = loop if closed else loop[:-1]
+    if not edges:
+        return loop[0][0], loop[0][1], loop[0][0], loop[0][1]
+    n = len(loop)
+    geometry = segment_geometry([v[0] for v in edges], [v[1] for v in edges],
+                                [loop[(i + 1) % n][0] for i in range(len(edges))],
+                                [loop[(i + 1) % n][1] for i in range(len(edges))],
+                                [v[2] for v in edges])
+    return (float(min(geometry['min_x'])), float(min(geometry['min_y'])),
+            float(max(geometry['max_x'])), float(max(geometry['max_y'])))
+
+
+def _sides(point, bounds, tolerance: float) -> set:
+    """Стороны габарита, на которых лежит точка"""
+    min_x, min_y, max_x, max_y = bounds
+    sides = set()
+    if abs(point[0] - min_x) <= tolerance:
+        sides.add('left')
+    if abs(point[0] - max_x) <= tolerance:
+        sides.add('right')
+    if abs(point[1] - min_y) <= tolerance:
+        sides.add('bottom')
+    if abs(point[1] - max_y) <= tolerance:
+        sides.add('top')
+    return sides
+
+
+def _perimeter_position(point, bounds) -> float:
+    """Положение точки на периметре габарита против часовой от левого нижнего угла"""
+    min_x, min_y, max_x, max_y = bounds
+    width, height = max_x - min_x, max_y - min_y
+    x, y = point[0], point[1]
+    distances = (
+        (abs(y - min_y), x - min_x),                          # низ
+        (abs(x - max_x), width + y - min_y),                  # право
+        (abs(y - max_y), width + height + max_x - x),         # верх
+        (abs(x - min_x), 2 * width + height + max_y - y),     # лево
+    )
+    return min(distances)[1]
+
+
+def _corners_between(start: float, end: float, bounds) -> List[Point]:
+    """Углы габарита при обходе периметра по часовой от start до end"""
+    min_x, min_y, max_x, max_y = bounds
+    width, height = max_x - min_x, max_y - min_y
+    perimeter = 2 * (width + height)
+    corners = [(0.0, (min_x, min_y)), (width, (max_x, min_y)),
+               (width + height, (max_x, max_y)), (2 * width + height, (min_x, max_y))]
+    span = (start - end) % perimeter
+    passed = []
+    for position, corner in corners:
+        offset = (start - position) % perimeter
+        if 0 < offset < span:
+            passed.append((offset, corner))
+    return [corner for _, corner in sorted(passed)]
+
+
+def _circle_radius(a, b, c) -> float:
+    """Радиус окружности через три точки (None для коллинеарных)"""
+    ab, bc, ca = hypot(a[0] - b[0], a[1] - b[1]), hypot(b[0] - c[0], b[1] - c[1]), hypot(c[0] - a[0], c[1] - a[1])
+    cross = abs((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]))
+    if cross < 1e-9:
+        return None
+    return ab * bc * ca / (2 * cross)
+
+
+def _turn(a, b, c) -> float:
+    """Угол поворота в вершине b (со знаком), радианы"""
+    return atan2((b[0] - a[0]) * (c[1] - b[1]) - (b[1] - a[1]) * (c[0] - b[0]),
+                 (b[0] - a[0]) * (c[0] - b[0]) + (b[1] - a[1]) * (c[1] - b[1]))
+
+
+def _arc_runs(chain: List[Vertex]) -> List[List[Vertex]]:
+    """Серии вершин с малым поворотом одного знака и близкой длиной
+    отрезков - аппроксимация дуги ломаной"""
+    runs, run = [], chain[:2]
+    for a, b, c in zip(chain, chain[1:], chain[2:]):
+        turn = _turn(a, b, c)
+        ratio = hypot(c[0] - b[0], c[1] - b[1]) / max(hypot(b[0] - a[0], b[1] - a[1]), 1e-9)
+        previous = _turn(*run[-3:]) if len(run) >= 3 else turn
+        if MIN_ARC_TURN < abs(turn) < MAX_ARC_TURN and turn * previous > 0 and 0.5 < ratio < 2:
+            run.append(c)
+        else:
+            if len(run) >= 4:
+                runs.append(run)
+            run = [b, c]
+    if len(run) >= 4:
+        runs.append(run)
+    return runs
+
+
+def _chain_radius(chain: List[Vertex]) -> Tuple[float, bool]:
+    """Радиус скругления цепочки и признак того, что она вся - дуга.
+
+    Если в цепочке есть ребра с bulge, радиус берется точно из самой
+    длинной дуги. Иначе (экспорт уже разбил дугу на ломаную) радиус
+    оценивается по самой длинной серии равномерно поворачивающих отрезков.
+    """
+    edges = chain[:-1]
+    arcs = [i for i, v in enumerate(edges) if abs(v[2]) >= MIN_BULGE]
+    if arcs:
+        geometry = segment_geometry([chain[i][0] for i in arcs], [chain[i][1] for i in arcs],
+                                    [chain[i + 1][0] for i in arcs], [chain[i + 1][1] for i in arcs],
+                                    [chain[i][2] for i in arcs])
+        longest = max(range(len(arcs)), key=lambda k: geometry['length'][k])
+        return float(geometry['radius'][longest]), len(arcs) == len(edges)
+
+    runs = _arc_runs(chain)
+    if not runs:
+        return None, False
+    run = max(runs, key=len)
+    radius = _circle_radius(run[0], run[len(run) // 3], run[2 * len(run) // 3])
+    return radius, len(run) == len(chain)
+
+
+def find_cutouts(loops: List[list], tolerance: float = TOLERANCE) -> Tuple[List[Vertex], List[Dict]]:
+    """Вычитает внешний контур из его габарита и классифицирует вырезы.
+
+    Внешний контур - замкнутый контур с наибольшей площадью. Разность
+    габарита и контура распадается на карманы: максимальные цепочки ребер
+    контура, не лежащих на сторонах габарита, замкнутые по периметру.
+    Дуги учитываются точно: ребро с bulge никогда не считается лежащим на
+    стороне, а габарит включает выпуклость дуг. Остальные контуры -
+    внутренние вырезы. Типы: 'L' (угловой карман), 'radius' (скругление
+    угла), 'notch' (паз в одной или противоположных сторонах), 'inner'.
+    Размеры и координаты - в единицах входа (DxfReader передает микрометры).
+    """
+    if not loops:
+        return [], []
+
+    loops = sorted((_as_vertices(loop) for loop in loops),
+                   key=lambda loop: abs(polygon_area(loop)), reverse=True)
+    outer = loops[0]
+    if polygon_area(outer) < 0:
+        outer = _reverse(outer)
+    bounds = _bounds(outer)
+    n = len(outer)
+
+    def on_boundary(i: int) -> bool:
+        """Прямое ребро i -> i+1 лежит на стороне габарита"""
+        if abs(outer[i][2]) >= MIN_BULGE:
+            return False
+        return bool(_sides(outer[i], bounds, tolerance) & _sides(outer[(i + 1) % n], bounds, tolerance))
+
+    cutouts = []
+    boundary = [on_boundary(i) for i in range(n)]
+    if any(boundary) and not all(boundary):
+        # Начинаем обход с ребра на габарите, чтобы карманы не разрывались
+        shift = boundary.index(True)
+        i = 0
+        while i < n:
+            edge = (shift + i) % n
+            if boundary[edge]:
+                i += 1
+                continue
+            chain = [outer[edge]]
+            while i < n and not boundary[(shift + i) % n]:
+                chain.append(outer[(shift + i + 1) % n])
+                i += 1
+            cutouts.append(_pocket(chain, bounds, tolerance))
+
+    for loop in loops[1:]:
+        cutouts.append(_inner(loop))
+
+    cutouts.sort(key=lambda c: (c['position']['x'], c['position']['y']))
+    return outer, cutouts
+
+
+def _pocket(chain: List[Vertex], bounds, tolerance: float) -> Dict:
+    """Вырез на краю: цепочка контура плюс участок периметра габарита"""
+    entry, exit_ = chain[0], chain[-1]
+    closing = _corners_between(_perimeter_position(exit_, bounds),
+                               _perimeter_position(entry, bounds), bounds)
+    # ребра по периметру габарита прямые
+    polygon = chain[:-1] + [(exit_[0], exit_[1], 0.0)] + [(x, y, 0.0) for x, y in closing]
+    min_x, min_y, max_x, max_y = _bounds(polygon)
+    radius, only_arc = _chain_radius(chain)
+
+    entry_sides = _sides(entry, bounds, tolerance)
+    exit_sides = _sides(exit_, bounds, tolerance)
+    if len(closing) == 1 and not (entry_sides & exit_sides):
+        kind = 'radius' if only_arc else 'L'
+    else:
+        kind = 'notch'
+    sides = sorted(entry_sides | exit_sides)
+
+    return {
+        'type': kind,
+        'edge': '-'.join(sides),
+        'size': {'x': max_x - min_x, 'y': max_y - min_y},
+        'position': {'x': min_x, 'y': min_y},
+        'entry_points': [(entry[0], entry[1]), (exit_[0], exit_[1])],
+        'points': [(v[0], v[1]) for v in polygon],
+        'bulges': [v[2] for v in polygon],
+        'radius': radius
+    }
+
+
+def _inner(loop: List[Vertex]) -> Dict:
+    """Внутренний вырез - отдельный замкнутый контур"""
+    min_x, min_y, max_x, max_y = _bounds(loop)
+    radius, _ = _chain_radius(loop + loop[:1])
+    return {
+        'type': 'inner',
+        'size': {'x': max_x - min_x, 'y': max_y - min_y},
+        'position': {'x': min_x, 'y': min_y},
+        'entry_points': [],
+        'points': [(v[0], v[1]) for v in loop],
+        'bulges': [v[2] for v in loop],
+        'radius': radius
+    }
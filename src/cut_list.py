@@ -0,0 +1,195 @@
+import sys
+import time
+from typing import Dict, List, Tuple
+
+SHEET_SIZE = (2800.0, 2070.0)  # стандартный лист ЛДСП, мм
+KERF = 4.0  # ширина пропила
+TRIM = 10.0  # обрезка кромки листа с каждой стороны
+TIME_BUDGET = 0.2  # секунды на перебор порядков раскладки
+
+Rect = Tuple[float, float, float, float]  # x, y, ширина, высота
+
+
+class _Sheet:
+    """Лист с раскладкой MaxRects: список максимальных свободных прямоугольников"""
+
+    def __init__(self, width: float, height: float):
+        self.free: List[Rect] = [(0.0, 0.0, width, height)]
+        self.placements: List[Dict] = []
+        self.used_area = 0.0
+
+    def find(self, w: float, h: float):
+        """Лучшее место по короткой стороне остатка (BSSF), с поворотом: (оценка, x, y, w, h)"""
+        best = None
+        for fx, fy, fw, fh in self.free:
+            for pw, ph in ((w, h), (h, w)) if w != h else ((w, h),):
+                if pw <= fw and ph <= fh:
+                    score = (min(fw - pw, fh - ph), max(fw - pw, fh - ph))
+                    if best is None or score < best[0]:
+                        best = (score, fx, fy, pw, ph)
+        return best
+
+    def place(self, x: float, y: float, w: float, h: float):
+        """Занимает прямоугольник и перестраивает свободные области"""
+        free = []  # (область, новая ли она)
+        for f in self.free:
+            fx, fy, fw, fh = f
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                free.append((f, False))
+                continue
+            if x > fx:
+                free.append(((fx, fy, x - fx, fh), True))
+            if x + w < fx + fw:
+                free.append(((x + w, fy, fx + fw - x - w, fh), True))
+            if y > fy:
+                free.append(((fx, fy, fw, y - fy), True))
+            if y + h < fy + fh:
+                free.append(((fx, y + h, fw, fy + fh - y - h), True))
+
+        # Убираем области, целиком лежащие внутри других. Проверять нужно
+        # только новые куски: нетронутые области не вложены друг в друга, а
+        # каждый кусок лежит внутри старой области, поэтому нетронутую
+        # область содержать не может
+        free.sort(key=lambda item: item[0][2] * item[0][3], reverse=True)
+        kept = []
+        for r, is_new in free:
+            if not is_new or not any(r[0] >= k[0] and r[1] >= k[1] and r[0] + r[2] <= k[0] + k[2]
+                                     and r[1] + r[3] <= k[1] + k[3] for k in kept):
+                kept.append(r)
+        self.free = kept
+
+
+def _pack_order(panels: List[Dict], sheet: Tuple[float, float], kerf: float, trim: float,
+                deadline: float = None, finish: bool = True):
+    """Раскладывает панели в заданном порядке, возвращает листы и не влезшие панели.
+
+    После deadline раскладка с finish=False бросается (None), а с
+    finish=True доводится до конца, но место ищется только на последнем
+    листе - каждая следующая панель стоит одного просмотра одного листа.
+    """
+    # Пропил добавляется к детали и к рабочей области листа, так что между
+    # соседними деталями остается ровно kerf, а у обрезанного края - ноль
+    usable_w = sheet[0] - 2 * trim + kerf
+    usable_h = sheet[1] - 2 * trim + kerf
+    sheets: List[_Sheet] = []
+    oversize = []
+
+    late = False
+    for panel in panels:
+        if not late and deadline is not None and time.perf_counter() > deadline:
+            if not finish:
+                return None
+            late = True
+        w, h = panel['size']['width'] + kerf, panel['size']['height'] + kerf
+
+        spot = None
+        for target in (sheets[-1:] if late else sheets):
+            spot = target.find(w, h)
+            if spot:
+                break
+        if spot is None:
+            target = _Sheet(usable_w, usable_h)
+            spot = target.find(w, h)
+            if spot is None:
+                oversize.append(panel)
+                continue
+            sheets.append(target)
+
+        _, x, y, pw, ph = spot
+        target.place(x, y, pw, ph)
+        target.used_area += (pw - kerf) * (ph - kerf)
+        target.placements.append({
+            'name': panel.get('name', ''),
+            'x': round(x + trim, 1),
+            'y': round(y + trim, 1),
+            'width': round(pw - kerf, 1),
+            'height': round(ph - kerf, 1),
+            'rotated': pw != w
+        })
+    return sheets, oversize
+
+
+ORDERS = (
+    lambda p: -p['size']['width'] * p['size']['height'],
+    lambda p: -max(p['size']['width'], p['size']['height']),
+    lambda p: -(p['size']['width'] + p['size']['height']),
+    lambda p: -p['size']['height'],
+    lambda p: -p['size']['width'],
+)
+
+
+def pack_panels(panels: List[Dict], sheet: Tuple[float, float] = SHEET_SIZE, kerf: float = KERF,
+                trim: float = TRIM, time_budget: float = TIME_BUDGET) -> Dict:
+    """Раскладка панелей одной толщины на листы.
+
+    Перебирает порядки сортировки, пока не кончится time_budget, и
+    оставляет вариант с наименьшим числом листов, а при равенстве - с
+    самым плотным первым листом. Время проверяется и внутри раскладки:
+    первый порядок по истечении бюджета доводится упрощенно, следующие
+    бросаются.
+    """
+    deadline = time.perf_counter() + time_budget
+    best = None
+    for i, order in enumerate(ORDERS):
+        packed = _pack_order(sorted(panels, key=order), sheet, kerf, trim, deadline, finish=i == 0)
+        if packed is None:
+            break
+        sheets, oversize = packed
+        score = (len(sheets), -(sheets[0].used_area if sheets else 0.0))
+        if best is None or score < best[0]:
+            best = (score, sheets, oversize)
+        if time.perf_counter() > deadline:
+            break
+
+    _, sheets, oversize = best
+    sheet_area = sheet[0] * sheet[1]
+    used = sum(s.used_area for s in sheets)
+    return {
+        'sheet_count': len(sheets),
+        'utilization': round(used / (sheet_area * len(sheets)), 4) if sheets else 0.0,
+        'sheets': [
+            {'placements': s.placements, 'utilization': round(s.used_area / sheet_area, 4)}
+            for s in sheets
+        ],
+        'oversize': [panel.get('name', '') for panel in oversize]
+    }
+
+
+def build_cut_list(panels: List[Dict], **options) -> List[Dict]:
+    """Группирует панели по материалу и толщине и раскладывает каждую группу"""
+    groups: Dict[Tuple[str, float], List[Dict]] = {}
+    for panel in panels:
+        key = (panel.get('material', ''), panel['size']['thickness'])
+        groups.setdefault(key, []).append(panel)
+
+    cut_list = []
+    for (material, thickness), group in sorted(groups.items()):
+        result = pack_panels(group, **options)
+        result.update({'material': material, 'thickness': thickness, 'panels': len(group)})
+        cut_list.append(result)
+    return cut_list
+
+
+def main():
+    from dxf_reader import DxfReader
+
+    if len(sys.argv) < 2:
+        print("Использование: python cut_list.py file1.dxf [file2.dxf ...]")
+        sys.exit(1)
+
+    panels = []
+    for filename in sys.argv[1:]:
+        panels.extend(DxfReader(filename).get_panels_data())
+
+    for group in build_cut_list(panels):
+        material = group['material'] or 'без материала'
+        print(f"\n{material}, {group['thickness']} мм: панелей {group['panels']}, "
+              f"листов {group['sheet_count']}, использование {group['utilization']:.1%}")
+        for i, sheet in enumerate(group['sheets'], 1):
+            print(f"  Лист {i}: деталей {len(sheet['placements'])}, {sheet['utilization']:.1%}")
+        if group['oversize']:
+            print(f"  Не помещаются на лист: {', '.join(group['oversize'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import os
+import random
+import sys
+import time
+from math import hypot
+from typing import Dict, List, Tuple
+
+from spatial_index import UniformGrid
+
+Point = Tuple[float, float]
+
+HOME = (0.0, 0.0)  # точка, с которой шпиндель начинает программу
+SAFE_Z = 20.0  # высота холостых перемещений
+NEIGHBOURS = 8  # кандидатов на точку в 2-opt
+
+
+def _field(item, name, default=None):
+    """Поле словаря или атрибут объекта (Hole, Groove)"""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+def _point(value) -> Point:
+    if isinstance(value, dict):
+        return value['x'], value['y']
+    return value[0], value[1]
+
+
+def _dist(a: Point, b: Point) -> float:
+    return hypot(a[0] - b[0], a[1] - b[1])
+
+
+def _path_length(points: List[Point], start: Point) -> float:
+    total, current = 0.0, start
+    for p in points:
+        total += _dist(current, p)
+        current = p
+    return total
+
+
+def _grid(points: List[Point]) -> UniformGrid:
+    """Сетка с ячейкой порядка среднего расстояния между точками"""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    area = max(max(xs) - min(xs), 1.0) * max(max(ys) - min(ys), 1.0)
+    grid = UniformGrid(max((area / len(points)) ** 0.5, 1.0))
+    for i, (x, y) in enumerate(points):
+        grid.insert(i, (x, y, x, y))
+    return grid
+
+
+def nearest_neighbour_order(points: List[Point], start: Point) -> List[int]:
+    """Порядок обхода жадным ближайшим соседом через сетку"""
+    if not points:
+        return []
+    grid = _grid(points)
+    order, current = [], start
+    while grid.boxes:
+        i = grid.nearest(*current)
+        grid.remove(i)
+        order.append(i)
+        current = points[i]
+    return order
+
+
+def two_opt(points: List[Point], order: List[int], start: Point) -> List[int]:
+    """Улучшение открытого маршрута 2-opt по спискам ближайших соседей.
+
+    Для ребра (a, b) пробуются только перестановки с ближайшими к a
+    точками c, поэтому проход стоит O(n * NEIGHBOURS), а не O(n^2).
+    Позиция 0 маршрута - фиксированная стартовая точка.
+    """
+    if len(order) < 3:
+        return order
+    coords = [start] + [points[i] for i in order]
+    tour = list(range(len(coords)))  # индексы в coords
+    n = len(tour)
+
+    grid = _grid(coords[1:])
+    neighbours = []
+    for x, y in coords:
+        found = sorted(grid.query((x, y, x, y), 2 * grid.cell_size),
+                       key=lambda k: _dist(coords[k + 1], (x, y)))
+        neighbours.append([k + 1 for k in found[:NEIGHBOURS + 1]])
+
+    position = list(range(n))
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 1):
+            a, b = tour[i], tour[i + 1]
+            ab = _dist(coords[a], coords[b])
+            for c in neighbours[a]:
+                j = position[c]
+                if j <= i + 1:
+                    continue
+                # последнее ребро открытого маршрута ничего не стоит
+                d = tour[j + 1] if j + 1 < n else None
+                cd = _dist(coords[c], coords[d]) if d is not None else 0.0
+                bd = _dist(coords[b], coords[d]) if d is not None else 0.0
+                delta = _dist(coords[a], coords[c]) + bd - ab - cd
+                if delta < -1e-9:
+                    tour[i + 1:j + 1] = reversed(tour[i + 1:j + 1])
+                    for k in range(i + 1, j + 1):
+                        position[tour[k]] = k
+                    improved = True
+                    break
+    return [order[k - 1] for k in tour[1:]]
+
+
+def _order_grooves(grooves: List[Tuple[Point, Point]], start: Point):
+    """Жадный обход пазов: паз проходится от ближнего конца к дальнему.
+
+    Оба конца каждого паза лежат в сетке (ключ 2 * i + flip), ближайший
+    конец ищется через нее, пройденный паз убирается вместе с обоими концами.
+    """
+    if not grooves:
+        return []
+    grid = _grid([end for groove in grooves for end in groove])
+    result, current = [], start
+    while grid.boxes:
+        i, flip = divmod(grid.nearest(*current), 2)
+        grid.remove(2 * i)
+        grid.remove(2 * i + 1)
+        a, b = grooves[i] if not flip else grooves[i][::-1]
+        result.append((a, b))
+        current = b
+    return result
+
+
+def build_program(holes: List, grooves: List, start: Point = HOME) -> Dict:
+    """Программа обработки панели: операции по инструментам и оценка холостого хода.
+
+    Отверстия группируются по (диаметр, глубина), пазы - по (ширина, глубина).
+    Каждая группа - один инструмент; группы идут в порядке возрастания
+    диаметра, внутри группы точки упорядочены NN + 2-opt. Для сравнения
+    считается холостой ход при обходе в порядке извлечения из DXF.
+    """
+    drill_groups: Dict[Tuple[float, float], List[Point]] = {}
+    for hole in holes:
+        key = (_field(hole, 'diameter'), _field(hole, 'depth'))
+        drill_groups.setdefault(key, []).append(_point(_field(hole, 'center')))
+    groove_groups: Dict[Tuple[float, float], List[Tuple[Point, Point]]] = {}
+    for groove in grooves:
+        key = (_field(groove, 'width'), _field(groove, 'depth'))
+        groove_groups.setdefault(key, []).append(
+            (_point(_field(groove, 'start')), _point(_field(groove, 'end'))))
+
+    operations = []
+    travel = baseline = 0.0
+    current = baseline_current = start
+
+    for (diameter, depth), points in sorted(drill_groups.items()):
+        order = two_opt(points, nearest_neighbour_order(points, current), current)
+        ordered = [points[i] for i in order]
+        travel += _path_length(ordered, current)
+        baseline += _path_length(points, baseline_current)
+        current, baseline_current = ordered[-1], points[-1]
+        operations.append({
+            'type': 'drill', 'diameter': diameter, 'depth': depth, 'points': ordered
+        })
+
+    for (width, depth), segments in sorted(groove_groups.items()):
+        ordered = _order_grooves(segments, current)
+        for a, b in ordered:
+            travel += _dist(current, a)
+            current = b
+        for a, b in segments:
+            baseline += _dist(baseline_current, a)
+            baseline_current = b
+        operations.append({
+            'type': 'groove', 'width': width, 'depth': depth, 'segments': ordered
+        })
+
+    return {
+        'operations': operations,
+        'tool_changes': len(operations),
+        'travel': round(travel, 1),
+        'baseline_travel': round(baseline, 1),
+        'saved': round(baseline - travel, 1)
+    }
+
+
+def to_gcode(program: Dict, safe_z: float = SAFE_Z) -> str:
+    """Текст программы в простом ISO-формате (G0/G1, смена инструмента T)"""
+    lines = ['G90', 'G21']
+    for tool, operation in enumerate(program['operations'], 1):
+        if operation['type'] == 'drill':
+            lines.append(f"T{tool} M6 (D{operation['diameter']} Z{operation['depth']})")
+            for x, y in operation['points']:
+                lines.append(f"G0 X{x:.2f} Y{y:.2f} Z{safe_z:.2f}")
+                lines.append(f"G1 Z{-operation['depth']:.2f}")
+                lines.append(f"G0 Z{safe_z:.2f}")
+        else:
+            lines.append(f"T{tool} M6 (PAZ W{operation['width']} Z{operation['depth']})")
+            for (x0, y0), (x1, y1) in operation['segments']:
+                lines.append(f"G0 X{x0:.2f} Y{y0:.2f} Z{safe_z:.2f}")
+                lines.append(f"G1 Z{-operation['depth']:.2f}")
+                lines.append(f"G1 X{x1:.2f} Y{y1:.2f}")
+                lines.append(f"G0 Z{safe_z:.2f}")
+    lines.append('M30')
+    return '\n'.join(lines) + '\n'
+
+
+def programs_for_file(filename: str) -> Dict[str, Dict]:
+    """Программы для всех панелей файла в координатах блока панели"""
+    from dxf_reader import DxfReader
+
+    programs = {}
+    for panel in DxfReader(filename).get_panels_data(['holes', 'grooves']):
+        programs[panel['name']] = build_program(panel['holes'], panel['grooves'])
+    return programs
+
+
+def benchmark(count: int, seed: int = 1) -> Dict:
+    """Замер на синтетической панели с count отверстиями трех диаметров"""
+    rng = random.Random(seed)
+    holes = [
+        {'center': (round(rng.uniform(10, 2000), 1), round(rng.uniform(10, 800), 1)),
+         'diameter': rng.choice((5.0, 8.0, 15.0)), 'depth': rng.choice((8.0, 13.0))}
+        for _ in range(count)
+    ]
+    started = time.perf_counter()
+    program = build_program(holes, [])
+    return {
+        'holes': count,
+        'seconds': round(time.perf_counter() - started, 3),
+        'travel': program['travel'],
+        'baseline_travel': program['baseline_travel'],
+        'saved': program['saved']
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python drilling.py file.dxf [папка_для_программ]")
+        print("               python drilling.py --bench [число_отверстий]")
+        sys.exit(1)
+
+    if sys.argv[1] == '--bench':
+        for count in ([int(sys.argv[2])] if len(sys.argv) > 2 else [100, 300, 1000]):
+            result = benchmark(count)
+            print(f"{result['holes']} отверстий: {result['seconds']} с, холостой ход "
+                  f"{result['travel']} мм вместо {result['baseline_travel']} мм")
+        return
+
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    for name, program in programs_for_file(sys.argv[1]).items():
+        print(f"\nПанель {name}: инструментов {program['tool_changes']}, холостой ход "
+              f"{program['travel']} мм (в порядке извлечения {program['baseline_travel']} мм, "
+              f"экономия {program['saved']} мм)")
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+            with open(os.path.join(out_dir, f"{name}.nc"), 'w') as f:
+                f.write(to_gcode(program))
+
+
+if __name__ == "__main__":
+    main()
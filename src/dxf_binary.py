@@ -0,0 +1,162 @@
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List
+
+import ezdxf
+from ezdxf.filemanagement import dxf_file_info
+from ezdxf.lldxf.tagger import ascii_tags_loader, binary_tags_loader, tag_compiler
+from ezdxf.lldxf.tagwriter import BinaryTagWriter
+from ezdxf.lldxf.types import DXFTag
+
+BINARY_SENTINEL = b'AutoCAD Binary DXF\r\n\x1a\x00'
+REPEAT = 3  # замеров времени на файл, берется лучший
+
+USAGE = """Использование:
+  python dxf_binary.py convert <каталог> [--verify] file1.dxf [file2.dxf ...]
+  python dxf_binary.py bench file1.dxf [file2.dxf ...]
+"""
+
+
+def is_binary(path: str) -> bool:
+    """Бинарный DXF определяется по сигнатуре в начале файла"""
+    with open(path, 'rb') as f:
+        return f.read(len(BINARY_SENTINEL)) == BINARY_SENTINEL
+
+
+def binary_tags(path: str) -> Iterator[DXFTag]:
+    """Теги бинарного DXF: код - int, значение - строка, число или bytes"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return binary_tags_loader(data)
+
+
+def to_binary(source: str, target: str) -> Dict:
+    """Перекодирует текстовый DXF в бинарный тег за тегом, без построения документа.
+
+    Версия и кодовая страница берутся из заголовка исходного файла, поток
+    тегов сохраняется как есть (кроме комментариев 999, которых в бинарном
+    DXF нет). target может совпадать с source: запись идет во временный
+    файл и заменяет цель только целиком. Уже бинарный файл не трогается.
+    """
+    if is_binary(source):
+        return {'source': source, 'target': None, 'ascii_bytes': None,
+                'binary_bytes': os.path.getsize(source)}
+    info = dxf_file_info(source)
+    tmp = target + '.tmp'
+    try:
+        with open(source, encoding=info.encoding, errors='surrogateescape') as src, open(tmp, 'wb') as dst:
+            writer = BinaryTagWriter(dst, dxfversion=info.version, encoding=info.encoding)
+            writer.write_signature()
+            for tag in tag_compiler(ascii_tags_loader(src)):
+                writer.write_tag(tag)
+        ascii_bytes = os.path.getsize(source)
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)  # разбор упал - недописанный файл не оставляем
+    return {'source': source, 'target': target, 'ascii_bytes': ascii_bytes,
+            'binary_bytes': os.path.getsize(target)}
+
+
+def _panels(path: str) -> List[Dict]:
+    from dxf_reader import DxfReader
+    return sorted(DxfReader(path).get_panels_data(), key=lambda panel: (panel['name'], panel['origin_point']))
+
+
+def same_panels(first: str, second: str) -> bool:
+    """DxfReader извлекает из обоих файлов одинаковые панели"""
+    return _panels(first) == _panels(second)
+
+
+def convert_files(paths: List[str], out_dir: str, verify: bool = False) -> List[Dict]:
+    """Перекодирует файлы в out_dir под теми же именами; out_dir может быть каталогом исходников"""
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    for path in paths:
+        result = to_binary(path, os.path.join(out_dir, os.path.basename(path)))
+        if verify and result['target'] is not None and result['target'] != path:
+            result['verified'] = same_panels(path, result['target'])
+        results.append(result)
+    return results
+
+
+def _best_time(func, repeat: int = REPEAT) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark(paths: List[str], repeat: int = REPEAT) -> List[Dict]:
+    """Размер и время разбора текстового и бинарного варианта каждого файла.
+
+    parse - ezdxf.readfile, read - полный DxfReader со всеми полями панелей;
+    время - лучшее из repeat запусков. Бинарные копии пишутся во временный
+    каталог.
+    """
+    from dxf_reader import DxfReader
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            if is_binary(path):
+                continue
+            binary = os.path.join(tmp, os.path.basename(path))
+            sizes = to_binary(path, binary)
+            result = {'file': path, 'ascii_bytes': sizes['ascii_bytes'], 'binary_bytes': sizes['binary_bytes']}
+            for kind, source in (('ascii', path), ('binary', binary)):
+                result[f'{kind}_parse'] = _best_time(lambda: ezdxf.readfile(source), repeat)
+                result[f'{kind}_read'] = _best_time(lambda: DxfReader(source).get_panels_data(), repeat)
+            results.append(result)
+    return results
+
+
+def format_benchmark(results: List[Dict]) -> str:
+    keys = ('ascii_bytes', 'binary_bytes', 'ascii_parse', 'binary_parse', 'ascii_read', 'binary_read')
+    rows = list(results)
+    if len(results) > 1:
+        rows.append(dict({key: sum(result[key] for result in results) for key in keys}, file='итого'))
+    lines = [f"{'файл':<24}{'текст, КБ':>11}{'бин, КБ':>10}{'сжатие':>8}"
+             f"{'разбор, мс':>18}{'DxfReader, мс':>20}"]
+    for row in rows:
+        lines.append(
+            f"{os.path.basename(row['file']):<24}{row['ascii_bytes'] / 1024:>11.1f}"
+            f"{row['binary_bytes'] / 1024:>10.1f}{row['ascii_bytes'] / row['binary_bytes']:>7.2f}x"
+            f"{row['ascii_parse'] * 1000:>9.1f} -> {row['binary_parse'] * 1000:<6.1f}"
+            f"{row['ascii_read'] * 1000:>11.1f} -> {row['binary_read'] * 1000:<6.1f}")
+    return '\n'.join(lines)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('convert', 'bench'):
+        print(USAGE)
+        sys.exit(1)
+
+    command, args = sys.argv[1], sys.argv[2:]
+    if command == 'bench':
+        print(format_benchmark(benchmark(args)))
+        return
+
+    out_dir = args.pop(0)
+    verify = '--verify' in args
+    if verify:
+        args.remove('--verify')
+    results = convert_files(args, out_dir, verify)
+    for result in results:
+        if result['target'] is None:
+            print(f"{result['source']}: уже бинарный")
+            continue
+        status = {True: ', панели совпадают', False: ', ПАНЕЛИ РАЗЛИЧАЮТСЯ'}.get(result.get('verified'), '')
+        print(f"{result['source']}: {result['ascii_bytes'] / 1024:.1f} -> "
+              f"{result['binary_bytes'] / 1024:.1f} КБ{status}")
+    if any(result.get('verified') is False for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
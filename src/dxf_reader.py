@@ -1,105 +1,205 @@
+import re
+import sys
 import ezdxf
 from typing import List, Tuple, Dict
 from geometry import Hole, Groove
+from contour import arc_to_bulge, build_loops, find_cutouts, segment_geometry
+from edge_banding import match_edges
+from fixed_point import point_mm, point_um, to_mm, to_um, to_um_array
+from labels import label_metadata, panel_labels
+from layer_rules import LayerRegistry
 
 class DxfReader:
-    STANDARD_OFFSET = 8.415  # Стандартный отступ кромки в мм
+    DEFAULT_THICKNESS = 18.0  # Толщина, если ее нет в имени блока
+    THICKNESS_PATTERN = re.compile(r'THICKNESS_(\d+(?:[._]\d+)?)$')
+    TOLERANCE_UM = 50  # допуск совпадения точек контура, мкм
 
-    def __init__(self, filename: str, debug: bool = False):
-        """Инициализация чтения DXF файла"""
+    # Поле панели -> шаги извлечения, без которых его не получить
+    FIELD_STEPS = {
+        'size': ('contour',),
+        'origin_point': (),
+        'contour_origin': ('contour',),
+        'contour': ('contour',),
+        'cutouts': ('contour', 'cutouts'),
+        'holes': ('holes',),
+        'grooves': ('grooves',),
+        'edges': ('contour', 'edges'),
+        'label': ('labels',),
+        'material': ('labels',),
+    }
+    STEP_ORDER = ('contour', 'cutouts', 'edges', 'holes', 'grooves', 'labels')
+
+    def __init__(self, filename: str, debug: bool = False, budget=None, layers: LayerRegistry = None):
+        """Инициализация чтения DXF файла.
+
+        budget - ResourceBudget с лимитами на файл, layers - правила смысла
+        слоев (по умолчанию - соглашения экспорта ABF).
+        """
         self.filename = filename
+        self.budget = budget
+        if budget is not None:
+            budget.start()
+            budget.check_file(filename)
         self.doc = ezdxf.readfile(filename)
+        if budget is not None:
+            budget.check_document(self.doc)
+        self.layers = layers or LayerRegistry()
+        self.layers.classify_document(self.doc)  # каждый слой разбирается один раз
         self.debug = debug
+        self.panel_thickness = {}  # handle INSERT'а панели -> толщина из имени родителя
+        self.panel_labels = None  # handle INSERT'а панели -> подписи ABF_LABEL, считается при первом запросе
         if self.debug:
-            print(f"\nОткрываем файл: {filename}")
+            print(f"\nОткрываем файл: {filename}", file=sys.stderr)
             self._print_structure()  # Выводим структуру файла
 
     def _print_structure(self):
-        """Выводит структуру DXF файла"""
-        print("\nСтруктура DXF файла:")
+        """Выводит структуру DXF файла (в stderr, как вся отладка)"""
+        print("\nСтруктура DXF файла:", file=sys.stderr)
         for block in self.doc.blocks:
-            print(f"Блок: {block.name}")
+            print(f"Блок: {block.name}", file=sys.stderr)
             for entity in block:
-                print(f"  - {entity.dxftype()} [layer: {entity.dxf.layer}]")
+                print(f"  - {entity.dxftype()} [layer: {entity.dxf.layer}]", file=sys.stderr)
                 if entity.dxftype() == 'INSERT':
                     try:
                         nested_block = self.doc.blocks[entity.dxf.name]
-                        print(f"    Вложенный блок {entity.dxf.name}:")
+                        print(f"    Вложенный блок {entity.dxf.name}:", file=sys.stderr)
                         for e in nested_block:
-                            print(f"      - {e.dxftype()} [layer: {e.dxf.layer}]")
+                            print(f"      - {e.dxftype()} [layer: {e.dxf.layer}]", file=sys.stderr)
                     except Exception as err:
-                        print(f"    Ошибка при доступе к блоку: {err}")
+                        print(f"    Ошибка при доступе к блоку: {err}", file=sys.stderr)
 
     def _debug_print(self, *args, **kwargs):
-        """Вывод отладочной информации"""
+        """Вывод отладочной информации в stderr, чтобы не смешивать его с выводом CLI"""
         if self.debug:
-            print("DEBUG:", *args, **kwargs)
+            print("DEBUG:", *args, file=sys.stderr, **kwargs)
 
-    def read(self) -> List[Dict]:
-        """Читает DXF файл и возвращает данные всех панелей"""
-        self.doc = ezdxf.readfile(self.filename)
-        return self.get_panels_data()
+    def read(self, fields=None) -> List[Dict]:
+        """Возвращает данные всех панелей уже прочитанного файла"""
+        return self.get_panels_data(fields)
 
-    def get_panels_data(self) -> List[Dict]:
-        """Получает данные о всех панелях"""
+    def plan_fields(self, fields=None) -> Tuple[List[str], List[str]]:
+        """Проверяет запрошенные поля и возвращает их вместе с минимальным набором шагов"""
+        fields = list(self.FIELD_STEPS) if fields is None else list(fields)
+        unknown = [field for field in fields if field not in self.FIELD_STEPS]
+        if unknown:
+            raise ValueError(f"Неизвестные поля: {', '.join(unknown)}; доступны: {', '.join(self.FIELD_STEPS)}")
+        needed = {step for field in fields for step in self.FIELD_STEPS[field]}
+        return fields, [step for step in self.STEP_ORDER if step in needed]
+
+    def get_panels_data(self, fields=None) -> List[Dict]:
+        """Получает данные о всех панелях (только поля fields, если они заданы)"""
+        fields, steps = self.plan_fields(fields)
         panels_data = []
-        panel_blocks = set()  # для уникальных блоков
+
+        # Анализируем каждую панель
+        for panel in self._find_panel_inserts():
+            if self.budget is not None:
+                self.budget.check()
+            self._debug_print(f"Анализ панели {panel.dxf.name}, точка вставки "
+                              f"({panel.dxf.insert.x}, {panel.dxf.insert.y})")
+            panel_data = self._analyze_panel(panel, fields, steps)
+            if panel_data:
+                panels_data.append(panel_data)
         
+        return panels_data
+
+    def _find_panel_inserts(self) -> set:
+        """Находит INSERT'ы блоков-панелей внутри вставок modelspace"""
+        panel_blocks = set()  # для уникальных блоков
+
         # Соираем все блои-панели и их INSERT'ы из modelspace
         for entity in self.doc.modelspace():
             if entity.dxftype() == 'INSERT':
                 block = self.doc.blocks[entity.dxf.name]
                 for e in block:
                     if e.dxftype() == 'INSERT' and (
-                        e.dxf.name.startswith('_______') or 
+                        e.dxf.name.startswith('_______') or
                         e.dxf.name.startswith('______')
                     ):
-                        print(f"DEBUG: Found panel block: {e.dxf.name}")
+                        self._debug_print(f"Найден блок панели: {e.dxf.name}")
                         panel_blocks.add(e)  # сохраняем сам INSERT
-        
-        # Анализируем каждую панель
-        for panel in panel_blocks:
-            print(f"DEBUG: Analyzing panel: {panel.dxf.name}")
-            print(f"DEBUG: Insert point: ({panel.dxf.insert.x}, {panel.dxf.insert.y})")
-            panel_data = self._analyze_panel(panel)
-            if panel_data:
-                panels_data.append(panel_data)
-        
-        return panels_data
+                        self.panel_thickness[e.dxf.handle] = self._parse_block_thickness(entity.dxf.name)
 
-    def _get_panel_blocks(self, thickness_block):
-        """Находит все блоки панелей"""
-        return [
-            entity for entity in thickness_block 
-            if entity.dxftype() == 'INSERT' and entity.dxf.name.startswith('_______')
-        ]
+        return panel_blocks
 
-    def _analyze_panel(self, panel) -> Dict:
-        """Анализирует панель и собирает все данные"""
+    def _parse_block_thickness(self, block_name: str) -> float:
+        """Толщина из имени блока: THICKNESS_18, ___18__THICKNESS_16, _4__THICKNESS_4"""
+        match = self.THICKNESS_PATTERN.search(block_name)
+        if not match:
+            return self.DEFAULT_THICKNESS
+        return float(match.group(1).replace('_', '.'))
+
+    def _analyze_panel(self, panel, fields=None, steps=None) -> Dict:
+        """Анализирует панель и собирает запрошенные поля"""
+        if steps is None:
+            fields, steps = self.plan_fields(fields)
         panel_block = self.doc.blocks[panel.dxf.name]
+        found = {}
         
         # Сначала находим контур
-        contour = self._get_panel_contour(panel_block)
+        if 'contour' in steps:
+            found['contour'] = self._get_panel_contour(panel_block)
         
         # Затем ищем все вырезы
-        cutouts = self._get_cutouts(panel_block, contour)
-        
-        return {
-            "name": panel.dxf.name,
-            "size": {
-                "width": contour['width'],
-                "height": contour['height'],
-                "thickness": 18.0
+        if 'cutouts' in steps:
+            found['cutouts'] = self._get_cutouts(panel_block, found['contour'])
+
+        # Кромки по треугольникам ABF_EDGEBANDING
+        if 'edges' in steps:
+            found['edges'] = self._get_edge_banding(panel_block, found['contour'])
+
+        # Отверстия и пазы в координатах блока, x зеркалится, как у контура
+        thickness = self.panel_thickness.get(panel.dxf.handle, self.DEFAULT_THICKNESS)
+        if 'holes' in steps:
+            found['holes'] = self._get_holes(panel_block, (0, 0), thickness)
+        if 'grooves' in steps:
+            found['grooves'] = self._get_grooves(panel_block, (0, 0))
+
+        # Подписи относятся к панелям одним пространственным соединением на весь файл
+        if 'labels' in steps:
+            if self.panel_labels is None:
+                self.panel_labels = panel_labels(self.doc, self.layers, self.budget)
+            found['labels'] = label_metadata(self.panel_labels.get(panel.dxf.handle, []))
+
+        # Внутри все в микрометрах, в миллиметры переводится только результат
+        contour = found.get('contour')
+        values = {
+            "size": lambda: {
+                "width": to_mm(contour['width']),
+                "height": to_mm(contour['height']),
+                "thickness": thickness
             },
-            "origin_point": (round(panel.dxf.insert.x, 1), round(panel.dxf.insert.y, 1)),
-            "cutouts": cutouts,
-            "holes": [],  # Добавляем пустые списки для остальных элементов
-            "grooves": [],
-            "edges": []
+            "origin_point": lambda: point_mm(point_um(panel.dxf.insert.x, panel.dxf.insert.y)),
+            "contour_origin": lambda: point_mm(contour['origin']),  # левый нижний угол контура в координатах блока
+            "contour": lambda: [
+                {'start': point_mm(line['start']), 'end': point_mm(line['end']), 'bulge': line['bulge']}
+                for line in contour['lines']
+            ],
+            "cutouts": lambda: [self._cutout_mm(cutout) for cutout in found['cutouts']],
+            "holes": lambda: [
+                {'center': (to_mm(abs(hole.center[0])), to_mm(hole.center[1])),
+                 'diameter': to_mm(hole.diameter), 'depth': to_mm(hole.depth)}
+                for hole in found['holes']
+            ],
+            "grooves": lambda: [
+                {'start': (to_mm(abs(groove.start[0])), to_mm(groove.start[1])),
+                 'end': (to_mm(abs(groove.end[0])), to_mm(groove.end[1])),
+                 'width': to_mm(groove.width), 'depth': to_mm(groove.depth)}
+                for groove in found['grooves']
+            ],
+            "edges": lambda: [self._edge_mm(edge) for edge in found['edges']],
+            "label": lambda: found['labels'],  # наименование, материал, заказ из подписей
+            # материал на верхнем уровне читают раскрой, итоги кромки и отпечатки
+            "material": lambda: found['labels']['material'] or ''
         }
+        panel_data = {"name": panel.dxf.name}
+        for field, value in values.items():
+            if field in fields:
+                panel_data[field] = value()
+        return panel_data
 
-    def _get_holes(self, panel_block, origin_point) -> List[Hole]:
-        """Получает данные об отврстиях панели"""
+    def _get_holes(self, panel_block, origin_point, thickness: float = DEFAULT_THICKNESS) -> List[Hole]:
+        """Получает данные об отврстиях панели (в микрометрах); сквозные - на толщину панели"""
         holes = []
         
         for entity in panel_block:
@@ -108,315 +208,104 @@ class DxfReader:
                 group_insert = (entity.dxf.insert.x, entity.dxf.insert.y)
                 
                 for e in group_block:
-                    if e.dxftype() == 'CIRCLE' and 'DEPTH' in e.dxf.layer:
-                        center_x = round(e.dxf.center.x + group_insert[0] + origin_point[0], 1)
-                        center_y = round(e.dxf.center.y + group_insert[1] + origin_point[1], 1)
-                        
+                    layer = self.layers.classify(e.dxf.layer)
+                    if e.dxftype() == 'CIRCLE' and layer['kind'] == 'hole':
                         holes.append(Hole(
-                            center=(center_x, center_y),
-                            diameter=round(e.dxf.radius * 2, 1),
-                            depth=self._parse_hole_depth(e.dxf.layer)
+                            center=point_um(e.dxf.center.x + group_insert[0] + origin_point[0],
+                                            e.dxf.center.y + group_insert[1] + origin_point[1]),
+                            diameter=to_um(e.dxf.radius * 2),
+                            depth=to_um(self._hole_depth(layer, thickness))
                         ))
         
         return holes
 
-    def _parse_hole_depth(self, layer):
-        """Определяет глубину отверстия по слою"""
-        if 'DEPTHF' in layer:
-            return 18.0  # сквозное
-        elif 'DEPTH' in layer:
-            depth_str = layer.split('DEPTH')[1].split('_')[0]
-            try:
-                return float(depth_str)
-            except ValueError:
-                return 0.0
-        return 0.0
-
-    def _print_file_structure(self):
-        """Выводит древовидную структуру DXF файла"""
-        print("\nСтруктура DXF файла:")
-        
-        # Собираем уникальные блоки по слоям
-        layers_blocks = {}
-        
-        for block in self.doc.blocks:
-            # Пропускаем служебные блоки
-            if block.name.startswith('*'): continue
-            
-            # Определяем слой блока по его содержимому
-            block_layer = '0'  # слой по уолчанию
-            for entity in block:
-                if entity.dxf.layer != '0':
-                    block_layer = entity.dxf.layer
-                    break
-            
-            if block_layer not in layers_blocks:
-                layers_blocks[block_layer] = set()
-            layers_blocks[block_layer].add(block.name)
-        
-        # Выводим структуру
-        for layer, blocks in layers_blocks.items():
-            print(f"\n├── [{layer}]")
-            for block_name in sorted(blocks):
-                block = self.doc.blocks[block_name]
-                print(f"│   └── Block {block_name}")
-                
-                # Показываем типы элементов в блоке (без повторов)
-                entities = set()
-                for entity in block:
-                    if entity.dxftype() == 'LINE':
-                        entities.add('Lines')
-                    elif entity.dxftype() == 'INSERT':
-                        entities.add(f"Insert: {entity.dxf.name}")
-                    else:
-                        entities.add(entity.dxftype())
-                
-                if entities:
-                    for entity in sorted(entities):
-                        print(f"│       └── {entity}")
-
-    def _analyze_special_elements(self, panel_block, origin_point):
-        """Анализирует специальные элементы панели (отверстия, пазы)"""
-        elements = {
-            'holes': [],
-            'grooves': [],
-            'edges': []
-        }
-        
+    @staticmethod
+    def _edge_mm(edge: Dict) -> Dict:
+        """Кромка из микрометров в миллиметры"""
+        return dict(edge, thickness=to_mm(edge['thickness']), length=to_mm(edge['length']),
+                    coordinates={'start': point_mm(edge['coordinates']['start']),
+                                 'end': point_mm(edge['coordinates']['end'])})
+
+    @staticmethod
+    def _cutout_mm(cutout: Dict) -> Dict:
+        """Вырез из микрометров в миллиметры"""
+        return dict(
+            cutout,
+            size={'x': to_mm(cutout['size']['x']), 'y': to_mm(cutout['size']['y'])},
+            position={'x': to_mm(cutout['position']['x']), 'y': to_mm(cutout['position']['y'])},
+            entry_points=[point_mm(point) for point in cutout['entry_points']],
+            points=[point_mm(point) for point in cutout['points']],
+            radius=to_mm(cutout['radius']) if cutout['radius'] else None
+        )
+
+    def _hole_depth(self, layer: Dict, thickness: float = DEFAULT_THICKNESS) -> float:
+        """Глубина отверстия по разобранному слою; сквозное - на толщину панели"""
+        if layer.get('through'):
+            return thickness
+        return layer.get('depth', 0.0)
+
+    def _analyze_edge(self, entity, group_insert):
+        """Треугольник кромки в координатах блока панели, мкм (x зеркалится, как у контура)"""
+        tip, base1, base2 = [
+            point_um(abs(vertex.dxf.location[0] + group_insert[0]), vertex.dxf.location[1] + group_insert[1])
+            for vertex in list(entity.vertices)[:3]
+        ]
+        return {'tip': tip, 'base1': base1, 'base2': base2}
+
+    def _get_panel_body(self, panel_block) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """Ребра тела панели (чистовой размер) в микрометрах - собственные LINE и POLYLINE блока"""
+        segments = []
+        for entity in panel_block:
+            if entity.dxftype() == 'LINE':
+                points = [entity.dxf.start, entity.dxf.end]
+            elif entity.dxftype() == 'POLYLINE' and (entity.is_2d_polyline or entity.is_3d_polyline):
+                # у сеток (polyface) среди вершин есть записи граней, их пропускаем
+                points = [vertex.dxf.location for vertex in entity.vertices]
+                if entity.is_closed:
+                    points.append(points[0])
+            else:
+                continue
+            for a, b in zip(points, points[1:]):
+                start = point_um(abs(a[0]), a[1])
+                end = point_um(abs(b[0]), b[1])
+                if start != end:  # вертикальные ребра тела в плане вырождаются в точку
+                    segments.append((start, end))
+        return segments
+
+    def _get_edge_banding(self, panel_block, contour) -> List[Dict]:
+        """Кромки панели: ребро контура, сторона, толщина и длина"""
+        triangles = []
         for entity in panel_block:
             if entity.dxftype() == 'INSERT' and entity.dxf.name.startswith('GROUP'):
-                group_block = self.doc.blocks[entity.dxf.name]
                 group_insert = (entity.dxf.insert.x, entity.dxf.insert.y)
-                
-                for e in group_block:
-                    # Анализ отверстий
-                    if e.dxftype() == 'CIRCLE' and 'DEPTH' in e.dxf.layer:
-                        center_x = round(e.dxf.center.x + group_insert[0] + origin_point[0], 1)
-                        center_y = round(e.dxf.center.y + group_insert[1] + origin_point[1], 1)
-                        elements['holes'].append({
-                            'center': (center_x, center_y),
-                            'diameter': round(e.dxf.radius * 2, 1),
-                            'depth': self._parse_hole_depth(e.dxf.layer)
-                        })
-                    
-                    # Анализ пазов
-                    elif e.dxftype() == 'LINE' and e.dxf.layer == 'PAZ_DEPTH8_0':
-                        start_x = round(e.dxf.start.x + group_insert[0] + origin_point[0], 1)
-                        start_y = round(e.dxf.start.y + group_insert[1] + origin_point[1], 1)
-                        end_x = round(e.dxf.end.x + group_insert[0] + origin_point[0], 1)
-                        end_y = round(e.dxf.end.y + group_insert[1] + origin_point[1], 1)
-                        elements['grooves'].append({
-                            'start': (start_x, start_y),
-                            'end': (end_x, end_y),
-                            'width': 8.0,
-                            'depth': 8.0
-                        })
-                    
-                    # Анализ кромок
-                    elif e.dxftype() == 'POLYLINE' and e.dxf.layer == 'ABF_EDGEBANDING':
-                        vertices = list(e.vertices)
-                        if len(vertices) == 4:
-                            elements['edges'].append(self._analyze_edge(e, group_insert, origin_point))
-        
-        return elements
-
-    def _analyze_edge(self, entity, group_insert, origin_point):
-        """Анализирует кромку"""
-        vertices = list(entity.vertices)
-        tip = vertices[0].dxf.location
-        base1 = vertices[1].dxf.location
-        base2 = vertices[2].dxf.location
-        
-        # Преобразуем в абсолютные координаты
-        tip_x = round(tip[0] + group_insert[0] + origin_point[0], 1)
-        tip_y = round(tip[1] + group_insert[1] + origin_point[1], 1)
-        base1_x = round(base1[0] + group_insert[0] + origin_point[0], 1)
-        base1_y = round(base1[1] + group_insert[1] + origin_point[1], 1)
-        base2_x = round(base2[0] + group_insert[0] + origin_point[0], 1)
-        base2_y = round(base2[1] + group_insert[1] + origin_point[1], 1)
-        
-        return {
-            'thickness': round(self._calculate_edge_thickness(tip_x), 1),
-            'coordinates': {
-                'tip': (tip_x, tip_y),
-                'base1': (base1_x, base1_y),
-                'base2': (base2_x, base2_y)
-            }
-        }
+                for e in self.doc.blocks[entity.dxf.name]:
+                    if (e.dxftype() == 'POLYLINE' and len(e) == 4
+                            and self.layers.classify(e.dxf.layer)['kind'] == 'edge_banding'):
+                        triangles.append(self._analyze_edge(e, group_insert))
 
-    def _parse_hole_depth(self, layer):
-        """Определяет глубину отверстия по слою"""
-        if 'DEPTHF' in layer:
-            return 18.0  # сквозное
-        elif 'DEPTH' in layer:
-            depth_str = layer.split('DEPTH')[1].split('_')[0]
-            try:
-                return float(depth_str)
-            except ValueError:
-                return 0.0
-        return 0.0
-
-    def analyze_and_log(self):
-        """Анализирует и выводит информацию о панелях"""
-        panels_data = self.get_panels_data()
-        
-        print(f"\nНайдено панелей: {len(panels_data)}")
-        
-        for panel in panels_data:
-            print(f"\nПанель: {panel['name']}")
-            print(f"  Размеры: {panel['size']['width']}x{panel['size']['height']}x{panel['size']['thickness']} мм")
-            print(f"  Точка вставки: {panel['origin_point']}")
-            
-            if panel.get('cutouts'):
-                print("  Вырезы:")
-                for cutout in panel['cutouts']:
-                    edge_info = f" ({cutout['edge']})" if 'edge' in cutout else ""
-                    print(f"    - {cutout['type']}{edge_info}:")
-                    print(f"      Размер: {cutout['size']['x']}x{cutout['size']['y']} мм")
-                    print(f"      Позиция: {cutout['position']['x']}, {cutout['position']['y']}")
-
-    def _get_edges(self, panel_block) -> List[Dict]:
-        """Получает данные о кромках"""
-        edges = []
-        
-        self._debug_print("\nПоиск кромок:")
-        
-        # Ищем блок GROUP34_1 (там обычно кромки)
-        for entity in panel_block:
-            if entity.dxftype() == 'INSERT' and entity.dxf.name == 'GROUP34_1':
-                block = self.doc.blocks[entity.dxf.name]
-                
-                for e in block:
-                    if e.dxf.layer == 'ABF_EDGEBANDING':
-                        if e.dxftype() == 'POLYLINE':
-                            points = []
-                            for vertex in e.vertices:
-                                x = round(abs(vertex.dxf.location[0]), 2)
-                                y = round(vertex.dxf.location[1], 2)
-                                points.append((x, y))
-                            
-                            if len(points) >= 2:
-                                edge = {
-                                    'start': points[0],
-                                    'end': points[-1],
-                                    'points': points
-                                }
-                                edges.append(edge)
-                                self._debug_print(f"Найдена кромка: {edge}")
-        
+        edges = match_edges(
+            triangles,
+            contour['lines'],
+            self._get_panel_body(panel_block)
+        )
+        for edge in edges:
+            self._debug_print(f"Найдена кромка {edge['side']}: {edge['thickness']} мм, {edge['length']} мм")
         return edges
 
     def _get_cutouts(self, panel_block, contour) -> List[Dict]:
-        """Находит все вырезы на панели"""
-        cutouts = []
-        tolerance = 1.0  # допуск для определения края
-        min_size = 5.0   # минимальный размер выреза
-        
+        """Находит все вырезы на панели по замкнутым контурам ABF_CUTTINGLINES"""
         self._debug_print("\nПоиск вырезов в панели:")
         self._debug_print(f"Размеры контура: {contour['width']}x{contour['height']}")
-        
-        # Временное хранилище для проверки дубликатов
-        seen_cutouts = set()
-        
-        for entity in panel_block:
-            if entity.dxftype() == 'INSERT':
-                try:
-                    block = self.doc.blocks[entity.dxf.name]
-                    for e in block:
-                        if e.dxf.layer == 'ABF_EDGEBANDING':
-                            points = []
-                            
-                            # Получаем точки в зависимости от типа полилинии
-                            if hasattr(e, 'vertices'):
-                                for vertex in e.vertices:
-                                    # Нормализуем координаты относительно панели
-                                    x = round(abs(vertex.dxf.location[0] + entity.dxf.insert.x), 2)
-                                    y = round(vertex.dxf.location[1] + entity.dxf.insert.y, 2)
-                                    points.append((x, y))
-                            elif hasattr(e, 'get_points'):
-                                for point in e.get_points():
-                                    x = round(abs(point[0] + entity.dxf.insert.x), 2)
-                                    y = round(point[1] + entity.dxf.insert.y, 2)
-                                    points.append((x, y))
-                            
-                            if points:
-                                # Определяем размеры
-                                x_coords = [p[0] for p in points]
-                                y_coords = [p[1] for p in points]
-                                min_x, max_x = min(x_coords), max(x_coords)
-                                min_y, max_y = min(y_coords), max(y_coords)
-                                size_x = round(max_x - min_x, 2)
-                                size_y = round(max_y - min_y, 2)
-                                
-                                # Проверяем размер
-                                if size_x > min_size or size_y > min_size:
-                                    # Нормализуем координаты относительно размеров панели
-                                    normalized_x = round(min_x - contour.get('origin_x', 0), 2)
-                                    normalized_y = round(min_y - contour.get('origin_y', 0), 2)
-                                    
-                                    # Определяем тип выреза
-                                    is_edge = (
-                                        normalized_x <= tolerance or  # левый край
-                                        normalized_x + size_x >= contour['width'] - tolerance or  # правый край
-                                        normalized_y <= tolerance or  # нижний край
-                                        normalized_y + size_y >= contour['height'] - tolerance  # верхний край
-                                    )
-                                    
-                                    # Создаем ключ для проверки дубликатов
-                                    cutout_key = f"{size_x}_{size_y}_{normalized_x}_{normalized_y}"
-                                    
-                                    if cutout_key not in seen_cutouts:
-                                        cutout = {
-                                            'type': 'edge' if is_edge else 'inner',
-                                            'size': {'x': size_x, 'y': size_y},
-                                            'position': {
-                                                'x': normalized_x,
-                                                'y': normalized_y
-                                            }
-                                        }
-                                        
-                                        # Определяем положение для краевых вырезов
-                                        if is_edge:
-                                            if normalized_x <= tolerance:
-                                                cutout['edge'] = 'left'
-                                            elif normalized_x + size_x >= contour['width'] - tolerance:
-                                                cutout['edge'] = 'right'
-                                            elif normalized_y <= tolerance:
-                                                cutout['edge'] = 'bottom'
-                                            else:
-                                                cutout['edge'] = 'top'
-                                        
-                                        cutouts.append(cutout)
-                                        seen_cutouts.add(cutout_key)
-                
-                except Exception as err:
-                    self._debug_print(f"Ошибка при обработке блока: {err}")
-        
-        return cutouts
 
-    def _get_panel_dimensions(self, panel_block) -> Tuple[float, float]:
-        """Определяет размеры панели по крайним точкам"""
-        min_x = min_y = float('inf')
-        max_x = max_y = float('-inf')
-        
-        for entity in panel_block:
-            if entity.dxftype() == 'LINE':
-                points = [(entity.dxf.start.x, entity.dxf.start.y),
-                         (entity.dxf.end.x, entity.dxf.end.y)]
-                for x, y in points:
-                    min_x = min(min_x, x)
-                    max_x = max(max_x, x)
-                    min_y = min(min_y, y)
-                    max_y = max(max_y, y)
-        
-        if min_x != float('inf'):
-            width = round(max_x - min_x, 1)
-            height = round(max_y - min_y, 1)
-            return width, height
-        return None, None
+        segments = [(line['start'], line['end'], line.get('bulge', 0.0)) for line in contour['lines']]
+        _, cutouts = find_cutouts(build_loops(segments, self.TOLERANCE_UM), self.TOLERANCE_UM)
+
+        for cutout in cutouts:
+            self._debug_print(f"Найден вырез {cutout['type']}: {cutout['size']} в {cutout['position']}")
+        return cutouts
 
     def _get_grooves(self, panel_block, origin_point) -> List[Groove]:
-        """Получает данные о пазах панели"""
+        """Получает данные о пазах панели (в микрометрах)"""
         grooves = []
         
         for entity in panel_block:
@@ -425,140 +314,23 @@ class DxfReader:
                 group_insert = (entity.dxf.insert.x, entity.dxf.insert.y)
                 
                 for e in group_block:
-                    if e.dxftype() == 'LINE' and e.dxf.layer == 'PAZ_DEPTH8_0':
-                        start_x = round(e.dxf.start.x + group_insert[0] + origin_point[0], 1)
-                        start_y = round(e.dxf.start.y + group_insert[1] + origin_point[1], 1)
-                        end_x = round(e.dxf.end.x + group_insert[0] + origin_point[0], 1)
-                        end_y = round(e.dxf.end.y + group_insert[1] + origin_point[1], 1)
-                        
+                    layer = self.layers.classify(e.dxf.layer)
+                    if e.dxftype() == 'LINE' and layer['kind'] == 'groove':
                         grooves.append(Groove(
-                            start=(start_x, start_y),
-                            end=(end_x, end_y),
-                            width=8.0,  # стандартная ширина паза
-                            depth=8.0   # стандатная глубина паза
+                            start=point_um(e.dxf.start.x + group_insert[0] + origin_point[0],
+                                           e.dxf.start.y + group_insert[1] + origin_point[1]),
+                            end=point_um(e.dxf.end.x + group_insert[0] + origin_point[0],
+                                         e.dxf.end.y + group_insert[1] + origin_point[1]),
+                            width=to_um(layer['width']),
+                            depth=to_um(layer['depth'])
                         ))
         
         return grooves
 
-    def _get_edge_cutouts(self, panel_block, panel_outline) -> List[Dict]:
-        """Находит вырезы по краям панели"""
-        cutouts = []
-        tolerance = 0.1  # допуск для соединения линий
-        
-        # Собираем все короткие линии
-        short_lines = []
-        for entity in panel_block:
-            if entity.dxftype() == 'LINE':
-                start = (round(abs(entity.dxf.start[0]), 2), round(entity.dxf.start[1], 2))
-                end = (round(abs(entity.dxf.end[0]), 2), round(entity.dxf.end[1], 2))
-                length = ((end[0]-start[0])**2 + (end[1]-start[1])**2)**0.5
-                
-                # Если линия короче основных сторон панели
-                if length < min([line['length'] for line in panel_outline]):
-                    short_lines.append({'start': start, 'end': end, 'length': length})
-        
-        # Объединяем поледовательные линии
-        connected_lines = []
-        current_line = None
-        
-        for line in sorted(short_lines, key=lambda x: (x['start'][0], x['start'][1])):
-            if not current_line:
-                current_line = line
-                continue
-            
-            # Если конец текущей линии совпадает с началом следующей
-            if (abs(current_line['end'][0] - line['start'][0]) <= tolerance and
-                abs(current_line['end'][1] - line['start'][1]) <= tolerance):
-                # Объединяем линии
-                current_line = {
-                    'start': current_line['start'],
-                    'end': line['end'],
-                    'length': current_line['length'] + line['length']
-                }
-            else:
-                connected_lines.append(current_line)
-                current_line = line
-        
-        if current_line:
-            connected_lines.append(current_line)
-        
-        # Определяем радиусы скругления
-        for i in range(len(connected_lines)-1):
-            line1 = connected_lines[i]
-            line2 = connected_lines[i+1]
-            
-            # Если линии перпендикулярны
-            v1 = (line1['end'][0]-line1['start'][0], line1['end'][1]-line1['start'][1])
-            v2 = (line2['end'][0]-line2['start'][0], line2['end'][1]-line2['start'][1])
-            if abs(v1[0]*v2[0] + v1[1]*v2[1]) <= tolerance:  # скалярное произведение близко к 0
-                radius = min(line1['length'], line2['length']) / 2
-                cutouts.append({
-                    'type': 'edge',
-                    'start': line1['start'],
-                    'corner': line1['end'],
-                    'end': line2['end'],
-                    'radius': round(radius, 2)
-                })
-        
-        return cutouts
-
-    def _get_panel_outline(self, panel_block) -> List[List[float]]:
-        """Находит осноной прямоугольник панели по самым длинным линиям"""
-        lines = []
-        
-        for entity in panel_block:
-            if entity.dxftype() == 'LINE':
-                start = (round(abs(entity.dxf.start[0]), 2), round(entity.dxf.start[1], 2))
-                end = (round(abs(entity.dxf.end[0]), 2), round(entity.dxf.end[1], 2))
-                length = ((end[0]-start[0])**2 + (end[1]-start[1])**2)**0.5
-                lines.append({'start': start, 'end': end, 'length': length})
-        
-        # Сортируем по длине и берем 4 самые длинные линии
-        longest_lines = sorted(lines, key=lambda x: x['length'], reverse=True)[:4]
-        return longest_lines
-
-    def _get_inner_cutouts(self, panel_block, panel_outline) -> List[Dict]:
-        """Находит вырезы внутри панели"""
-        cutouts = []
-        
-        # Находим замкнутые полилинии внутри панели
-        for entity in panel_block:
-            if entity.dxftype() in ['POLYLINE', 'LWPOLYLINE']:
-                points = []
-                if hasattr(entity, 'vertices'):
-                    points = [(round(abs(v.dxf.location[0]), 2), round(v.dxf.location[1], 2)) 
-                             for v in entity.vertices]
-                elif hasattr(entity, 'get_points'):
-                    points = [(round(abs(p[0]), 2), round(p[1], 2)) 
-                             for p in entity.get_points()]
-                
-                if points and len(points) > 2:
-                    # Проверяем, что все точки внутри панели
-                    panel_bounds = {
-                        'min_x': min(l['start'][0] for l in panel_outline),
-                        'max_x': max(l['end'][0] for l in panel_outline),
-                        'min_y': min(l['start'][1] for l in panel_outline),
-                        'max_y': max(l['end'][1] for l in panel_outline)
-                    }
-                    
-                    is_inner = all(
-                        panel_bounds['min_x'] < p[0] < panel_bounds['max_x'] and
-                        panel_bounds['min_y'] < p[1] < panel_bounds['max_y']
-                        for p in points
-                    )
-                    
-                    if is_inner:
-                        cutouts.append({
-                            'type': 'inner',
-                            'points': points
-                        })
-        
-        return cutouts
-
     def _get_panel_contour(self, panel_block) -> Dict:
-        """Находит основной контур панели"""
-        lines = []
-        
+        """Находит основной контур панели вместе с дугами (bulge, ARC, CIRCLE), в микрометрах"""
+        segments = []  # (начало, конец, bulge)
+
         self._debug_print("\nПоиск контура панели:")
         
         # Ищем блок с контуром (обычно в GROUP33_1 в слое ABF_CUTTINGLINES)
@@ -570,40 +342,70 @@ class DxfReader:
                 for e in block:
                     self._debug_print(f"Сущность: {e.dxftype()} в слое {e.dxf.layer}")
                     
-                    # Ищем в слое ABF_CUTTINGLINES
-                    if e.dxf.layer == 'ABF_CUTTINGLINES':
+                    # Ищем в слое контура (ABF_CUTTINGLINES)
+                    if self.layers.classify(e.dxf.layer)['kind'] == 'contour':
                         if e.dxftype() == 'POLYLINE':
                             self._debug_print("Найдена полилиния контура")
-                            # Собираем все точки полилинии
-                            points = []
-                            for vertex in e.vertices:
-                                x = round(abs(vertex.dxf.location[0]), 2)
-                                y = round(vertex.dxf.location[1], 2)
-                                points.append((x, y))
-                            
-                            # Создаем линии из точек
-                            for i in range(len(points)):
-                                start = points[i]
-                                end = points[(i + 1) % len(points)]  # закольцовываем на первую точку
-                                length = ((end[0]-start[0])**2 + (end[1]-start[1])**2)**0.5
-                                lines.append({
-                                    'start': start,
-                                    'end': end,
-                                    'length': round(length, 2)
-                                })
-                                self._debug_print(f"Добавлена линия контура: {start} -> {end}")
-        
-        if not lines:
+                            # Собираем все вершины полилинии вместе с bulge
+                            vertices = [
+                                (vertex.dxf.location[0], vertex.dxf.location[1], vertex.dxf.bulge)
+                                for vertex in e.vertices
+                            ]
+                            # Создаем ребра из вершин; на первую закольцовываем
+                            # только замкнутую полилинию
+                            count = len(vertices) if e.is_closed else len(vertices) - 1
+                            for i in range(count):
+                                x0, y0, bulge = vertices[i]
+                                x1, y1, _ = vertices[(i + 1) % len(vertices)]
+                                segments.append(((x0, y0), (x1, y1), bulge))
+                        elif e.dxftype() == 'LINE':
+                            segments.append(((e.dxf.start[0], e.dxf.start[1]),
+                                             (e.dxf.end[0], e.dxf.end[1]), 0.0))
+                        elif e.dxftype() == 'ARC':
+                            segments.append(arc_to_bulge((e.dxf.center[0], e.dxf.center[1]), e.dxf.radius,
+                                                         e.dxf.start_angle, e.dxf.end_angle))
+                        elif e.dxftype() == 'CIRCLE':
+                            # окружность - две полуокружности с bulge = 1
+                            cx, cy, r = e.dxf.center[0], e.dxf.center[1], e.dxf.radius
+                            segments.append(((cx + r, cy), (cx - r, cy), 1.0))
+                            segments.append(((cx - r, cy), (cx + r, cy), 1.0))
+        
+        if not segments:
             raise ValueError("Не найден контур панели!")
-            
-        # Находим размеры панели
-        x_coords = [p[0] for line in lines for p in [line['start'], line['end']]]
-        y_coords = [p[1] for line in lines for p in [line['start'], line['end']]]
-        
-        width = round(max(x_coords) - min(x_coords), 2)
-        height = round(max(y_coords) - min(y_coords), 2)
+
+        # Координаты переводятся в микрометры один раз, пакетом. Зеркалим
+        # отрицательные x, как и остальные координаты панели; зеркальное
+        # отражение меняет направление дуги
+        coordinates = to_um_array([value for start, end, _ in segments
+                                   for value in (abs(start[0]), start[1], abs(end[0]), end[1])])
+        coordinates = [int(value) for value in coordinates]
+        lines = []
+        for i, (start, end, bulge) in enumerate(segments):
+            if start[0] < 0 or end[0] < 0:
+                bulge = -bulge
+            x0, y0, x1, y1 = coordinates[4 * i:4 * i + 4]
+            if (x0, y0) == (x1, y1):
+                continue  # вырожденное ребро: повтор вершины или закрывающая вершина
+            lines.append({'start': (x0, y0), 'end': (x1, y1), 'bulge': bulge})
+        if not lines:
+            raise ValueError("Контур панели вырожден!")
+
+        # Длины, радиусы и габариты всех ребер считаются точно и разом
+        geometry = segment_geometry(
+            [line['start'][0] for line in lines], [line['start'][1] for line in lines],
+            [line['end'][0] for line in lines], [line['end'][1] for line in lines],
+            [line['bulge'] for line in lines]
+        )
+        for i, line in enumerate(lines):
+            line['length'] = int(round(float(geometry['length'][i])))
+            line['radius'] = int(round(float(geometry['radius'][i]))) if line['bulge'] else None
+            self._debug_print(f"Добавлена линия контура: {line['start']} -> {line['end']}")
+
+        # Находим размеры панели с учетом выпуклости дуг (у прямых ребер - точно целые)
+        min_x, min_y = int(round(float(min(geometry['min_x'])))), int(round(float(min(geometry['min_y']))))
+        width = int(round(float(max(geometry['max_x'])))) - min_x
+        height = int(round(float(max(geometry['max_y'])))) - min_y
+        origin = (min_x, min_y)
         
         self._debug_print(f"Найден контур: {width}x{height}")
-        return {'width': width, 'height': height, 'lines': lines}
-
-    # ... остальые вспомогательные методы (_get_holes, _get_grooves, _get_edges, etc.)
+        return {'width': width, 'height': height, 'origin': origin, 'lines': lines}
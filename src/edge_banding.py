@@ -0,0 +1,170 @@
+import sys
+from math import hypot
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from contour import segment_geometry
+
+Point = Tuple[float, float]
+Segment = Tuple[Point, Point]
+
+# Координаты и толщины - целые микрометры, как внутри DxfReader
+STANDARD_THICKNESSES = (400, 800, 1000, 2000)  # типовые толщины кромки, мкм
+SNAP_TOLERANCE = 50  # измеренная толщина ближе этого приводится к типовой
+SIDE_TOLERANCE = 50  # допуск попадания ребра контура на сторону габарита
+
+
+def _distance_matrix(points: List[Point], segments: List[Segment]):
+    """Расстояния от каждой точки до каждого отрезка (points x segments)"""
+    if np is None:
+        matrix = []
+        for px, py in points:
+            row = []
+            for (ax, ay), (bx, by) in segments:
+                dx, dy = bx - ax, by - ay
+                length2 = dx * dx + dy * dy
+                t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+                row.append(hypot(px - ax - t * dx, py - ay - t * dy))
+            matrix.append(row)
+        return matrix
+
+    p = np.asarray(points, dtype=float).reshape(-1, 1, 2)
+    s = np.asarray(segments, dtype=float).reshape(1, -1, 2, 2)
+    a, b = s[..., 0, :], s[..., 1, :]
+    d = b - a
+    length2 = (d ** 2).sum(-1)
+    t = np.clip(((p - a) * d).sum(-1) / np.where(length2 == 0, 1.0, length2), 0.0, 1.0)
+    return np.hypot(*np.moveaxis(p - a - t[..., None] * d, -1, 0))
+
+
+def _argmin_rows(matrix) -> List[int]:
+    if np is not None:
+        return list(np.argmin(matrix, axis=1))
+    return [min(range(len(row)), key=row.__getitem__) for row in matrix]
+
+
+def _min_rows(matrix) -> List[float]:
+    if np is not None:
+        return [float(v) for v in np.min(matrix, axis=1)]
+    return [min(row) for row in matrix]
+
+
+def snap_thickness(value: float) -> int:
+    """Приводит измеренную толщину (мкм) к типовой, если она достаточно близко"""
+    value = int(round(value))
+    for standard in STANDARD_THICKNESSES:
+        if abs(value - standard) <= SNAP_TOLERANCE:
+            return standard
+    return value
+
+
+def _side(segment: Segment, bounds) -> str:
+    """Сторона габарита контура, на которой лежит ребро"""
+    (x0, y0), (x1, y1) = segment
+    min_x, min_y, max_x, max_y = bounds
+    for side, a, b, edge in (('left', x0, x1, min_x), ('right', x0, x1, max_x)):
+        if abs(a - edge) <= SIDE_TOLERANCE and abs(b - edge) <= SIDE_TOLERANCE:
+            return side
+    for side, a, b, edge in (('bottom', y0, y1, min_y), ('top', y0, y1, max_y)):
+        if abs(a - edge) <= SIDE_TOLERANCE and abs(b - edge) <= SIDE_TOLERANCE:
+            return side
+    return 'contour'  # ребро выреза или скругления
+
+
+def match_edges(triangles: List[Dict], contour: List[Dict], body: List[Segment]) -> List[Dict]:
+    """Сопоставляет треугольники кромки ребрам контура за один проход.
+
+    contour - ребра контура DxfReader (start, end, bulge и точная длина
+    length). Вершина треугольника смотрит на кромкуемое ребро, поэтому
+    ребро - ближайший к вершине отрезок контура. Толщина кромки - зазор
+    между серединой ребра реза и контуром тела панели (чистовой размер).
+    Длина кромки - длина ребра по дуге, габарит для сторон учитывает
+    выпуклость дуг. Несколько треугольников на одном ребре дают одну
+    кромку. Координаты, толщина и длина - целые микрометры.
+    """
+    if not triangles or not contour:
+        return []
+
+    segments = [(line['start'], line['end']) for line in contour]
+    tips = [triangle['tip'] for triangle in triangles]
+    nearest = _argmin_rows(_distance_matrix(tips, segments))
+    matched = sorted(set(int(i) for i in nearest))
+
+    midpoints = [((segments[i][0][0] + segments[i][1][0]) / 2, (segments[i][0][1] + segments[i][1][1]) / 2)
+                 for i in matched]
+    gaps = _min_rows(_distance_matrix(midpoints, body)) if body else [0] * len(matched)
+
+    geometry = segment_geometry(
+        [start[0] for start, _ in segments], [start[1] for start, _ in segments],
+        [end[0] for _, end in segments], [end[1] for _, end in segments],
+        [line['bulge'] for line in contour]
+    )
+    bounds = (float(min(geometry['min_x'])), float(min(geometry['min_y'])),
+              float(max(geometry['max_x'])), float(max(geometry['max_y'])))
+
+    counts = {}
+    for i in nearest:
+        counts[int(i)] = counts.get(int(i), 0) + 1
+
+    edges = []
+    for i, gap in zip(matched, gaps):
+        start, end = segments[i]
+        edges.append({
+            'side': _side(segments[i], bounds),
+            'thickness': snap_thickness(gap),
+            'length': contour[i]['length'],
+            'coordinates': {'start': start, 'end': end},
+            'triangles': counts[i]
+        })
+    return edges
+
+
+class BandingTotals:
+    """Суммирует метры кромки по материалу и толщине для пакета панелей"""
+
+    def __init__(self):
+        self.meters: Dict[Tuple[str, float], float] = {}
+        self.panels = 0
+
+    def add_panel(self, panel_data: Dict):
+        self.panels += 1
+        material = panel_data.get('material', '')
+        for edge in panel_data.get('edges', []):
+            key = (material, edge['thickness'])
+            self.meters[key] = self.meters.get(key, 0.0) + edge['length'] / 1000
+
+    def add_panels(self, panels: Iterable[Dict]):
+        for panel in panels:
+            self.add_panel(panel)
+
+    def report(self) -> List[Dict]:
+        """Итоги, отсортированные по материалу и толщине"""
+        return [
+            {'material': material, 'thickness': thickness, 'meters': round(meters, 3)}
+            for (material, thickness), meters in sorted(self.meters.items())
+        ]
+
+
+def main():
+    from dxf_reader import DxfReader
+
+    if len(sys.argv) < 2:
+        print("Использование: python edge_banding.py file1.dxf [file2.dxf ...]")
+        sys.exit(1)
+
+    totals = BandingTotals()
+    for filename in sys.argv[1:]:
+        totals.add_panels(DxfReader(filename).get_panels_data())
+
+    print(f"\nПанелей: {totals.panels}")
+    for row in totals.report():
+        material = row['material'] or 'без материала'
+        print(f"  {material}, кромка {row['thickness']} мм: {row['meters']} м")
+
+
+if __name__ == "__main__":
+    main()
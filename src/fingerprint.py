@@ -0,0 +1,198 @@
+import hashlib
+import json
+import sqlite3
+import sys
+from typing import Callable, Dict, Iterable, List
+
+from fixed_point import to_um
+
+BULGE_SCALE = 10 ** 6  # bulge безразмерный, хешируется как целое с точностью 1e-6
+
+
+def _field(item, name, default=None):
+    """Поле словаря или атрибут объекта (Hole, Groove)"""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+def _point(value):
+    if isinstance(value, dict):
+        return value['x'], value['y']
+    return value[0], value[1]
+
+
+def canonical_panel(panel_data: Dict) -> List:
+    """Каноническое представление геометрии панели.
+
+    Все величины - целые микрометры. Координаты переносятся в систему с
+    началом в левом нижнем углу контура (contour_origin) вычитанием уже
+    целых значений, поэтому имя блока и точка вставки на результат не
+    влияют. Списки элементов сортируются, так что порядок сущностей в DXF
+    тоже не важен.
+    """
+    ox, oy = (to_um(v) for v in panel_data.get('contour_origin', (0.0, 0.0)))
+
+    def pt(value):
+        x, y = _point(value)
+        return to_um(x) - ox, to_um(y) - oy
+
+    size = panel_data['size']
+    holes = sorted(
+        (pt(_field(hole, 'center')), to_um(_field(hole, 'diameter')), to_um(_field(hole, 'depth')))
+        for hole in panel_data.get('holes', [])
+    )
+    grooves = sorted(
+        (tuple(sorted((pt(_field(groove, 'start')), pt(_field(groove, 'end'))))),
+         to_um(_field(groove, 'width')), to_um(_field(groove, 'depth')))
+        for groove in panel_data.get('grooves', [])
+    )
+    edges = sorted(
+        (edge['side'], to_um(edge['thickness']),
+         tuple(sorted((pt(edge['coordinates']['start']), pt(edge['coordinates']['end'])))))
+        for edge in panel_data.get('edges', [])
+    )
+    cutouts = sorted(
+        (cutout['type'], cutout.get('edge', ''), pt(cutout['position']),
+         (to_um(cutout['size']['x']), to_um(cutout['size']['y'])),
+         tuple(pt(p) for p in cutout.get('points', [])),
+         tuple(round(b * BULGE_SCALE) for b in cutout.get('bulges', [])))
+        for cutout in panel_data.get('cutouts', [])
+    )
+    return [
+        panel_data.get('material', ''),
+        [to_um(size['width']), to_um(size['height']), to_um(size['thickness'])],
+        holes, grooves, edges, cutouts
+    ]
+
+
+def panel_fingerprint(panel_data: Dict) -> str:
+    """Отпечаток геометрии панели (hex BLAKE2b, 128 бит)"""
+    data = json.dumps(canonical_panel(panel_data), separators=(',', ':'))
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class FingerprintStore:
+    """Постоянное хранилище отпечатков и вычисленных по ним результатов (SQLite).
+
+    results хранит JSON результатов по (отпечаток, вид), например 'json'
+    для PanelBuilder или 'program' для сверловки, чтобы одинаковые панели
+    из разных файлов и заказов не пересчитывались.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                fingerprint TEXT PRIMARY KEY,
+                first_name TEXT,
+                first_source TEXT,
+                seen INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                fingerprint TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (fingerprint, kind)
+            );
+        """)
+
+    def get(self, fingerprint: str, kind: str):
+        row = self.conn.execute(
+            "SELECT value FROM results WHERE fingerprint = ? AND kind = ?", (fingerprint, kind)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, fingerprint: str, kind: str, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results (fingerprint, kind, value) VALUES (?, ?, ?)",
+            (fingerprint, kind, json.dumps(value))
+        )
+
+    def get_or_compute(self, fingerprint: str, kind: str, compute: Callable[[], object]):
+        """Готовый результат из хранилища или вычисленный и сохраненный"""
+        value = self.get(fingerprint, kind)
+        if value is None:
+            value = compute()
+            self.put(fingerprint, kind, value)
+        return value
+
+    def add_batch(self, panels: Iterable[Dict], source: str = '') -> Dict:
+        """Регистрирует панели пакета и возвращает счетчики дедупликации.
+
+        unique - разных геометрий в пакете, known - из них уже встречались
+        в прошлых пакетах, duplicates - панелей, которые не нужно считать заново.
+        """
+        counts: Dict[str, int] = {}
+        names: Dict[str, tuple] = {}
+        for panel in panels:
+            fingerprint = panel.get('fingerprint') or panel_fingerprint(panel)
+            counts[fingerprint] = counts.get(fingerprint, 0) + 1
+            names.setdefault(fingerprint, (panel.get('name', ''), panel.get('source', source)))
+
+        known = set()
+        keys = list(counts)
+        for i in range(0, len(keys), 500):  # ограничение SQLite на число параметров
+            chunk = keys[i:i + 500]
+            known.update(row[0] for row in self.conn.execute(
+                f"SELECT fingerprint FROM fingerprints WHERE fingerprint IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO fingerprints (fingerprint, first_name, first_source) VALUES (?, ?, ?)",
+                [(fp,) + names[fp] for fp in keys]
+            )
+            self.conn.executemany(
+                "UPDATE fingerprints SET seen = seen + ? WHERE fingerprint = ?",
+                [(count, fp) for fp, count in counts.items()]
+            )
+
+        total = sum(counts.values())
+        return {
+            'panels': total,
+            'unique': len(counts),
+            'known': len(known),
+            'duplicates': total - (len(counts) - len(known))
+        }
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    from dxf_reader import DxfReader
+    from panel_builder import PanelBuilder
+
+    if len(sys.argv) < 3:
+        print("Использование: python fingerprint.py store.db file1.dxf [file2.dxf ...]")
+        sys.exit(1)
+
+    with FingerprintStore(sys.argv[1]) as store:
+        panels = []
+        for filename in sys.argv[2:]:
+            for panel in DxfReader(filename).get_panels_data():
+                panel['fingerprint'] = panel_fingerprint(panel)
+                panel['source'] = filename
+                # JSON панели строится один раз на геометрию
+                store.get_or_compute(panel['fingerprint'], 'json', lambda: PanelBuilder(panel).build())
+                panels.append(panel)
+
+        stats = store.add_batch(panels)
+        print(f"\nПанелей: {stats['panels']}, уникальных: {stats['unique']}, "
+              f"уже известных: {stats['known']}, повторов: {stats['duplicates']}")
+
+
+if __name__ == "__main__":
+    main()
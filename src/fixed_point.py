@@ -0,0 +1,38 @@
+from typing import Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Внутри DxfReader координаты и размеры - целые микрометры: сравнение,
+# хеширование и допуски точные, а округление происходит один раз - при
+# чтении из DXF. В миллиметры значения переводятся только на выходе.
+UM_PER_MM = 1000
+
+PointUm = Tuple[int, int]
+
+
+def to_um(mm: float) -> int:
+    """Миллиметры -> целые микрометры"""
+    return int(round(mm * UM_PER_MM))
+
+
+def to_mm(um) -> float:
+    """Микрометры -> миллиметры; дробные микрометры (расчет дуг) округляются"""
+    return int(round(um)) / UM_PER_MM
+
+
+def point_um(x: float, y: float) -> PointUm:
+    return to_um(x), to_um(y)
+
+
+def point_mm(point) -> Tuple[float, float]:
+    return to_mm(point[0]), to_mm(point[1])
+
+
+def to_um_array(values: Sequence[float]):
+    """Пакетный перевод в микрометры (int64, если есть NumPy)"""
+    if np is None:
+        return [to_um(v) for v in values]
+    return np.rint(np.asarray(values, dtype=float) * UM_PER_MM).astype(np.int64)
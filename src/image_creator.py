@@ -0,0 +1,328 @@
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from math import atan, atan2, cos, hypot, sin
+from typing import Dict, List, Tuple
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # без Pillow PNG рисуется встроенным растеризатором
+    Image = None
+    ImageDraw = None
+
+from fingerprint import panel_fingerprint
+
+Point = Tuple[float, float]
+
+THUMBNAIL_SIZE = 256  # длинная сторона PNG в пикселях
+MARGIN = 10.0  # поля вокруг панели, мм
+ARC_STEP = 0.2  # шаг разбиения дуг при растеризации, радиан
+FIELDS = ['size', 'contour_origin', 'contour', 'cutouts', 'holes', 'grooves', 'edges']  # что нужно от DxfReader
+
+COLORS = {
+    'background': (255, 255, 255),
+    'contour': (0, 0, 0),
+    'edge': (230, 120, 0),
+    'hole': (0, 90, 200),
+    'groove': (0, 150, 60),
+}
+
+
+def _svg_color(rgb) -> str:
+    return '#%02x%02x%02x' % rgb
+
+
+def _point(value) -> Point:
+    if isinstance(value, dict):
+        return value['x'], value['y']
+    return value[0], value[1]
+
+
+def _field(item, name, default=None):
+    """Поле словаря или атрибут объекта (Hole, Groove)"""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+def _arc_points(start: Point, end: Point, bulge: float) -> List[Point]:
+    """Точки дуги с bulge, включая концы (для прямого отрезка - только концы)"""
+    if not bulge:
+        return [start, end]
+    (x0, y0), (x1, y1) = start, end
+    chord = hypot(x1 - x0, y1 - y0)
+    if chord == 0:
+        return [start, end]
+    # центр: середина хорды плюс левая нормаль * (1 - b^2) / (4b) * хорда
+    k = (1 - bulge * bulge) / (4 * bulge)
+    cx = (x0 + x1) / 2 - k * (y1 - y0)
+    cy = (y0 + y1) / 2 + k * (x1 - x0)
+    radius = hypot(x0 - cx, y0 - cy)
+    a0 = atan2(y0 - cy, x0 - cx)
+    sweep = 4 * atan(bulge)
+    steps = max(2, int(abs(sweep) / ARC_STEP) + 1)
+    return ([(cx + radius * cos(a0 + sweep * i / steps), cy + radius * sin(a0 + sweep * i / steps))
+             for i in range(steps)] + [end])
+
+
+def _bounds(panel: Dict) -> Tuple[float, float, float, float]:
+    points = [p for line in panel.get('contour', []) for p in _arc_points(line['start'], line['end'], line['bulge'])]
+    if not points:
+        size = panel['size']
+        return 0.0, 0.0, size['width'], size['height']
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def render_svg(panel: Dict) -> str:
+    """SVG панели в миллиметрах: контур с дугами, кромки, отверстия и пазы"""
+    min_x, min_y, max_x, max_y = _bounds(panel)
+    width = max_x - min_x + 2 * MARGIN
+    height = max_y - min_y + 2 * MARGIN
+    stroke = max(width, height) / 400
+
+    # ось y DXF смотрит вверх - переворачиваем группой, флаги дуг остаются в координатах DXF
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width:.2f} {height:.2f}" '
+        f'width="{width:.0f}mm" height="{height:.0f}mm">',
+        f'<rect width="100%" height="100%" fill="{_svg_color(COLORS["background"])}"/>',
+        f'<g transform="translate({MARGIN - min_x:.2f} {max_y + MARGIN:.2f}) scale(1 -1)" fill="none">'
+    ]
+
+    path = []
+    for line in panel.get('contour', []):
+        (x0, y0), (x1, y1), bulge = line['start'], line['end'], line['bulge']
+        path.append(f"M{x0:.2f} {y0:.2f}")
+        if bulge:
+            chord = hypot(x1 - x0, y1 - y0)
+            radius = chord * (1 + bulge * bulge) / (4 * abs(bulge))
+            large = 1 if abs(bulge) > 1 else 0
+            sweep = 1 if bulge > 0 else 0
+            path.append(f"A{radius:.2f} {radius:.2f} 0 {large} {sweep} {x1:.2f} {y1:.2f}")
+        else:
+            path.append(f"L{x1:.2f} {y1:.2f}")
+    if path:
+        parts.append(f'<path d="{"".join(path)}" stroke="{_svg_color(COLORS["contour"])}" '
+                     f'stroke-width="{stroke:.2f}"/>')
+
+    for edge in panel.get('edges', []):
+        (x0, y0), (x1, y1) = edge['coordinates']['start'], edge['coordinates']['end']
+        parts.append(f'<line x1="{x0:.2f}" y1="{y0:.2f}" x2="{x1:.2f}" y2="{y1:.2f}" '
+                     f'stroke="{_svg_color(COLORS["edge"])}" stroke-width="{3 * stroke:.2f}"/>')
+
+    for groove in panel.get('grooves', []):
+        (x0, y0), (x1, y1) = _point(_field(groove, 'start')), _point(_field(groove, 'end'))
+        parts.append(f'<line x1="{x0:.2f}" y1="{y0:.2f}" x2="{x1:.2f}" y2="{y1:.2f}" '
+                     f'stroke="{_svg_color(COLORS["groove"])}" stroke-width="{_field(groove, "width"):.2f}" '
+                     f'stroke-opacity="0.5"/>')
+
+    for hole in panel.get('holes', []):
+        x, y = _point(_field(hole, 'center'))
+        parts.append(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{_field(hole, "diameter") / 2:.2f}" '
+                     f'stroke="{_svg_color(COLORS["hole"])}" stroke-width="{stroke:.2f}"/>')
+
+    parts.append('</g></svg>')
+    return '\n'.join(parts)
+
+
+def _drawing(panel: Dict, size: int):
+    """Примитивы в пикселях: (вид, цвет, точки/центр, толщина или радиус)"""
+    min_x, min_y, max_x, max_y = _bounds(panel)
+    scale = (size - 1) / (max(max_x - min_x, max_y - min_y) + 2 * MARGIN)
+    width = int((max_x - min_x + 2 * MARGIN) * scale) + 1
+    height = int((max_y - min_y + 2 * MARGIN) * scale) + 1
+
+    def px(p):
+        return (p[0] - min_x + MARGIN) * scale, (max_y + MARGIN - p[1]) * scale
+
+    shapes = []
+    for line in panel.get('contour', []):
+        points = [px(p) for p in _arc_points(line['start'], line['end'], line['bulge'])]
+        shapes.append(('line', COLORS['contour'], points, 1))
+    for edge in panel.get('edges', []):
+        points = [px(edge['coordinates']['start']), px(edge['coordinates']['end'])]
+        shapes.append(('line', COLORS['edge'], points, 3))
+    for groove in panel.get('grooves', []):
+        points = [px(_point(_field(groove, 'start'))), px(_point(_field(groove, 'end')))]
+        shapes.append(('line', COLORS['groove'], points, max(1, round(_field(groove, 'width') * scale))))
+    for hole in panel.get('holes', []):
+        shapes.append(('circle', COLORS['hole'], px(_point(_field(hole, 'center'))),
+                       max(1.0, _field(hole, 'diameter') / 2 * scale)))
+    return width, height, shapes
+
+
+class _Canvas:
+    """Минимальный растр RGB для PNG без Pillow"""
+
+    def __init__(self, width: int, height: int, background):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(bytes(background) * (width * height))
+
+    def dot(self, x: int, y: int, color, size: int = 1):
+        half = size // 2
+        for yy in range(y - half, y - half + size):
+            if 0 <= yy < self.height:
+                for xx in range(x - half, x - half + size):
+                    if 0 <= xx < self.width:
+                        i = 3 * (yy * self.width + xx)
+                        self.pixels[i:i + 3] = bytes(color)
+
+    def line(self, a, b, color, size: int = 1):
+        """Отрезок по Брезенхэму"""
+        x0, y0, x1, y1 = round(a[0]), round(a[1]), round(b[0]), round(b[1])
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        err = dx + dy
+        while True:
+            self.dot(x0, y0, color, size)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def circle(self, center, radius: float, color):
+        steps = max(8, int(radius * 6))
+        points = [(center[0] + radius * cos(6.283185307 * i / steps),
+                   center[1] + radius * sin(6.283185307 * i / steps)) for i in range(steps + 1)]
+        for a, b in zip(points, points[1:]):
+            self.line(a, b, color)
+
+    def png(self) -> bytes:
+        def chunk(kind, data):
+            return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+        row = 3 * self.width
+        raw = b''.join(b'\x00' + bytes(self.pixels[y * row:(y + 1) * row]) for y in range(self.height))
+        return (b'\x89PNG\r\n\x1a\n'
+                + chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 2, 0, 0, 0))
+                + chunk(b'IDAT', zlib.compress(raw, 6))
+                + chunk(b'IEND', b''))
+
+
+def render_png(panel: Dict, size: int = THUMBNAIL_SIZE) -> bytes:
+    """PNG-миниатюра панели: через Pillow, если он установлен, иначе встроенным растеризатором"""
+    width, height, shapes = _drawing(panel, size)
+
+    if Image is not None:
+        import io
+        image = Image.new('RGB', (width, height), COLORS['background'])
+        draw = ImageDraw.Draw(image)
+        for kind, color, geometry, extent in shapes:
+            if kind == 'line':
+                draw.line(geometry, fill=color, width=extent)
+            else:
+                (x, y), r = geometry, extent
+                draw.ellipse((x - r, y - r, x + r, y + r), outline=color)
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    canvas = _Canvas(width, height, COLORS['background'])
+    for kind, color, geometry, extent in shapes:
+        if kind == 'line':
+            for a, b in zip(geometry, geometry[1:]):
+                canvas.line(a, b, color, extent)
+        else:
+            canvas.circle(geometry, extent, color)
+    return canvas.png()
+
+
+def create_panel_image(panel: Dict, fmt: str = 'svg', size: int = THUMBNAIL_SIZE) -> bytes:
+    """Изображение панели в формате 'svg' или 'png'"""
+    if fmt == 'svg':
+        return render_svg(panel).encode('utf-8')
+    if fmt == 'png':
+        return render_png(panel, size)
+    raise ValueError(f"Неизвестный формат изображения: {fmt}")
+
+
+def _render_to_file(task):
+    panel, path, fmt, size = task
+    data = create_panel_image(panel, fmt, size)
+    # уникальный временный файл в том же каталоге: процессы, рисующие одну
+    # миниатюру, не пишут в общий файл и не видят недописанный
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp', delete=False) as f:
+        try:
+            f.write(data)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+    return path
+
+
+def render_batch(panels: List[Dict], cache_dir: str, fmt: str = 'svg', size: int = THUMBNAIL_SIZE,
+                 processes: int = None) -> List[Dict]:
+    """Рисует миниатюры пакета панелей с кешем по отпечатку геометрии.
+
+    Файл миниатюры называется по отпечатку панели, поэтому одинаковые панели
+    из разных файлов и заказов рисуются один раз. Недостающие миниатюры
+    рисуются пулом процессов.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    suffix = f".{fmt}" if fmt == 'svg' else f".{size}.{fmt}"
+    results, tasks = [], {}
+    for panel in panels:
+        fingerprint = panel.get('fingerprint') or panel_fingerprint(panel)
+        path = os.path.join(cache_dir, fingerprint + suffix)
+        cached = os.path.exists(path)
+        if not cached and path not in tasks:
+            tasks[path] = (panel, path, fmt, size)
+        results.append({'name': panel.get('name', ''), 'fingerprint': fingerprint,
+                        'path': path, 'cached': cached})
+
+    if len(tasks) > 1 and processes != 1:
+        from multiprocessing import Pool
+        with Pool(processes) as pool:
+            list(pool.imap_unordered(_render_to_file, tasks.values(), chunksize=16))
+    else:
+        for task in tasks.values():
+            _render_to_file(task)
+    return results
+
+
+def main():
+    from dxf_reader import DxfReader
+
+    args = sys.argv[1:]
+    if len(args) < 2:
+        print("Использование: python image_creator.py <каталог> [--png] [--size N] [--jobs N] file1.dxf ...")
+        sys.exit(1)
+
+    out_dir = args.pop(0)
+    fmt, size, processes = 'svg', THUMBNAIL_SIZE, None
+    if '--png' in args:
+        args.remove('--png')
+        fmt = 'png'
+    for option in ('--size', '--jobs'):
+        if option in args:
+            i = args.index(option)
+            value = int(args[i + 1])
+            del args[i:i + 2]
+            if option == '--size':
+                size = value
+            else:
+                processes = value
+
+    panels = []
+    for filename in args:
+        panels.extend(DxfReader(filename).get_panels_data(FIELDS))
+    results = render_batch(panels, out_dir, fmt, size, processes)
+    cached = sum(result['cached'] for result in results)
+    unique = len({result['path'] for result in results})
+    print(f"\nПанелей: {len(results)}, миниатюр: {unique}, из кеша: {cached}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional
+
+from budget import BudgetExceeded, ResourceBudget, run_guarded
+
+LEASE_SECONDS = 60.0  # сколько задание принадлежит воркеру без heartbeat
+MAX_ATTEMPTS = 3  # после стольких неудач задание помечается failed
+POLL_INTERVAL = 1.0  # пауза воркера при пустой очереди
+
+
+class QueueBackend(ABC):
+    """Интерфейс хранилища очереди.
+
+    Задание - словарь {'job_id', 'path', 'attempts', 'enqueued_at'}.
+    Реализация должна выдавать задание ровно одному воркеру за раз и
+    возвращать в очередь задания, у которых истекла аренда. Бэкенд без
+    какого-либо метода не создается (TypeError при создании).
+    """
+
+    @abstractmethod
+    def enqueue(self, paths: Iterable[str]) -> int:
+        """Ставит файлы в очередь; возвращает число добавленных заданий"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """Выдает воркеру следующее задание или None, если очередь пуста"""
+
+    @abstractmethod
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Продлевает аренду; False - задание уже не принадлежит воркеру"""
+
+    @abstractmethod
+    def complete(self, job_id: int, worker_id: str, result: Dict):
+        """Сохраняет результат задания"""
+
+    @abstractmethod
+    def fail(self, job_id: int, worker_id: str, error: str, retry: bool = True):
+        """retry=False - ошибка не исправится повтором (например, превышен лимит)"""
+
+    @abstractmethod
+    def record_metrics(self, worker_id: str, metrics: Dict):
+        """Сохраняет метрики воркера"""
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Сводка по очереди"""
+
+
+class SqliteBackend(QueueBackend):
+    """Очередь в файле SQLite.
+
+    Выдача задания идет в транзакции BEGIN IMMEDIATE, то есть под файловой
+    блокировкой базы, поэтому работает для нескольких процессов на одной
+    машине. База в режиме WAL, а он требует общей памяти процессов: файл
+    должен лежать на локальном диске, не на сетевом. Годится для тестов и
+    небольших установок.
+    """
+
+    def __init__(self, path: str, max_attempts: int = MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()  # heartbeat идет из отдельного потока
+        self.conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',  -- queued, leased, done, failed
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                enqueued_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, lease_until);
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                metrics TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+
+    def _write(self, sql: str, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params)
+
+    def enqueue(self, paths: Iterable[str]) -> int:
+        now = time.time()
+        rows = [(path, now) for path in paths]
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany("INSERT INTO jobs (path, enqueued_at) VALUES (?, ?)", rows)
+            self.conn.execute("COMMIT")
+        return len(rows)
+
+    def lease(self, worker_id: str, lease_seconds: float = LEASE_SECONDS) -> Optional[Dict]:
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Просроченные аренды: либо обратно в очередь, либо failed
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'lease expired', finished_at = ? "
+                    "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts)
+                )
+                row = self.conn.execute(
+                    "SELECT job_id, path, attempts, enqueued_at FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'leased' AND lease_until < ?) "
+                    "ORDER BY job_id LIMIT 1", (now,)
+                ).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, "
+                    "attempts = attempts + 1, started_at = ? WHERE job_id = ?",
+                    (worker_id, now + lease_seconds, now, row[0])
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return {'job_id': row[0], 'path': row[1], 'attempts': row[2] + 1, 'enqueued_at': row[3]}
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        cursor = self._write(
+            "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease_seconds, job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: Dict):
+        self._write(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? "
+            "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+            (json.dumps(result), time.time(), job_id, worker_id)
+        )
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry: bool = True):
+        # Есть попытки - задание сразу возвращается в очередь. Как и в
+        # complete, опоздавший воркер (аренда истекла и задание уже
+        # перевыдано или закрыто) статус не меняет
+        self._write(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = ?, lease_until = NULL, finished_at = ? "
+            "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+            (self.max_attempts if retry else 0, error, time.time(), job_id, worker_id)
+        )
+
+    def record_metrics(self, worker_id: str, metrics: Dict):
+        self._write(
+            "INSERT OR REPLACE INTO workers (worker_id, metrics, updated_at) VALUES (?, ?, ?)",
+            (worker_id, json.dumps(metrics), time.time())
+        )
+
+    def stats(self) -> Dict:
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+            workers = {
+                worker_id: dict(json.loads(metrics), updated_at=updated_at)
+                for worker_id, metrics, updated_at in self.conn.execute(
+                    "SELECT worker_id, metrics, updated_at FROM workers ORDER BY worker_id")
+            }
+        return {'jobs': counts, 'workers': workers}
+
+    def close(self):
+        self.conn.close()
+
+
+def convert_file(path: str, out_dir: str, budget: ResourceBudget = None) -> Dict:
+    """Обработчик по умолчанию: DXF -> JSON панелей через PanelBuilder"""
+    from dxf_reader import DxfReader
+    from panel_builder import PanelBuilder
+
+    panels = [PanelBuilder(panel).build() for panel in DxfReader(path, budget=budget).get_panels_data()]
+    os.makedirs(out_dir, exist_ok=True)
+    output = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + '.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(panels, f, ensure_ascii=False)
+    return {'output': output, 'panels': len(panels)}
+
+
+class Worker:
+    """Воркер: берет задания в аренду, продлевает ее из фонового потока,
+    записывает результат или ошибку и ведет свои метрики.
+
+    Метрики: число выполненных и упавших заданий, пропускная способность
+    (заданий в секунду работы) и задержка - время от постановки задания в
+    очередь до начала обработки.
+    """
+
+    def __init__(self, backend: QueueBackend, handler: Callable[[str], Dict],
+                 worker_id: str = None, lease_seconds: float = LEASE_SECONDS):
+        self.backend = backend
+        self.handler = handler
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.started = time.time()
+        self.metrics = {'done': 0, 'failed': 0, 'busy_seconds': 0.0,
+                        'lag_total': 0.0, 'lag_max': 0.0}
+
+    def _heartbeat(self, job: Dict, stop: threading.Event):
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.backend.heartbeat(job['job_id'], self.worker_id, self.lease_seconds):
+                return  # аренду перехватили - результат все равно не будет принят
+
+    def run_one(self) -> bool:
+        """Обрабатывает одно задание; False - очередь пуста"""
+        job = self.backend.lease(self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        started = time.time()
+        lag = started - job['enqueued_at']
+        self.metrics['lag_total'] += lag
+        self.metrics['lag_max'] = max(self.metrics['lag_max'], lag)
+
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        beat.start()
+        try:
+            result = self.handler(job['path'])
+        except BudgetExceeded as e:
+            # файл за пределами лимитов - повтор даст тот же результат
+            self.backend.fail(job['job_id'], self.worker_id, json.dumps(e.to_dict(), ensure_ascii=False),
+                              retry=False)
+            self.metrics['failed'] += 1
+        except Exception as e:
+            self.backend.fail(job['job_id'], self.worker_id, f"{type(e).__name__}: {e}")
+            self.metrics['failed'] += 1
+        else:
+            self.backend.complete(job['job_id'], self.worker_id, result)
+            self.metrics['done'] += 1
+        finally:
+            stop.set()
+            beat.join()
+            self.metrics['busy_seconds'] += time.time() - started
+            self.backend.record_metrics(self.worker_id, self.report())
+        return True
+
+    def run(self, once: bool = False, poll_interval: float = POLL_INTERVAL):
+        """Цикл обработки; once=True - выйти, когда очередь опустеет"""
+        while True:
+            if not self.run_one():
+                if once:
+                    return
+                time.sleep(poll_interval)
+
+    def report(self) -> Dict:
+        jobs = self.metrics['done'] + self.metrics['failed']
+        busy = self.metrics['busy_seconds']
+        return {
+            'done': self.metrics['done'],
+            'failed': self.metrics['failed'],
+            'throughput': round(jobs / busy, 3) if busy else 0.0,
+            'lag_avg': round(self.metrics['lag_total'] / jobs, 3) if jobs else 0.0,
+            'lag_max': round(self.metrics['lag_max'], 3),
+            'uptime': round(time.time() - self.started, 1)
+        }
+
+
+USAGE = """Использование:
+  python job_queue.py queue.db enqueue file1.dxf [file2.dxf ...]
+  python job_queue.py queue.db worker <каталог_для_json> [--once] [--timeout с] [--max-memory МБ]
+  python job_queue.py queue.db stats
+"""
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(USAGE)
+        sys.exit(1)
+
+    backend = SqliteBackend(sys.argv[1])
+    command, args = sys.argv[2], sys.argv[3:]
+    if command == 'enqueue':
+        print(f"Поставлено заданий: {backend.enqueue(args)}")
+    elif command == 'worker' and args:
+        out_dir = args[0]
+        budget = ResourceBudget()
+        for option, name in (('--timeout', 'timeout'), ('--max-memory', 'max_memory_mb')):
+            if option in args:
+                setattr(budget, name, float(args[args.index(option) + 1]))
+        # каждый файл - в отдельном процессе с жесткими лимитами времени и памяти
+        worker = Worker(backend, lambda path: run_guarded(convert_file, (path, out_dir, budget), budget))
+        worker.run(once='--once' in args)
+        print(f"Воркер {worker.worker_id}: {worker.report()}")
+    elif command == 'stats':
+        stats = backend.stats()
+        print(f"Задания: {stats['jobs']}")
+        for worker_id, metrics in stats['workers'].items():
+            print(f"  {worker_id}: выполнено {metrics['done']}, ошибок {metrics['failed']}, "
+                  f"{metrics['throughput']} заданий/с, задержка ср. {metrics['lag_avg']} с, "
+                  f"макс. {metrics['lag_max']} с")
+    else:
+        print(USAGE)
+        sys.exit(1)
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
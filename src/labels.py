@@ -0,0 +1,201 @@
+import re
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from ezdxf.lldxf.encoding import decode_dxf_unicode
+from ezdxf.math import Matrix44
+
+from layer_rules import LayerRegistry
+from spatial_index import UniformGrid
+
+PANEL_PREFIX = '______'  # блоки панелей: _______N и ______N
+MAX_DISTANCE = 50.0  # мм: подпись вне габаритов панелей относится к ближайшей не дальше этого
+CHECK_EVERY = 1024  # подписей между проверками бюджета при распределении
+
+# Что извлекается из подписей; первое совпадение по каждому полю
+MATERIAL_PATTERN = re.compile(r'ЛДСП|ДСП|МДФ|ХДФ|ДВП|фанер|пластик|стекл|LDSP|MDF|HDF|HPL', re.IGNORECASE)
+ORDER_PATTERN = re.compile(r'(?:заказ|order|№)\s*[:#]?\s*(\S+)', re.IGNORECASE)
+
+
+class _BlockScan:
+    """Подписи и вложенные вставки одного блока (блок просматривается один раз)"""
+
+    def __init__(self, layout, layers: LayerRegistry):
+        self.texts = []  # (текст, x, y) в координатах блока
+        self.inserts = []  # (имя блока, матрица вставки)
+        for e in layout:
+            dxftype = e.dxftype()
+            if dxftype == 'INSERT':
+                self.inserts.append((e.dxf.name, e.matrix44()))
+            elif dxftype in ('TEXT', 'MTEXT') and layers.classify(e.dxf.layer)['kind'] == 'label':
+                # R12 хранит не-ASCII символы как \U+XXXX
+                text = decode_dxf_unicode(e.plain_text()).strip()
+                if text:
+                    self.texts.append((text, e.dxf.insert.x, e.dxf.insert.y))
+
+
+def collect_labels(doc, layers: LayerRegistry = None, budget=None) -> List[Dict]:
+    """Все подписи TEXT/MTEXT со слоев подписей в мировых координатах.
+
+    Каждый блок просматривается один раз, затем дерево вставок от
+    modelspace разворачивается только по матрицам: подпись блока,
+    вставленного несколько раз, дает несколько подписей. budget
+    (ResourceBudget) проверяется на каждой вставке.
+    """
+    layers = layers or LayerRegistry()
+    scans: Dict[str, _BlockScan] = {}
+
+    def scan(name):
+        if name not in scans:
+            scans[name] = _BlockScan(doc.blocks[name], layers)
+        return scans[name]
+
+    labels = []
+    stack = [(_BlockScan(doc.modelspace(), layers), Matrix44(), ())]
+    while stack:
+        if budget is not None:
+            budget.check()
+        block, matrix, path = stack.pop()
+        for text, x, y in block.texts:
+            point = matrix.transform((x, y, 0))
+            labels.append({'text': text, 'position': (point.x, point.y)})
+        for name, local in block.inserts:
+            if name in path or doc.blocks.get(name) is None:
+                continue  # циклическая ссылка или блок отсутствует
+            stack.append((scan(name), local @ matrix, path + (name,)))
+    return labels
+
+
+def _contour_bounds(doc, block, layers: LayerRegistry, matrix: Matrix44):
+    """Габарит контура (слой контура) блока панели с учетом вставок групп, в системе matrix"""
+    points = []
+    for entity in block:
+        if entity.dxftype() != 'INSERT':
+            continue
+        group = entity.matrix44() @ matrix
+        local = []
+        for e in doc.blocks[entity.dxf.name]:
+            if layers.classify(e.dxf.layer)['kind'] != 'contour':
+                continue
+            if e.dxftype() == 'LINE':
+                local += [e.dxf.start, e.dxf.end]
+            elif e.dxftype() == 'POLYLINE':
+                local += [vertex.dxf.location for vertex in e.vertices]
+            elif e.dxftype() in ('ARC', 'CIRCLE'):
+                c, r = e.dxf.center, e.dxf.radius
+                local += [(c.x - r, c.y - r, 0), (c.x + r, c.y + r, 0)]
+        points += group.transform_vertices(local)
+    if not points:
+        return None
+    xs = [p.x for p in points]
+    ys = [p.y for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def panel_boxes(doc, layers: LayerRegistry = None, budget=None) -> Dict[Tuple[str, int], Tuple]:
+    """Мировые габариты панелей: (handle INSERT'а панели, номер вставки) -> bbox"""
+    layers = layers or LayerRegistry()
+    boxes = {}
+    seen: Dict[str, int] = {}  # блок толщины может быть вставлен несколько раз
+    for entity in doc.modelspace():
+        if entity.dxftype() != 'INSERT':
+            continue
+        parent = entity.matrix44()
+        for e in doc.blocks[entity.dxf.name]:
+            if e.dxftype() == 'INSERT' and e.dxf.name.startswith(PANEL_PREFIX):
+                if budget is not None:
+                    budget.check()
+                bbox = _contour_bounds(doc, doc.blocks[e.dxf.name], layers, e.matrix44() @ parent)
+                if bbox is not None:
+                    occurrence = seen.get(e.dxf.handle, 0)
+                    seen[e.dxf.handle] = occurrence + 1
+                    boxes[(e.dxf.handle, occurrence)] = bbox
+    return boxes
+
+
+def assign_labels(labels: List[Dict], boxes: Dict, max_distance: float = MAX_DISTANCE,
+                  budget=None) -> Dict[str, List[Dict]]:
+    """Распределяет подписи по панелям через сетку габаритов панелей.
+
+    Подпись внутри нескольких габаритов достается панели с наименьшей
+    площадью (деталь, лежащая на другой), подпись вне всех габаритов -
+    ближайшей панели не дальше max_distance. Результат: handle -> подписи.
+    """
+    result: Dict[str, List[Dict]] = {}
+    if not boxes:
+        return result
+    sizes = sorted(max(b[2] - b[0], b[3] - b[1]) for b in boxes.values())
+    grid = UniformGrid(max(sizes[len(sizes) // 2], 1.0))
+    for key, bbox in boxes.items():
+        grid.insert(key, bbox)
+
+    def area(key):
+        b = boxes[key]
+        return (b[2] - b[0]) * (b[3] - b[1])
+
+    for i, label in enumerate(labels):
+        if budget is not None and i % CHECK_EVERY == 0:
+            budget.check()
+        x, y = label['position']
+        found = grid.query((x, y, x, y))
+        if found:
+            key = min(found, key=area)
+        else:
+            key = grid.nearest(x, y)
+            b = boxes[key]
+            if max(b[0] - x, 0.0, x - b[2], b[1] - y, 0.0, y - b[3]) > max_distance:
+                continue
+        result.setdefault(key[0], []).append(label)
+    return result
+
+
+def label_metadata(labels: List[Dict]) -> Dict:
+    """Наименование, материал и заказ из подписей панели.
+
+    Подписи читаются сверху вниз и слева направо; материал и номер заказа
+    ищутся по шаблонам, наименование - первая из остальных подписей.
+    """
+    ordered = sorted(labels, key=lambda label: (-round(label['position'][1], 1), label['position'][0]))
+    texts = [label['text'] for label in ordered]
+    metadata = {'name': None, 'material': None, 'order': None, 'texts': texts}
+    for text in texts:
+        order = ORDER_PATTERN.search(text)
+        if order and metadata['order'] is None:
+            metadata['order'] = order.group(1)
+        elif MATERIAL_PATTERN.search(text) and metadata['material'] is None:
+            metadata['material'] = text
+        elif metadata['name'] is None:
+            metadata['name'] = text
+    return metadata
+
+
+def panel_labels(doc, layers: LayerRegistry = None, budget=None) -> Dict[str, List[Dict]]:
+    """Подписи каждой панели документа: handle INSERT'а панели -> подписи"""
+    layers = layers or LayerRegistry()
+    return assign_labels(collect_labels(doc, layers, budget), panel_boxes(doc, layers, budget), budget=budget)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python labels.py file.dxf")
+        sys.exit(1)
+
+    import ezdxf
+
+    doc = ezdxf.readfile(sys.argv[1])
+    started = time.perf_counter()
+    layers = LayerRegistry()
+    labels = collect_labels(doc, layers)
+    boxes = panel_boxes(doc, layers)
+    assigned = assign_labels(labels, boxes)
+    names = {handle: doc.entitydb[handle].dxf.name for handle, _ in boxes}
+    for handle, items in assigned.items():
+        print(f"{names[handle]}: {label_metadata(items)}")
+    matched = sum(len(items) for items in assigned.values())
+    print(f"Подписей: {len(labels)}, отнесено к панелям: {matched}, панелей: {len(boxes)}, "
+          f"{time.perf_counter() - started:.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import json
+import re
+import sys
+from typing import Dict, Iterable, List
+
+# Число в имени слоя пишется с '_' вместо точки: DEPTH8_0 -> 8.0
+NUMBER = r'\d+(?:_\d+)?'
+
+# Правила экспорта ABF (порядок важен - срабатывает первое совпадение).
+# Именованные группы шаблона становятся числовыми параметрами слоя,
+# 'params' - значения по умолчанию.
+DEFAULT_RULES = [
+    {'pattern': r'^ABF_CUTTINGLINES$', 'kind': 'contour'},
+    {'pattern': rf'^ABF_EDGEBANDING(?:_(?P<thickness>{NUMBER}))?$', 'kind': 'edge_banding'},
+    {'pattern': r'^ABF_LABEL$', 'kind': 'label'},
+    {'pattern': rf'^PAZ_DEPTH(?P<depth>{NUMBER})(?:_W(?P<width>{NUMBER}))?$', 'kind': 'groove',
+     'params': {'width': 8.0}},
+    {'pattern': rf'^D(?P<diameter>{NUMBER})_DEPTHF$', 'kind': 'hole', 'params': {'through': True}},
+    {'pattern': rf'^D(?P<diameter>{NUMBER})_DEPTH(?P<depth>{NUMBER})$', 'kind': 'hole',
+     'params': {'through': False}},
+    # прочие экспорты: глубина где-то в имени слоя
+    {'pattern': r'DEPTHF', 'kind': 'hole', 'params': {'through': True}},
+    {'pattern': rf'DEPTH(?P<depth>{NUMBER})', 'kind': 'hole', 'params': {'through': False}},
+]
+
+UNKNOWN = {'kind': None}
+
+
+def _number(value: str) -> float:
+    return float(value.replace('_', '.'))
+
+
+class LayerRegistry:
+    """Смысл слоев DXF: контур, кромка, отверстие, паз и их параметры.
+
+    Правила - регулярные выражения по имени слоя (без учета регистра, как
+    в AutoCAD). Каждый слой разбирается один раз: classify_document заранее
+    проходит таблицу слоев документа, остальные имена попадают в кеш при
+    первом обращении. Результат - словарь {'kind', ...параметры}; для слоя
+    без правила - {'kind': None}.
+    """
+
+    def __init__(self, rules: List[Dict] = None):
+        self.rules = []
+        self.cache: Dict[str, Dict] = {}
+        for rule in DEFAULT_RULES if rules is None else rules:
+            self.add_rule(rule['pattern'], rule['kind'], **rule.get('params', {}))
+
+    @classmethod
+    def from_file(cls, path: str, extend: bool = True) -> 'LayerRegistry':
+        """Правила из JSON-списка; extend=True - перед правилами по умолчанию"""
+        with open(path, encoding='utf-8') as f:
+            rules = json.load(f)
+        return cls(rules + DEFAULT_RULES if extend else rules)
+
+    def add_rule(self, pattern: str, kind: str, **params):
+        self.rules.append((re.compile(pattern, re.IGNORECASE), kind, params))
+        self.cache.clear()
+
+    def classify(self, layer: str) -> Dict:
+        found = self.cache.get(layer)
+        if found is None:
+            found = self.cache[layer] = self._match(layer)
+        return found
+
+    def _match(self, layer: str) -> Dict:
+        for regex, kind, params in self.rules:
+            match = regex.search(layer)
+            if match:
+                result = {'kind': kind}
+                result.update(params)
+                result.update({key: _number(value) for key, value in match.groupdict().items()
+                               if value is not None})
+                return result
+        return UNKNOWN
+
+    def classify_layers(self, layers: Iterable[str]) -> Dict[str, Dict]:
+        return {layer: self.classify(layer) for layer in layers}
+
+    def classify_document(self, doc) -> Dict[str, Dict]:
+        """Разбирает все слои из таблицы LAYER документа"""
+        return self.classify_layers(layer.dxf.name for layer in doc.layers)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python layer_rules.py file.dxf [--rules rules.json]")
+        sys.exit(1)
+
+    import ezdxf
+
+    args = sys.argv[2:]
+    registry = LayerRegistry.from_file(args[args.index('--rules') + 1]) if '--rules' in args else LayerRegistry()
+    for layer, semantics in sorted(registry.classify_document(ezdxf.readfile(sys.argv[1])).items()):
+        print(f"{layer}: {semantics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import sys
 import json
+from census import file_census, format_tree
 from dxf_reader import DxfReader
+from layer_rules import LayerRegistry
 from panel_builder import PanelBuilder
 
 def main():
@@ -8,30 +10,69 @@ def main():
         print("Укажите путь к DXF файлу")
         return
 
-    reader = DxfReader(sys.argv[1])
-    
-    # Режим анализа с флагом -a
-    if len(sys.argv) > 2 and sys.argv[2] == '-a':
-        print(f"\nОткрываем файл: {sys.argv[1]}")
-        reader.analyze_and_log()
+    args = sys.argv[2:]
+    fields = None
+    if '--fields' in args:
+        # --fields size,holes - извлекаем только нужные поля
+        index = args.index('--fields')
+        if index + 1 >= len(args):
+            print("После --fields укажите список полей через запятую")
+            return
+        fields = [field.strip() for field in args[index + 1].split(',') if field.strip()]
+        del args[index:index + 2]
+
+    layers = None
+    if '--layers' in args:
+        # --layers rules.json - правила слоев другого экспорта
+        index = args.index('--layers')
+        if index + 1 >= len(args):
+            print("После --layers укажите JSON-файл с правилами слоев")
+            return
+        layers = LayerRegistry.from_file(args[index + 1])
+        del args[index:index + 2]
+
+    # Режим анализа с флагом -a: перепись файла без полного разбора (--json - в JSON)
+    if args and args[0] == '-a':
+        result = file_census(sys.argv[1], layers)
+        if '--json' in args:
+            print(json.dumps(result, ensure_ascii=False, separators=(',', ':')))
+        else:
+            print(format_tree(result))
     else:
         # Обычный режим - создание JSON
-        panels_data = reader.read()
-        
+        reader = DxfReader(sys.argv[1], layers=layers)
+        try:
+            panels_data = reader.read(fields)
+        except ValueError as e:
+            print(e)
+            return
+
         for panel in panels_data:
             print_panel_info(panel)
 
 def print_panel_info(panel_data):
     """Выводит краткую информацию о панели"""
     print(f"\nПанель {panel_data['name']}:")
-    print(f"  {panel_data['size']['width']}x{panel_data['size']['height']}x{panel_data['size']['thickness']} мм")
-    
-    if panel_data['cutouts']:
+    label = panel_data.get('label') or {}
+    if label.get('name') or label.get('material'):
+        print(f"  {label.get('name') or ''} {label.get('material') or ''}".rstrip())
+    if 'size' in panel_data:
+        print(f"  {panel_data['size']['width']}x{panel_data['size']['height']}x{panel_data['size']['thickness']} мм")
+
+    if panel_data.get('cutouts'):
         print("  Вырезы:")
         for cutout in panel_data['cutouts']:
             print(f"    - Точки: {cutout['entry_points']}")
             if cutout['radius']:
                 print(f"      Радиус: {cutout['radius']} мм")
 
+    if panel_data.get('holes'):
+        print(f"  Отверстий: {len(panel_data['holes'])}")
+    if panel_data.get('grooves'):
+        print(f"  Пазов: {len(panel_data['grooves'])}")
+    if panel_data.get('edges'):
+        sides = ', '.join(f"{edge['side']} {edge['thickness']}" for edge in panel_data['edges'][:4])
+        print(f"  Кромки ({len(panel_data['edges'])}): {sides}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,233 @@
+import mmap
+import struct
+import sys
+from typing import Dict, Iterable, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from contour import CUTOUT_TYPES as CONTOUR_CUTOUT_TYPES
+from dxf_reader import DxfReader
+
+# Формат файла (little-endian, все массивы выровнены по 8 байт):
+#   заголовок   MAGIC, версия u16, резерв u16, число панелей u32, резерв u32
+#   индекс      на каждую панель: width, height, thickness (f64)
+#               и (смещение u64, количество u64) для каждой секции
+#   секции      массивы записей из float64 фиксированной длины
+MAGIC = b'ABFP'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHII')
+SECTIONS = ('holes', 'grooves', 'edges', 'cutouts')
+INDEX = struct.Struct('<3d' + 'QQ' * len(SECTIONS))
+
+# Колонки записей каждой секции
+COLUMNS = {
+    'holes': ('x', 'y', 'diameter', 'depth'),
+    'grooves': ('start_x', 'start_y', 'end_x', 'end_y', 'width', 'depth'),
+    'edges': ('thickness', 'side', 'start_x', 'start_y', 'end_x', 'end_y'),
+    'cutouts': ('type', 'x', 'y', 'size_x', 'size_y'),
+}
+
+SIDES = ('left', 'right', 'bottom', 'top', 'contour')
+# Коды типов вырезов: первые три - из версии 1 формата, новые типы contour
+# дописываются в конец, чтобы старые файлы читались с теми же кодами
+CUTOUT_TYPES = ('L', 'edge', 'inner') + tuple(
+    kind for kind in CONTOUR_CUTOUT_TYPES if kind not in ('L', 'edge', 'inner'))
+FIELDS = ['size'] + list(SECTIONS)  # поля DxfReader, которые хранит формат
+
+
+def _encode_panel(panel: Dict) -> Dict[str, List[tuple]]:
+    """Раскладывает данные панели DxfReader по записям секций"""
+    records = {name: [] for name in SECTIONS}
+
+    for hole in panel.get('holes', []):
+        records['holes'].append((hole['center'][0], hole['center'][1], hole['diameter'], hole['depth']))
+
+    for groove in panel.get('grooves', []):
+        records['grooves'].append((
+            groove['start'][0], groove['start'][1],
+            groove['end'][0], groove['end'][1],
+            groove['width'], groove['depth']
+        ))
+
+    for edge in panel.get('edges', []):
+        start, end = edge['coordinates']['start'], edge['coordinates']['end']
+        records['edges'].append((
+            edge['thickness'], SIDES.index(edge['side']),
+            start[0], start[1], end[0], end[1]
+        ))
+
+    for cutout in panel.get('cutouts', []):
+        if cutout['type'] not in CUTOUT_TYPES:
+            raise ValueError(f"Неизвестный тип выреза {cutout['type']!r}, известны: {', '.join(CUTOUT_TYPES)}")
+        records['cutouts'].append((
+            CUTOUT_TYPES.index(cutout['type']),
+            cutout['position']['x'], cutout['position']['y'],
+            cutout['size']['x'], cutout['size']['y']
+        ))
+
+    return records
+
+
+def write_panels(path: str, panels: Iterable[Dict]):
+    """Записывает панели (данные DxfReader с полями FIELDS) в бинарный файл"""
+    panels = list(panels)
+    encoded = [_encode_panel(panel) for panel in panels]
+
+    offset = HEADER.size + INDEX.size * len(panels)
+    index = []
+    for panel, records in zip(panels, encoded):
+        size = panel['size']
+        fields = [size['width'], size['height'], size['thickness']]
+        for name in SECTIONS:
+            fields += [offset, len(records[name])]
+            offset += len(records[name]) * len(COLUMNS[name]) * 8
+        index.append(INDEX.pack(*fields))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(panels), 0))
+        f.writelines(index)
+        for records in encoded:
+            for name in SECTIONS:
+                width = len(COLUMNS[name])
+                rows = records[name]
+                if rows:
+                    f.write(struct.pack(f'<{width * len(rows)}d', *[v for row in rows for v in row]))
+
+
+class PanelView:
+    """Панель внутри отображенного файла; массивы не копируются"""
+
+    def __init__(self, buffer: memoryview, fields: tuple, use_numpy: bool):
+        self._buffer = buffer
+        self.width, self.height, self.thickness = fields[:3]
+        self._sections = {
+            name: (fields[3 + i * 2], fields[4 + i * 2]) for i, name in enumerate(SECTIONS)
+        }
+        self._use_numpy = use_numpy
+
+    def _section(self, name: str):
+        """Секция как массив (count, columns) поверх буфера файла"""
+        offset, count = self._sections[name]
+        width = len(COLUMNS[name])
+        if self._use_numpy:
+            return np.frombuffer(self._buffer, dtype='<f8', count=count * width,
+                                 offset=offset).reshape(count, width)
+        view = self._buffer[offset:offset + count * width * 8]
+        if not count:
+            return view.cast('d')  # memoryview не допускает нулей в shape
+        return view.cast('d', (count, width))
+
+    @property
+    def holes(self):
+        return self._section('holes')
+
+    @property
+    def grooves(self):
+        return self._section('grooves')
+
+    @property
+    def edges(self):
+        return self._section('edges')
+
+    @property
+    def cutouts(self):
+        return self._section('cutouts')
+
+    def to_dict(self) -> Dict:
+        """Восстанавливает хранимые поля панели в формате DxfReader"""
+        rows = {name: self._section(name).tolist() for name in SECTIONS}
+        return {
+            'size': {'width': self.width, 'height': self.height, 'thickness': self.thickness},
+            'holes': [
+                {'center': (x, y), 'diameter': diameter, 'depth': depth}
+                for x, y, diameter, depth in rows['holes']
+            ],
+            'grooves': [
+                {'start': (start_x, start_y), 'end': (end_x, end_y), 'width': width, 'depth': depth}
+                for start_x, start_y, end_x, end_y, width, depth in rows['grooves']
+            ],
+            'edges': [
+                {
+                    'thickness': thickness,
+                    'side': SIDES[int(side)],
+                    'coordinates': {'start': (start_x, start_y), 'end': (end_x, end_y)}
+                }
+                for thickness, side, start_x, start_y, end_x, end_y in rows['edges']
+            ],
+            'cutouts': [
+                {
+                    'type': CUTOUT_TYPES[int(kind)],
+                    'position': {'x': x, 'y': y},
+                    'size': {'x': size_x, 'y': size_y}
+                }
+                for kind, x, y, size_x, size_y in rows['cutouts']
+            ]
+        }
+
+
+class PanelFile:
+    """Читает бинарный файл панелей через mmap.
+
+    Массивы секций - срезы memoryview (или numpy.frombuffer) поверх
+    отображенного файла. Перед close() ссылки на них нужно отпустить.
+    """
+
+    def __init__(self, path: str, use_numpy: bool = None):
+        if use_numpy is None:
+            use_numpy = np is not None
+        self.use_numpy = use_numpy
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, _, count, _ = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Не бинарный файл панелей: {path}")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Неподдерживаемая версия формата: {version}")
+        self.version = version
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> PanelView:
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        fields = INDEX.unpack_from(self._buffer, HEADER.size + INDEX.size * i)
+        return PanelView(self._buffer, fields, self.use_numpy)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Использование: python panel_binary.py file.dxf out.abfp")
+        sys.exit(1)
+
+    panels = DxfReader(sys.argv[1]).read(FIELDS)
+    write_panels(sys.argv[2], panels)
+    print(f"Записано панелей: {len(panels)}")
+
+
+if __name__ == "__main__":
+    main()
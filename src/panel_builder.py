@@ -70,11 +70,15 @@ class PanelBuilder:
         self.panel_data = panel_data
 
     def build(self) -> Dict:
-        """Создает JSON-представление панели из данных"""
+        """Создает JSON-представление панели из данных.
+
+        Значения уже в миллиметрах с точностью до микрометра (DxfReader),
+        повторно не округляются.
+        """
         panel = {
             'size': {
-                'width': round(self.panel_data['size']['width'], 2),
-                'height': round(self.panel_data['size']['height'], 2),
+                'width': self.panel_data['size']['width'],
+                'height': self.panel_data['size']['height'],
                 'thickness': self.panel_data['size']['thickness']
             },
             'edges': [],
@@ -87,13 +91,11 @@ class PanelBuilder:
         # Добавляем кромки
         for edge in self.panel_data['edges']:
             panel['edges'].append({
-                'thickness': round(edge['thickness'], 2),
+                'thickness': edge['thickness'],
                 'side': edge['side'],
                 'position': {
-                    'start': [round(abs(edge['coordinates']['start'][0]), 2), 
-                             round(edge['coordinates']['start'][1], 2)],
-                    'end': [round(abs(edge['coordinates']['end'][0]), 2), 
-                           round(edge['coordinates']['end'][1], 2)]
+                    'start': [abs(edge['coordinates']['start'][0]), edge['coordinates']['start'][1]],
+                    'end': [abs(edge['coordinates']['end'][0]), edge['coordinates']['end'][1]]
                 }
             })
 
@@ -104,8 +106,8 @@ class PanelBuilder:
                     'type': 'L',
                     'position': cutout['position'],
                     'size': {
-                        'x': round(cutout['size_x'], 2),
-                        'y': round(cutout['size_y'], 2)
+                        'x': cutout['size']['x'],
+                        'y': cutout['size']['y']
                     }
                 })
 
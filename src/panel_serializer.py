@@ -0,0 +1,155 @@
+import json
+from math import fsum, isfinite
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Dict, Iterable, List
+
+from panel_builder import Panel
+
+
+def _float(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return float.__repr__(value)
+
+
+def _value(value) -> str:
+    """Форматирует скалярное значение как json.dumps"""
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, float):
+        return _float(value)
+    if isinstance(value, int):
+        return int.__repr__(value)
+    return None
+
+
+class PanelSerializer:
+    """Пишет JSON панели напрямую, минуя промежуточные словари.
+
+    Вывод побайтно совпадает с json.dumps(PanelBuilder(data).build()),
+    а при compact=True - с json.dumps(..., separators=(',', ':'),
+    ensure_ascii=False), включая NaN, Infinity и запись экспоненты.
+    """
+
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        if compact:
+            sep, colon = ',', ':'
+            self.encode_str = encode_basestring
+        else:
+            sep, colon = ', ', ': '
+            self.encode_str = encode_basestring_ascii
+        self.item_sep, self.key_sep = sep, colon
+
+        # Шаблоны фрагментов собираются один раз под выбранные разделители
+        def template(text: str) -> str:
+            return text.replace(', ', sep).replace(': ', colon)
+
+        self.size_fmt = template('{"size": {"width": %s, "height": %s, "thickness": %s}, "edges": [')
+        self.edge_fmt = template(
+            '{"thickness": %s, "side": %s, "position": {"start": [%s, %s], "end": [%s, %s]}}')
+        self.middle = template('], "holes": [], "grooves": [], "cutouts": [')
+        self.cutout_fmt = template('{"type": "L", "position": %s, "size": {"x": %s, "y": %s}}')
+        self.tail = template('], "corners": []}')
+
+    def _any(self, value) -> str:
+        """Произвольное значение (например, position выреза)"""
+        scalar = _value(value)
+        if scalar is not None:
+            return scalar
+        if isinstance(value, str):
+            return self.encode_str(value)
+        if self.compact:
+            return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+        return json.dumps(value)
+
+    def _key(self, name: str) -> str:
+        return f'"{name}"{self.key_sep}'
+
+    def _build_parts(self, panel_data: Dict, out: List[str]):
+        """Добавляет в out фрагменты JSON, эквивалентные PanelBuilder.build"""
+        sep = self.item_sep
+        size = panel_data['size']
+        edge_fmt, any_value = self.edge_fmt, self._any
+        out.append(self.size_fmt % (
+            any_value(size['width']), any_value(size['height']), any_value(size['thickness'])
+        ))
+
+        # Конечные числа печатаются через str - так же, как в json;
+        # NaN/inf уходят в медленный путь
+        parts = []
+        for edge in panel_data['edges']:
+            start = edge['coordinates']['start']
+            end = edge['coordinates']['end']
+            numbers = (edge['thickness'], abs(start[0]), start[1], abs(end[0]), end[1])
+            if isfinite(fsum(numbers)):
+                parts.append(edge_fmt % ((numbers[0], any_value(edge['side'])) + numbers[1:]))
+            else:
+                parts.append(edge_fmt % (
+                    (any_value(edge['thickness']), any_value(edge['side']))
+                    + tuple(any_value(value) for value in numbers[1:])
+                ))
+        out.append(sep.join(parts))
+
+        out.append(self.middle)
+        cutout_fmt = self.cutout_fmt
+        out.append(sep.join([
+            cutout_fmt % (
+                any_value(cutout['position']), any_value(cutout['size']['x']), any_value(cutout['size']['y'])
+            )
+            for cutout in panel_data.get('cutouts', []) if cutout['type'] == 'L'
+        ]))
+        out.append(self.tail)
+
+    def _point(self, point) -> str:
+        sep, key = self.item_sep, self._key
+        return '{' + key('x') + self._any(point[0]) + sep + key('y') + self._any(point[1]) + '}'
+
+    def dumps_model(self, panel: Panel) -> bytes:
+        """JSON модели Panel, как json.dumps(panel.to_dict())"""
+        sep, key = self.item_sep, self._key
+        holes = [
+            '{' + key('center') + self._point(hole.center) + sep
+            + key('diameter') + self._any(hole.diameter) + sep
+            + key('depth') + self._any(hole.depth) + '}'
+            for hole in panel.holes
+        ]
+        grooves = [
+            '{' + key('start') + self._point(groove.start) + sep
+            + key('end') + self._point(groove.end) + sep
+            + key('width') + self._any(groove.width) + sep
+            + key('depth') + self._any(groove.depth) + '}'
+            for groove in panel.grooves
+        ]
+        text = ('{' + key('dimensions') + self._any(panel.dimensions) + sep
+                + key('grain_direction') + self._point(panel.grain_direction) + sep
+                + key('origin_point') + self._point(panel.origin_point) + sep
+                + key('holes') + '[' + sep.join(holes) + ']' + sep
+                + key('grooves') + '[' + sep.join(grooves) + ']}')
+        return text.encode('utf-8')
+
+    def dumps(self, panel_data: Dict) -> bytes:
+        """JSON одной панели"""
+        out: List[str] = []
+        self._build_parts(panel_data, out)
+        return ''.join(out).encode('utf-8')
+
+    def dumps_many(self, panels: Iterable[Dict]) -> bytes:
+        """JSON-массив панелей, как json.dumps([build(), ...])"""
+        out: List[str] = ['[']
+        for i, panel in enumerate(panels):
+            if i:
+                out.append(self.item_sep)
+            self._build_parts(panel, out)
+        out.append(']')
+        return ''.join(out).encode('utf-8')
+
+    def dump(self, panel_data: Dict, fp):
+        """Записывает JSON панели в бинарный поток"""
+        fp.write(self.dumps(panel_data))
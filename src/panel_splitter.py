@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+from math import hypot
+from typing import Dict, List, Tuple
+
+from contour import TOLERANCE, build_loops
+from dxf_reader import DxfReader
+
+FIELDS = ['size', 'contour_origin', 'contour', 'holes', 'grooves', 'edges']  # что нужно от DxfReader
+PRECISION = 3  # знаков после запятой в координатах
+
+CONTOUR_LAYER = 'ABF_CUTTINGLINES'
+EDGE_LAYER = 'ABF_EDGEBANDING'
+
+# Читатель файла и INSERT'ы его панелей; процессы пула при fork наследуют их без повторного разбора
+_READER = None
+_INSERTS = []
+
+
+def _layer_number(value: float) -> str:
+    """Число в имени слоя, как в экспорте: 8.0 -> '8_0', 0.4 -> '0_4'"""
+    return f"{value:.1f}".replace('.', '_')
+
+
+def hole_layer(diameter: float, depth: float, thickness: float) -> str:
+    """Слой отверстия в соглашении экспорта: D5_0_DEPTH8_0, сквозное - D8_0_DEPTHF"""
+    if depth >= thickness:
+        return f"D{_layer_number(diameter)}_DEPTHF"
+    return f"D{_layer_number(diameter)}_DEPTH{_layer_number(depth)}"
+
+
+def groove_layer(depth: float) -> str:
+    return f"PAZ_DEPTH{_layer_number(depth)}"
+
+
+def edge_layer(thickness: float) -> str:
+    """Слой кромки с толщиной в имени: ABF_EDGEBANDING_1_0"""
+    return f"{EDGE_LAYER}_{_layer_number(thickness)}"
+
+
+class R12Writer:
+    """Потоковая запись DXF R12 (AC1009) без построения документа.
+
+    Сущности пишутся в поток сразу, поэтому слои объявляются заранее в
+    конструкторе (таблица LAYER идет перед ENTITIES). Пишутся только
+    LINE, CIRCLE и POLYLINE с bulge - этого хватает станкам.
+    """
+
+    def __init__(self, stream, layers: List[str], extents: Tuple[float, float, float, float] = None):
+        self.stream = stream
+        self.buffer = []
+        self._tags(0, 'SECTION', 2, 'HEADER', 9, '$ACADVER', 1, 'AC1009')
+        if extents is not None:
+            self._tags(9, '$EXTMIN', *self._point(extents[0], extents[1]))
+            self._tags(9, '$EXTMAX', *self._point(extents[2], extents[3]))
+        self._tags(0, 'ENDSEC', 0, 'SECTION', 2, 'TABLES', 0, 'TABLE', 2, 'LAYER', 70, len(layers))
+        for layer in layers:
+            self._tags(0, 'LAYER', 2, layer, 70, 0, 62, 7, 6, 'CONTINUOUS')
+        self._tags(0, 'ENDTAB', 0, 'ENDSEC', 0, 'SECTION', 2, 'ENTITIES')
+
+    @staticmethod
+    def _point(x: float, y: float) -> list:
+        return [10, x, 20, y, 30, 0.0]
+
+    @staticmethod
+    def _pair(code: int, value) -> str:
+        if isinstance(value, float):
+            value = f"{round(value, PRECISION) + 0.0:.{PRECISION}f}".rstrip('0').rstrip('.')
+        return f"{code:>3}\n{value}\n"
+
+    def _tags(self, *items):
+        self.buffer.extend(self._pair(items[i], items[i + 1]) for i in range(0, len(items), 2))
+
+    def _flush(self):
+        if len(self.buffer) > 4096:
+            self.stream.write(''.join(self.buffer))
+            self.buffer.clear()
+
+    def line(self, start, end, layer: str):
+        self._tags(0, 'LINE', 8, layer, *self._point(start[0], start[1]), 11, end[0], 21, end[1], 31, 0.0)
+        self._flush()
+
+    def circle(self, center, radius: float, layer: str):
+        self._tags(0, 'CIRCLE', 8, layer, *self._point(center[0], center[1]), 40, radius)
+        self._flush()
+
+    def polyline(self, vertices, layer: str, closed: bool = True):
+        """Вершины - (x, y, bulge); bulge относится к ребру до следующей вершины"""
+        self._tags(0, 'POLYLINE', 8, layer, 66, 1, *self._point(0.0, 0.0), 70, 1 if closed else 0)
+        for x, y, bulge in vertices:
+            self._tags(0, 'VERTEX', 8, layer, *self._point(x, y))
+            if bulge:
+                self._tags(42, bulge)
+        self._tags(0, 'SEQEND', 8, layer)
+        self._flush()
+
+    def close(self):
+        self._tags(0, 'ENDSEC', 0, 'EOF')
+        self.stream.write(''.join(self.buffer))
+        self.buffer.clear()
+
+
+def write_panel(panel: Dict, stream):
+    """Пишет панель в поток как минимальный DXF R12 в локальных координатах.
+
+    Начало координат - левый нижний угол контура (contour_origin). Контур
+    собирается в замкнутые полилинии, отверстия - окружности, пазы - линии
+    по оси, кромки - линии вдоль кромкованных ребер. Надписи не переносятся.
+    """
+    ox, oy = panel['contour_origin']
+    thickness = panel['size']['thickness']
+
+    def local(point):
+        return point[0] - ox, point[1] - oy
+
+    segments = [(local(s['start']), local(s['end']), s['bulge']) for s in panel['contour']
+                if hypot(s['end'][0] - s['start'][0], s['end'][1] - s['start'][1]) >= TOLERANCE]
+    loops = build_loops(segments)
+    if sum(len(loop) for loop in loops) != len(segments):
+        loops = None  # контур не замкнут - пишем ребра по отдельности
+
+    holes = [(local(h['center']), h['diameter'] / 2, hole_layer(h['diameter'], h['depth'], thickness))
+             for h in panel['holes']]
+    grooves = [(local(g['start']), local(g['end']), groove_layer(g['depth'])) for g in panel['grooves']]
+    edges = [(local(e['coordinates']['start']), local(e['coordinates']['end']), edge_layer(e['thickness']))
+             for e in panel['edges']]
+
+    layers = [CONTOUR_LAYER] + sorted({item[-1] for item in holes + grooves + edges})
+    writer = R12Writer(stream, layers, (0.0, 0.0, panel['size']['width'], panel['size']['height']))
+    if loops is not None:
+        for loop in loops:
+            writer.polyline(loop, CONTOUR_LAYER)
+    else:
+        for start, end, bulge in segments:
+            writer.polyline([(start[0], start[1], bulge), (end[0], end[1], 0.0)], CONTOUR_LAYER, closed=False)
+    for center, radius, layer in holes:
+        writer.circle(center, radius, layer)
+    for start, end, layer in grooves + edges:
+        writer.line(start, end, layer)
+    writer.close()
+
+
+def panel_filenames(source: str, names: List[str]) -> List[str]:
+    """Имена файлов панелей: tumba1_14.dxf; повторы получают номер"""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    result, seen = [], {}
+    for name in names:
+        base = f"{stem}_{name.strip('_') or 'panel'}"
+        seen[base] = seen.get(base, 0) + 1
+        result.append(f"{base}.dxf" if seen[base] == 1 else f"{base}_{seen[base]}.dxf")
+    return result
+
+
+def _load(path: str):
+    """Читает файл; INSERT'ы сортируются по handle, чтобы все процессы одинаково понимали индексы"""
+    global _READER, _INSERTS
+    _READER = DxfReader(path)
+    _INSERTS = sorted(_READER._find_panel_inserts(), key=lambda e: e.dxf.handle)
+
+
+def _init_worker(path: str):
+    if _READER is None or _READER.filename != path:
+        _load(path)  # без fork (Windows, macOS) файл разбирается в каждом процессе
+
+
+def _split_one(task) -> Dict:
+    index, path = task
+    fields, steps = _READER.plan_fields(FIELDS)
+    panel = _READER._analyze_panel(_INSERTS[index], fields, steps)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+        write_panel(panel, f)
+    os.replace(tmp, path)  # параллельные процессы не увидят недописанный файл
+    return {'name': panel['name'], 'path': path, 'bytes': os.path.getsize(path)}
+
+
+def split_file(source: str, out_dir: str, processes: int = None) -> List[Dict]:
+    """Разбивает сборку на отдельные DXF по панелям; панели обрабатываются пулом процессов"""
+    _load(source)
+    os.makedirs(out_dir, exist_ok=True)
+    names = panel_filenames(source, [insert.dxf.name for insert in _INSERTS])
+    tasks = [(i, os.path.join(out_dir, name)) for i, name in enumerate(names)]
+
+    if len(tasks) > 1 and processes != 1:
+        from multiprocessing import Pool
+        with Pool(processes, initializer=_init_worker, initargs=(source,)) as pool:
+            return list(pool.imap(_split_one, tasks, chunksize=max(1, len(tasks) // 32)))
+    return [_split_one(task) for task in tasks]
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2:
+        print("Использование: python panel_splitter.py <каталог> [--jobs N] file1.dxf ...")
+        sys.exit(1)
+
+    out_dir = args.pop(0)
+    processes = None
+    if '--jobs' in args:
+        i = args.index('--jobs')
+        processes = int(args[i + 1])
+        del args[i:i + 2]
+
+    for filename in args:
+        started = time.perf_counter()
+        results = split_file(filename, out_dir, processes)
+        size = sum(result['bytes'] for result in results)
+        print(f"{filename}: панелей {len(results)}, {size / 1024:.1f} КБ, "
+              f"{time.perf_counter() - started:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import sys
+from math import atan, atan2, ceil, cos, hypot, radians, sin
+from typing import Dict, List, Tuple
+
+from contour import MIN_BULGE, build_loops, segment_geometry
+from dxf_reader import DxfReader
+from spatial_index import UniformGrid
+
+Point = Tuple[float, float]
+
+ARC_STEP = radians(5)  # шаг разбиения дуг контура выреза на отрезки
+POINT_TOLERANCE = 0.001  # мм: концы пазов ближе этого считаются общей вершиной
+
+
+def _point(value) -> Point:
+    """Точка из кортежа или словаря {'x', 'y'}"""
+    if isinstance(value, dict):
+        return value['x'], value['y']
+    return value[0], value[1]
+
+
+def _field(item, name, default=None):
+    """Поле словаря или атрибут объекта (Hole, Groove)"""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+def _point_segment_distance(p: Point, a: Point, b: Point) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length2))
+    return hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def _orientation(a: Point, b: Point, c: Point) -> float:
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def _segments_cross(a: Point, b: Point, c: Point, d: Point) -> bool:
+    """Есть ли у отрезков ab и cd общая точка (касание тоже считается)"""
+    d1, d2 = _orientation(c, d, a), _orientation(c, d, b)
+    d3, d4 = _orientation(a, b, c), _orientation(a, b, d)
+    if ((d1 > 0 > d2) or (d1 < 0 < d2)) and ((d3 > 0 > d4) or (d3 < 0 < d4)):
+        return True
+    return (d1 == 0 and _point_segment_distance(a, c, d) == 0 or d2 == 0 and _point_segment_distance(b, c, d) == 0
+            or d3 == 0 and _point_segment_distance(c, a, b) == 0 or d4 == 0 and _point_segment_distance(d, a, b) == 0)
+
+
+def _segments_distance(a: Point, b: Point, c: Point, d: Point) -> float:
+    if _segments_cross(a, b, c, d):
+        return 0.0
+    return min(_point_segment_distance(a, c, d), _point_segment_distance(b, c, d),
+               _point_segment_distance(c, a, b), _point_segment_distance(d, a, b))
+
+
+def _edges(polygon: List[Point]):
+    return zip(polygon, polygon[1:] + polygon[:1])
+
+
+def _inside(p: Point, polygon: List[Point]) -> bool:
+    """Точка внутри многоугольника (четность пересечений луча)"""
+    inside = False
+    for (x0, y0), (x1, y1) in _edges(polygon):
+        if (y0 > p[1]) != (y1 > p[1]) and p[0] < x0 + (p[1] - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _point_polygon_distance(p: Point, polygon: List[Point]) -> float:
+    """Расстояние от точки до области многоугольника (0 - внутри)"""
+    if _inside(p, polygon):
+        return 0.0
+    return min(_point_segment_distance(p, a, b) for a, b in _edges(polygon))
+
+
+def _segment_polygon_distance(a: Point, b: Point, polygon: List[Point]) -> float:
+    if _inside(a, polygon):
+        return 0.0
+    return min(_segments_distance(a, b, c, d) for c, d in _edges(polygon))
+
+
+def _polygons_distance(first: List[Point], second: List[Point]) -> float:
+    if _inside(first[0], second) or _inside(second[0], first):
+        return 0.0
+    return min(_segments_distance(a, b, c, d) for a, b in _edges(first) for c, d in _edges(second))
+
+
+def _flatten(points: List[Point], bulges: List[float]) -> List[Point]:
+    """Замкнутый контур с дугами (bulge) как многоугольник; дуги - ломаной с шагом ARC_STEP"""
+    polygon = []
+    for i, (x0, y0) in enumerate(points):
+        polygon.append((x0, y0))
+        bulge = bulges[i] if i < len(bulges) else 0.0
+        if abs(bulge) < MIN_BULGE:
+            continue
+        x1, y1 = points[(i + 1) % len(points)]
+        arc = segment_geometry([x0], [y0], [x1], [y1], [bulge])
+        cx, cy, radius = float(arc['center_x'][0]), float(arc['center_y'][0]), float(arc['radius'][0])
+        if not radius:
+            continue
+        sweep = 4 * atan(bulge)
+        start = atan2(y0 - cy, x0 - cx)
+        steps = max(2, ceil(abs(sweep) / ARC_STEP))
+        polygon += [(cx + radius * cos(start + sweep * k / steps), cy + radius * sin(start + sweep * k / steps))
+                    for k in range(1, steps)]
+    return polygon
+
+
+def _groove_outlines(grooves: List[tuple]) -> List[Tuple[List[int], List[Point]]]:
+    """Пазы, нарисованные замкнутым контуром: (номера отрезков, многоугольник).
+
+    Экспорт рисует фрезеруемую область паза прямоугольником из отрезков
+    слоя паза; такой контур - граница области, а не осевые линии с шириной
+    из имени слоя.
+    """
+    def key(point):
+        return round(point[0] / POINT_TOLERANCE), round(point[1] / POINT_TOLERANCE)
+
+    parent = {}
+
+    def root(node):
+        while parent.setdefault(node, node) != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    degree = {}
+    for start, end in grooves:
+        a, b = key(start), key(end)
+        degree[a] = degree.get(a, 0) + 1
+        degree[b] = degree.get(b, 0) + 1
+        parent[root(a)] = root(b)
+
+    components: Dict[tuple, List[int]] = {}
+    for i, (start, end) in enumerate(grooves):
+        components.setdefault(root(key(start)), []).append(i)
+
+    outlines = []
+    for members in components.values():
+        nodes = {key(point) for i in members for point in grooves[i]}
+        if len(members) < 3 or any(degree[node] != 2 for node in nodes):
+            continue
+        loops = build_loops([grooves[i] for i in members], POINT_TOLERANCE)
+        if len(loops) == 1:
+            outlines.append((members, [(x, y) for x, y, _ in loops[0]]))
+    return outlines
+
+
+class PanelValidator:
+    """Проверка пересечений отверстий, пазов и вырезов и отступов от края.
+
+    Работает с данными панели в формате get_panels_data (отверстия и пазы
+    в виде словарей или объектов Hole/Groove, вырезы из _get_cutouts).
+    Кандидаты в пересечения отбираются через UniformGrid, поэтому время
+    растет почти линейно с числом элементов. Паз считается отрезком с
+    половиной ширины по обе стороны, а паз, нарисованный замкнутым
+    контуром, - областью внутри контура. Вырез - точный многоугольник из
+    find_cutouts (points и bulges). Кромка - отрезок с полосой толщины
+    кромки; с ней проверяются только отверстия, и это единственный учет
+    кромки: отступ от края считается от габарита реза без толщины кромки.
+    """
+
+    def __init__(self, panel_data: Dict, min_edge_clearance: float = 0.0,
+                 min_gap: float = 0.0, bounds: Tuple[float, float, float, float] = None):
+        self.panel_data = panel_data
+        self.min_edge_clearance = min_edge_clearance
+        self.min_gap = min_gap
+        if bounds is None:
+            size = panel_data['size']
+            bounds = (0.0, 0.0, size['width'], size['height'])
+        self.bounds = bounds
+
+        self.shapes = {}
+        for i, hole in enumerate(panel_data.get('holes', [])):
+            self.shapes[('hole', i)] = ('circle', _point(_field(hole, 'center')),
+                                        _field(hole, 'diameter') / 2)
+        grooves = panel_data.get('grooves', [])
+        lines = [(_point(_field(groove, 'start')), _point(_field(groove, 'end'))) for groove in grooves]
+        outlined = set()
+        for members, polygon in _groove_outlines(lines):
+            outlined.update(members)
+            self.shapes[('groove', min(members))] = ('outline', polygon)
+        for i, groove in enumerate(grooves):
+            if i not in outlined:
+                self.shapes[('groove', i)] = ('segment', lines[i][0], lines[i][1], _field(groove, 'width') / 2)
+        for i, edge in enumerate(panel_data.get('edges', [])):
+            coordinates = edge['coordinates']
+            self.shapes[('edge', i)] = ('edge', _point(coordinates['start']),
+                                        _point(coordinates['end']), edge['thickness'])
+        for i, cutout in enumerate(panel_data.get('cutouts', [])):
+            if cutout.get('points'):
+                polygon = _flatten([_point(p) for p in cutout['points']], cutout.get('bulges', []))
+            else:
+                x, y = _point(cutout['position'])
+                size_x, size_y = _point(cutout['size'])
+                polygon = [(x, y), (x + size_x, y), (x + size_x, y + size_y), (x, y + size_y)]
+            self.shapes[('cutout', i)] = ('polygon', polygon)
+
+    def _bbox(self, shape):
+        if shape[0] == 'circle':
+            (x, y), r = shape[1], shape[2]
+            return x - r, y - r, x + r, y + r
+        if shape[0] in ('segment', 'edge'):
+            (x0, y0), (x1, y1), half = shape[1], shape[2], shape[3]
+            return min(x0, x1) - half, min(y0, y1) - half, max(x0, x1) + half, max(y0, y1) + half
+        xs = [p[0] for p in shape[1]]
+        ys = [p[1] for p in shape[1]]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _distance(self, a, b) -> float:
+        """Зазор между двумя элементами (отрицательный - перекрытие)"""
+        if a[0] > b[0]:  # порядок: circle < edge < outline < polygon < segment
+            a, b = b, a
+        kinds = (a[0], b[0])
+        if kinds == ('circle', 'circle'):
+            return hypot(a[1][0] - b[1][0], a[1][1] - b[1][1]) - a[2] - b[2]
+        if kinds in (('circle', 'segment'), ('circle', 'edge')):
+            return _point_segment_distance(a[1], b[1], b[2]) - a[2] - b[3]
+        if kinds in (('circle', 'polygon'), ('circle', 'outline')):
+            return _point_polygon_distance(a[1], b[1]) - a[2]
+        if kinds == ('polygon', 'segment'):
+            return _segment_polygon_distance(b[1], b[2], a[1]) - b[3]
+        if kinds == ('outline', 'polygon'):
+            return _polygons_distance(a[1], b[1])
+        return None  # пазы между собой, вырезы между собой и кромку с пазами и вырезами не проверяем
+
+    def _cell_size(self) -> float:
+        extents = sorted(
+            max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+            for bbox in map(self._bbox, self.shapes.values())
+        )
+        median = extents[len(extents) // 2] if extents else 0.0
+        return max(2 * median + self.min_gap, 10.0)
+
+    def _check_overlaps(self) -> List[Dict]:
+        grid = UniformGrid(self._cell_size())
+        for key, shape in self.shapes.items():
+            grid.insert(key, self._bbox(shape))
+
+        violations = []
+        for key_a, key_b in grid.pairs(self.min_gap):
+            gap = self._distance(self.shapes[key_a], self.shapes[key_b])
+            if gap is not None and gap < self.min_gap:
+                violations.append({
+                    'type': 'overlap' if gap < 0 else 'gap',
+                    'features': [key_a, key_b],
+                    'distance': round(gap, 2),
+                    'required': self.min_gap
+                })
+        return violations
+
+    def _check_clearances(self) -> List[Dict]:
+        min_x, min_y, max_x, max_y = self.bounds
+        violations = []
+        for key, shape in self.shapes.items():
+            if shape[0] != 'circle':
+                continue  # пазы и вырезы могут выходить на край
+            x0, y0, x1, y1 = self._bbox(shape)
+            for side, distance in (('left', x0 - min_x), ('right', max_x - x1),
+                                   ('bottom', y0 - min_y), ('top', max_y - y1)):
+                if distance < self.min_edge_clearance:
+                    violations.append({
+                        'type': 'clearance',
+                        'features': [key],
+                        'side': side,
+                        'distance': round(distance, 2),
+                        'required': self.min_edge_clearance
+                    })
+        return violations
+
+    def validate(self) -> List[Dict]:
+        """Возвращает список нарушений"""
+        return self._check_overlaps() + self._check_clearances()
+
+
+def validate_file(filename: str, min_edge_clearance: float = 0.0,
+                  min_gap: float = 0.0) -> Dict[str, List[Dict]]:
+    """Проверяет все панели файла, возвращает нарушения по именам панелей"""
+    reader = DxfReader(filename)
+    results = {}
+    # Координаты в системе блока с зеркалированием по x, в миллиметрах
+    for panel_data in reader.get_panels_data(['size', 'contour', 'cutouts', 'holes', 'grooves', 'edges']):
+        contour = panel_data['contour']
+        # габарит с учетом выпуклости дуг, а не только концов ребер
+        extents = segment_geometry(
+            [line['start'][0] for line in contour], [line['start'][1] for line in contour],
+            [line['end'][0] for line in contour], [line['end'][1] for line in contour],
+            [line['bulge'] for line in contour]
+        )
+        validator = PanelValidator(
+            panel_data, min_edge_clearance, min_gap,
+            bounds=(float(min(extents['min_x'])), float(min(extents['min_y'])),
+                    float(max(extents['max_x'])), float(max(extents['max_y'])))
+        )
+        results[panel_data['name']] = validator.validate()
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python panel_validator.py file.dxf [мин_отступ_от_края]")
+        sys.exit(1)
+
+    clearance = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    for name, violations in validate_file(sys.argv[1], clearance).items():
+        print(f"\nПанель {name}: нарушений {len(violations)}")
+        for violation in violations:
+            print(f"  - {violation['type']}: {violation['features']} "
+                  f"зазор {violation['distance']} мм (нужно {violation['required']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from math import floor, hypot
+from typing import Dict, Hashable, Iterator, List, Set, Tuple
+
+BBox = Tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+
+
+class UniformGrid:
+    """Равномерная сетка для поиска пересечений габаритов элементов.
+
+    Каждый элемент регистрируется во всех ячейках, которые покрывает его
+    габарит, поэтому запрос проверяет только соседей по ячейкам, а не все
+    элементы панели.
+    """
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("Размер ячейки должен быть положительным")
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Hashable]] = {}
+        self.boxes: Dict[Hashable, BBox] = {}
+        self.extent = None  # min/max номера занятых ячеек; при удалении не сжимается
+
+    def _cell_range(self, bbox: BBox):
+        size = self.cell_size
+        return (floor(bbox[0] / size), floor(bbox[1] / size),
+                floor(bbox[2] / size), floor(bbox[3] / size))
+
+    def insert(self, key: Hashable, bbox: BBox):
+        """Добавляет элемент с габаритом bbox"""
+        self.boxes[key] = bbox
+        x0, y0, x1, y1 = self._cell_range(bbox)
+        if self.extent is None:
+            self.extent = (x0, y0, x1, y1)
+        else:
+            e = self.extent
+            self.extent = (min(e[0], x0), min(e[1], y0), max(e[2], x1), max(e[3], y1))
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), []).append(key)
+
+    def remove(self, key: Hashable):
+        """Удаляет элемент из сетки"""
+        bbox = self.boxes.pop(key)
+        x0, y0, x1, y1 = self._cell_range(bbox)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells[(cx, cy)]
+                cell.remove(key)
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def _box_distance(self, key: Hashable, x: float, y: float) -> float:
+        box = self.boxes[key]
+        return hypot(max(box[0] - x, 0.0, x - box[2]), max(box[1] - y, 0.0, y - box[3]))
+
+    def nearest(self, x: float, y: float):
+        """Ближайший к точке элемент (по расстоянию до габарита) или None.
+
+        Ячейки просматриваются кольцами вокруг точки; поиск заканчивается,
+        когда найденное расстояние не больше расстояния до следующего кольца.
+        Если кольца разрослись больше числа элементов (сетка почти пуста),
+        дешевле перебрать оставшиеся элементы напрямую.
+        """
+        if not self.boxes:
+            return None
+        size = self.cell_size
+        cx, cy = floor(x / size), floor(y / size)
+        # дальше крайних занятых ячеек искать нечего
+        x0, y0, x1, y1 = self.extent
+        max_ring = max(cx - x0, x1 - cx, cy - y0, y1 - cy, 0)
+
+        best, best_distance = None, float('inf')
+        for ring in range(max_ring + 1):
+            if best is not None and best_distance <= (ring - 1) * size:
+                break
+            if (2 * ring + 1) ** 2 > 4 * len(self.boxes):
+                return min(self.boxes, key=lambda key: self._box_distance(key, x, y))
+            for kx in range(cx - ring, cx + ring + 1):
+                step = 1 if abs(kx - cx) == ring else 2 * ring
+                for ky in range(cy - ring, cy + ring + 1, max(step, 1)):
+                    for key in self.cells.get((kx, ky), ()):
+                        distance = self._box_distance(key, x, y)
+                        if distance < best_distance:
+                            best, best_distance = key, distance
+        return best
+
+    def query(self, bbox: BBox, margin: float = 0.0) -> Set[Hashable]:
+        """Элементы, габарит которых пересекает bbox, расширенный на margin"""
+        area = (bbox[0] - margin, bbox[1] - margin, bbox[2] + margin, bbox[3] + margin)
+        x0, y0, x1, y1 = self._cell_range(area)
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for key in self.cells.get((cx, cy), ()):
+                    if key not in found and _overlaps(self.boxes[key], area):
+                        found.add(key)
+        return found
+
+    def pairs(self, margin: float = 0.0) -> Iterator[Tuple[Hashable, Hashable]]:
+        """Все пары элементов, габариты которых сближаются не больше чем на margin"""
+        order = {key: i for i, key in enumerate(self.boxes)}
+        for key, bbox in self.boxes.items():
+            for other in self.query(bbox, margin):
+                # каждая пара выдается один раз - от элемента, добавленного раньше
+                if order[other] > order[key]:
+                    yield key, other
+
+
+def _overlaps(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
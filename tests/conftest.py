@@ -0,0 +1,17 @@
+import glob
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+SAMPLES = sorted(glob.glob(os.path.join(ROOT, '*.dxf')))
+
+
+@pytest.fixture(scope='session')
+def sample_panels():
+    """Панели всех файлов-образцов: имя файла -> данные DxfReader"""
+    from dxf_reader import DxfReader
+    return {os.path.basename(path): DxfReader(path).get_panels_data() for path in SAMPLES}
@@ -0,0 +1,82 @@
+import ezdxf
+import pytest
+from ezdxf.math import OCS
+
+from assembly import joint_report, match_holes, panel_placements, world_holes
+from dxf_reader import DxfReader
+
+SHIFTED = 1.2  # мм: смещение второго ответного отверстия
+
+
+def _write_cabinet(path):
+    """Шкаф из двух панелей 18 мм: вторая перевернута выдавливанием и лежит под первой.
+
+    На обращенных друг к другу пластях два ответных отверстия D8 (второе
+    смещено на SHIFTED) и одно сквозное D5 без пары.
+    """
+    doc = ezdxf.new('R2000')
+    top, bottom = doc.blocks.new('GROUP1_1'), doc.blocks.new('GROUP2_1')
+    for i, (x, y) in enumerate([(50, 50), (150, 50)]):
+        top.add_circle((x, y), 4, dxfattribs={'layer': 'D8_0_DEPTH8_0'})
+        bottom.add_circle((-(x + (SHIFTED if i == 1 else 0.0)), y), 4, dxfattribs={'layer': 'D8_0_DEPTH8_0'})
+    top.add_circle((500, 300), 2.5, dxfattribs={'layer': 'D5_0_DEPTHF'})
+    doc.blocks.new('_______1').add_blockref('GROUP1_1', (0, 0, 18))
+    doc.blocks.new('_______2').add_blockref('GROUP2_1', (0, 0, 18))
+    thickness = doc.blocks.new('THICKNESS_18')
+    thickness.add_blockref('_______1', (0, 0, 0))
+    thickness.add_blockref('_______2', (0, 0, -36), dxfattribs={'extrusion': (0, 0, -1)})
+    doc.blocks.new('CABINET_A').add_blockref('THICKNESS_18', (0, 0, 0))
+    doc.modelspace().add_blockref('CABINET_A', (1000, 0, 0))
+    doc.saveas(path)
+
+
+@pytest.fixture
+def cabinet(tmp_path):
+    path = str(tmp_path / 'cabinet.dxf')
+    _write_cabinet(path)
+    return DxfReader(path)
+
+
+def test_panel_placements(cabinet):
+    placements = sorted(panel_placements(cabinet), key=lambda p: p['name'])
+    assert [(p['name'], p['cabinet'], p['thickness']) for p in placements] == [
+        ('_______1', 'CABINET_A', 18.0), ('_______2', 'CABINET_A', 18.0)]
+    first, second = (p['matrix'] for p in placements)
+    assert first.transform((0, 0, 0)).isclose((1000, 0, 0))
+    assert second.transform_direction((0, 0, 1)).isclose((0, 0, -1))
+
+
+def test_match_holes(cabinet):
+    holes = [hole for p in panel_placements(cabinet) for hole in world_holes(cabinet, p)]
+    through = [hole for hole in holes if hole['through']]
+    assert [hole['depth'] for hole in through] == [18.0]
+
+    joints, unmatched = match_holes(holes)
+    assert sorted((joint['status'], joint['offset']) for joint in joints) == [('misaligned', SHIFTED), ('ok', 0.0)]
+    assert [holes[i]['through'] for i in unmatched] == [True]
+    for joint in joints:
+        a, b = (holes[i] for i in joint['holes'])
+        assert a['axis'].isclose(-b['axis'])  # сверлятся навстречу друг другу
+
+    [report] = joint_report(cabinet)
+    assert (report['cabinet'], report['holes'], report['misaligned']) == ('CABINET_A', 5, 1)
+
+
+def test_edge_hole_axis_follows_group_rotation(tmp_path):
+    """Группа, повернутая на торец панели: ось отверстия лежит в плоскости панели"""
+    doc = ezdxf.new('R2000')
+    doc.blocks.new('GROUP1_1').add_circle((0, 0), 4, dxfattribs={'layer': 'D8_0_DEPTH30_0'})
+    extrusion = (0, -1, 0)  # нормаль наружу из торца y = 0
+    doc.blocks.new('_______1').add_blockref(
+        'GROUP1_1', OCS(extrusion).from_wcs((100, 0, 9)), dxfattribs={'extrusion': extrusion})
+    doc.blocks.new('THICKNESS_18').add_blockref('_______1', (0, 0, 0))
+    doc.modelspace().add_blockref('THICKNESS_18', (0, 0, 0))
+    path = str(tmp_path / 'edge.dxf')
+    doc.saveas(path)
+
+    reader = DxfReader(path)
+    [placement] = panel_placements(reader)
+    [hole] = world_holes(reader, placement)
+    assert hole['entry'].isclose((100, 0, 9))
+    assert hole['axis'].isclose((0, 1, 0))
+    assert hole['end'].isclose((100, 30, 9))
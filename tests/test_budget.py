@@ -0,0 +1,46 @@
+import os
+
+import ezdxf
+import pytest
+
+from budget import BudgetExceeded, ResourceBudget, run_guarded
+from conftest import ROOT
+from labels import panel_labels
+
+
+def _crash():
+    os._exit(3)
+
+
+def _out_of_memory():
+    raise MemoryError
+
+
+def _answer(value):
+    return value * 2
+
+
+def test_run_guarded_returns_result():
+    assert run_guarded(_answer, (21,), ResourceBudget(timeout=10)) == 42
+
+
+def test_child_crash_is_not_reported_as_memory():
+    with pytest.raises(RuntimeError, match='код 3'):
+        run_guarded(_crash, (), ResourceBudget(timeout=10))
+
+
+def test_memory_error_is_rss():
+    with pytest.raises(BudgetExceeded) as error:
+        run_guarded(_out_of_memory, (), ResourceBudget(timeout=10))
+    assert error.value.kind == 'rss'
+
+
+def test_label_join_checks_budget():
+    doc = ezdxf.readfile(os.path.join(ROOT, 'tumba1.dxf'))
+    assert panel_labels(doc, budget=ResourceBudget()) == panel_labels(doc)
+
+    budget = ResourceBudget(timeout=0.0)
+    budget.start()
+    with pytest.raises(BudgetExceeded) as error:
+        panel_labels(doc, budget=budget)
+    assert error.value.kind == 'timeout'
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+import bulk_export
+from bulk_export import TABLES, BulkExporter, panel_rows, read_npz_table
+
+pytestmark = pytest.mark.skipif(bulk_export.np is None, reason='нет numpy')
+
+
+def _same(a, b):
+    if isinstance(a, float) and math.isnan(a):
+        return isinstance(b, float) and math.isnan(b)
+    return a == b
+
+
+def test_through_follows_panel_thickness():
+    panel = {
+        'size': {'width': 100.0, 'height': 50.0, 'thickness': 16.0},
+        'holes': [{'center': (20.0, 25.0), 'diameter': 8.0, 'depth': 16.0},
+                  {'center': (60.0, 25.0), 'diameter': 5.0, 'depth': 8.0}],
+    }
+    assert [row[-2:] for row in panel_rows(0, panel)['holes']] == [(16.0, True), (8.0, False)]
+
+
+@pytest.mark.parametrize('row_group_size', [3, 65536])
+def test_npz_round_trip(sample_panels, tmp_path, row_group_size):
+    expected = {name: [] for name in TABLES}
+    with BulkExporter(str(tmp_path), fmt='npz', row_group_size=row_group_size) as exporter:
+        for source, panels in sorted(sample_panels.items()):
+            for i, panel in enumerate(panels):
+                for name, table_rows in panel_rows(exporter.next_panel_id + i, panel, source).items():
+                    expected[name].extend(table_rows)
+            exporter.add_panels(panels, source=source)
+
+    assert any(row[-1] for row in expected['holes'])  # в образцах есть сквозные отверстия
+    for name, columns in TABLES.items():
+        table = read_npz_table(str(tmp_path / f'{name}.npz'))
+        assert sorted(table) == sorted(column for column, _ in columns)
+        restored = list(zip(*(table[column].tolist() for column, _ in columns)))
+        assert len(restored) == len(expected[name])
+        for got, want in zip(restored, expected[name]):
+            assert all(_same(a, b) for a, b in zip(got, want)), (name, got, want)
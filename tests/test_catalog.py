@@ -0,0 +1,86 @@
+import shutil
+
+import pytest
+
+from catalog import PanelCatalog
+from conftest import ROOT
+
+COLUMNS = {
+    'panels': 'name, width, height, thickness, origin_x, origin_y',
+    'holes': 'x, y, diameter, depth, through',
+    'grooves': 'start_x, start_y, end_x, end_y, width, depth',
+    'edges': 'side, thickness, start_x, start_y, end_x, end_y',
+    'cutouts': 'type, edge, x, y, size_x, size_y, radius',
+}
+
+
+def _rows(catalog, path):
+    """Строки всех таблиц файла без суррогатных ключей, по порядку панелей"""
+    rows = {}
+    for table, names in COLUMNS.items():
+        columns = ', '.join(f't.{name}' for name in names.split(', '))
+        join = '' if table == 'panels' else ' JOIN panels p ON p.panel_id = t.panel_id'
+        panel = 't' if table == 'panels' else 'p'
+        rows[table] = catalog.query(
+            f"SELECT {panel}.panel_id - (SELECT MIN(panel_id) FROM panels WHERE file_id = f.file_id), {columns} "
+            f"FROM {table} t{join} JOIN files f ON f.file_id = {panel}.file_id WHERE f.path = ? "
+            f"ORDER BY 1, t.rowid", (path,))
+    return rows
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with PanelCatalog(str(tmp_path / 'catalog.db')) as catalog:
+        yield catalog
+
+
+def test_load_and_find(catalog, sample_panels):
+    path = f'{ROOT}/panel2.dxf'
+    assert catalog.load_file(path) == len(sample_panels['panel2.dxf'])
+    [panel] = sample_panels['panel2.dxf']
+    assert len(_rows(catalog, path)['holes']) == len(panel['holes'])
+    assert catalog.find_panels(thickness=panel['size']['thickness'])[0][:2] == (path, panel['name'])
+    assert catalog.find_panels(thickness=-1.0) == []
+
+
+def test_same_path_is_loaded_once(catalog, tmp_path):
+    path = str(tmp_path / 'panel.dxf')
+    shutil.copy(f'{ROOT}/panel2.dxf', path)
+    assert catalog.load_file(path) == 1
+    assert catalog.load_file(path) is None
+    assert catalog.query("SELECT COUNT(*) FROM files") == [(1,)]
+
+    # другое содержимое по тому же пути заменяет старые строки
+    shutil.copy(f'{ROOT}/tumba1.dxf', path)
+    count = catalog.load_file(path)
+    assert catalog.query("SELECT COUNT(*) FROM files") == [(1,)]
+    assert catalog.query("SELECT COUNT(*) FROM panels") == [(count,)]
+
+
+def _load_copy(catalog, source, copy):
+    """Загружает source, затем его копию по пути copy; возвращает число панелей копии и ее запросы"""
+    catalog.load_file(source)
+    shutil.copy(source, copy)
+    statements = []
+    catalog.conn.set_trace_callback(statements.append)
+    count = catalog.load_file(copy)
+    catalog.conn.set_trace_callback(None)
+    return count, statements
+
+
+def test_identical_content_is_copied(catalog, tmp_path, monkeypatch):
+    import dxf_reader
+
+    reads = []
+    reader = dxf_reader.DxfReader
+    monkeypatch.setattr(dxf_reader, 'DxfReader', lambda path: reads.append(path) or reader(path))
+
+    source, copy = f'{ROOT}/tumba1.dxf', str(tmp_path / 'order2.dxf')
+    count, statements = _load_copy(catalog, source, copy)
+    assert reads == [source]  # копия не разбирает DXF
+    assert count == catalog.query("SELECT panel_count FROM files WHERE path = ?", (source,))[0][0] > 1
+    assert _rows(catalog, copy) == _rows(catalog, source)
+
+    # число запросов не зависит от числа панелей
+    _, single = _load_copy(catalog, f'{ROOT}/panel2.dxf', str(tmp_path / 'panel2.dxf'))
+    assert len(statements) == len(single)
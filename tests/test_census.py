@@ -0,0 +1,28 @@
+import json
+import os
+import sys
+
+from census import file_census
+from conftest import ROOT
+from layer_rules import LayerRegistry
+
+import main
+
+SAMPLE = os.path.join(ROOT, 'tumba1.dxf')
+
+
+def test_census_counts_layer_kinds():
+    result = file_census(SAMPLE)
+    assert sum(result['by_kind'].values()) == result['entities']
+    assert result['by_kind']['contour'] == result['by_layer']['ABF_CUTTINGLINES']
+
+
+def test_analyze_mode_uses_layer_rules(tmp_path, monkeypatch, capsys):
+    rules = tmp_path / 'rules.json'
+    rules.write_text(json.dumps([{'pattern': '^ABF_CUTTINGLINES$', 'kind': 'cut'}]), encoding='utf-8')
+    expected = file_census(SAMPLE, LayerRegistry.from_file(str(rules)))['by_kind']
+    assert 'cut' in expected and 'contour' not in expected
+
+    monkeypatch.setattr(sys, 'argv', ['main.py', SAMPLE, '-a', '--json', '--layers', str(rules)])
+    main.main()
+    assert json.loads(capsys.readouterr().out)['by_kind'] == expected
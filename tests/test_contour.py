@@ -0,0 +1,107 @@
+import random
+from math import cos, pi, radians, sin, tan
+
+import pytest
+
+import contour
+from contour import _as_vertices, _reverse, arc_to_bulge, build_loops, find_cutouts, segment_geometry
+
+
+@pytest.mark.parametrize('tolerance, eps', [(0.05, 0.001), (50, 1)])
+def test_join_across_cell_boundary(tolerance, eps):
+    """Концы ближе допуска склеиваются, где бы ни прошла граница ячейки сетки"""
+    width = 100 * tolerance
+    for k in range(8):
+        seam = 3 * tolerance + k * tolerance / 8
+        if isinstance(tolerance, int):
+            seam = int(seam)
+        rect = [
+            ((0, 0), (width, 0)),
+            ((width, 0), (width, seam - eps)),
+            ((width, seam), (0, seam)),  # начало чуть в стороне от конца предыдущего
+            ((0, seam), (0, 0)),
+        ]
+        loops = build_loops(rect, tolerance)
+        assert len(loops) == 1 and len(loops[0]) == 4, seam
+
+
+def test_open_chain_dropped():
+    assert build_loops([((0, 0), (10, 0)), ((10, 0), (10, 10))]) == []
+
+
+def _rect_loop(x0, y0, x1, y1):
+    return [(x0, y0, 0.0), (x1, y0, 0.0), (x1, y1, 0.0), (x0, y1, 0.0)]
+
+
+ARC_90 = tan(radians(90) / 4)  # bulge четверти окружности против часовой
+
+CUTOUTS = {
+    'L': ([(0, 0), (100, 0), (100, 30), (70, 30), (70, 50), (0, 50)],
+          {'edge': 'right-top', 'position': {'x': 70, 'y': 30}, 'size': {'x': 30, 'y': 20}}),
+    'radius': ([(0, 0, 0.0), (90, 0, ARC_90), (100, 10, 0.0), (100, 50, 0.0), (0, 50, 0.0)],
+               {'edge': 'bottom-right', 'position': {'x': 90, 'y': 0}, 'size': {'x': 10, 'y': 10}}),
+    'notch': ([(0, 0), (40, 0), (40, 10), (60, 10), (60, 0), (100, 0), (100, 50), (0, 50)],
+              {'edge': 'bottom', 'position': {'x': 40, 'y': 0}, 'size': {'x': 20, 'y': 10}}),
+}
+
+
+@pytest.mark.parametrize('kind', sorted(CUTOUTS))
+def test_find_cutouts_on_edge(kind):
+    loop, expected = CUTOUTS[kind]
+    # направление обхода внешнего контура не важно
+    for outer in (loop, _reverse(_as_vertices(loop))):
+        _, [cutout] = find_cutouts([outer])
+        assert cutout['type'] == kind
+        assert cutout['edge'] == expected['edge']
+        assert cutout['position'] == pytest.approx(expected['position'])
+        assert cutout['size'] == pytest.approx(expected['size'])
+    if kind == 'radius':
+        assert cutout['radius'] == pytest.approx(10)
+
+
+def test_find_cutouts_inner():
+    outer = _rect_loop(0, 0, 100, 50)
+    _, [cutout] = find_cutouts([_rect_loop(20, 20, 30, 25), outer])
+    assert cutout['type'] == 'inner'
+    assert cutout['position'] == {'x': 20, 'y': 20} and cutout['size'] == {'x': 10, 'y': 5}
+
+
+def test_find_cutouts_plain_rectangle():
+    outer, cutouts = find_cutouts([_rect_loop(0, 0, 100, 50)])
+    assert len(outer) == 4 and cutouts == []
+
+
+@pytest.mark.parametrize('center, radius, start, end, sweep', [
+    ((0, 0), 10, 0, 180, 180),
+    ((5, -5), 2, 350, 10, 20),  # дуга через 0 градусов
+    ((0, 0), 1, 90, 0, 270),
+])
+def test_arc_to_bulge(center, radius, start, end, sweep):
+    (x0, y0), (x1, y1), bulge = arc_to_bulge(center, radius, start, end)
+    assert (x0, y0) == pytest.approx((center[0] + radius * cos(radians(start)),
+                                      center[1] + radius * sin(radians(start))))
+    geometry = segment_geometry([x0], [y0], [x1], [y1], [bulge])
+    assert float(geometry['radius'][0]) == pytest.approx(radius)
+    assert float(geometry['length'][0]) == pytest.approx(radius * radians(sweep))
+    assert (float(geometry['center_x'][0]), float(geometry['center_y'][0])) == pytest.approx(center, abs=1e-9)
+
+
+def test_segment_geometry_extents():
+    # полуокружность по часовой снизу вверх (через x = -10) и прямое ребро
+    geometry = segment_geometry([0, 0], [-10, 0], [0, 30], [10, 40], [-1.0, 0.0])
+    assert [float(v) for v in geometry['length']] == pytest.approx([10 * pi, 50])
+    assert [float(v) for v in geometry['radius']] == [10, 0]
+    assert [float(v) for v in geometry['min_x']] == pytest.approx([-10, 0])
+    assert [float(v) for v in geometry['max_x']] == pytest.approx([0, 30])
+    assert [float(v) for v in geometry['min_y']] == pytest.approx([-10, 0])
+
+
+def test_segment_geometry_without_numpy(monkeypatch):
+    rng = random.Random(30)
+    columns = [[rng.uniform(-100, 100) for _ in range(50)] for _ in range(4)]
+    columns.append([rng.choice([0.0, rng.uniform(-3, 3)]) for _ in range(50)])
+    expected = {key: [float(v) for v in values] for key, values in segment_geometry(*columns).items()}
+    monkeypatch.setattr(contour, 'np', None)
+    plain = segment_geometry(*columns)
+    for key, values in expected.items():
+        assert plain[key] == pytest.approx(values), key
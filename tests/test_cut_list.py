@@ -0,0 +1,58 @@
+import random
+import time
+
+import pytest
+
+from cut_list import KERF, SHEET_SIZE, TRIM, build_cut_list, pack_panels
+
+
+def _panels(count, seed=33):
+    rng = random.Random(seed)
+    return [{'name': str(i), 'size': {'width': round(rng.uniform(50, 1200), 1),
+                                      'height': round(rng.uniform(50, 700), 1), 'thickness': 16.0}}
+            for i in range(count)]
+
+
+def _assert_valid(result, panels):
+    sizes = {panel['name']: (panel['size']['width'], panel['size']['height']) for panel in panels}
+    placed = [p for sheet in result['sheets'] for p in sheet['placements']]
+    assert sorted(p['name'] for p in placed) + result['oversize'] == sorted(sizes)
+
+    for sheet in result['sheets']:
+        rects = sheet['placements']
+        for p in rects:
+            w, h = sizes[p['name']]
+            assert (p['width'], p['height']) == ((h, w) if p['rotated'] else (w, h))
+            assert p['x'] >= TRIM and p['y'] >= TRIM
+            assert p['x'] + p['width'] <= SHEET_SIZE[0] - TRIM + 0.1
+            assert p['y'] + p['height'] <= SHEET_SIZE[1] - TRIM + 0.1
+        # между деталями остается пропил
+        for i, a in enumerate(rects):
+            for b in rects[i + 1:]:
+                assert (a['x'] + a['width'] + KERF <= b['x'] + 0.1 or b['x'] + b['width'] + KERF <= a['x'] + 0.1
+                        or a['y'] + a['height'] + KERF <= b['y'] + 0.1
+                        or b['y'] + b['height'] + KERF <= a['y'] + 0.1), (a, b)
+
+
+@pytest.mark.parametrize('time_budget', [0.0, 0.2])
+def test_packing_is_valid(time_budget):
+    panels = _panels(200) + [{'name': 'big', 'size': {'width': 3000.0, 'height': 100.0, 'thickness': 16.0}}]
+    result = pack_panels(panels, time_budget=time_budget)
+    _assert_valid(result, panels)
+    assert result['oversize'] == ['big']
+
+
+def test_time_budget_interrupts_first_order():
+    panels = _panels(500)
+    started = time.perf_counter()
+    result = pack_panels(panels, time_budget=0.0)
+    assert time.perf_counter() - started < 0.5
+    _assert_valid(result, panels)
+
+
+def test_cut_list_groups_samples(sample_panels):
+    panels = [panel for items in sample_panels.values() for panel in items]
+    cut_list = build_cut_list(panels)
+    assert sum(group['panels'] for group in cut_list) == len(panels)
+    for group in cut_list:
+        assert group['sheet_count'] >= 1 and 0 < group['utilization'] <= 1
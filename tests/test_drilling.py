@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from drilling import HOME, _path_length, build_program, nearest_neighbour_order, two_opt
+
+
+def _points(count, seed):
+    rng = random.Random(seed)
+    return [(round(rng.uniform(10, 2000), 1), round(rng.uniform(10, 800), 1)) for _ in range(count)]
+
+
+@pytest.mark.parametrize('count', [0, 1, 2, 3, 10, 200])
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_two_opt_never_longer(count, seed):
+    points = _points(count, seed)
+    shuffled = list(range(count))
+    random.Random(seed).shuffle(shuffled)
+    for order in (list(range(count)), shuffled, nearest_neighbour_order(points, HOME)):
+        improved = two_opt(points, list(order), HOME)
+        assert sorted(improved) == list(range(count))  # каждая точка ровно один раз
+        assert (_path_length([points[i] for i in improved], HOME)
+                <= _path_length([points[i] for i in order], HOME) + 1e-6)
+
+
+def test_duplicate_points_visited_once():
+    points = [(10.0, 10.0)] * 3 + [(50.0, 10.0), (10.0, 10.0)]
+    order = two_opt(points, nearest_neighbour_order(points, HOME), HOME)
+    assert sorted(order) == list(range(len(points)))
+
+
+def test_program_visits_every_hole_once():
+    rng = random.Random(34)
+    holes = [{'center': point, 'diameter': rng.choice((5.0, 8.0)), 'depth': 13.0} for point in _points(300, 34)]
+    grooves = [{'start': (0.0, 16.0), 'end': (600.0, 16.0), 'width': 4.0, 'depth': 8.0}]
+    program = build_program(holes, grooves)
+    drilled = sorted(point for op in program['operations'] if op['type'] == 'drill' for point in op['points'])
+    assert drilled == sorted(hole['center'] for hole in holes)
+    assert [op['type'] for op in program['operations']] == ['drill', 'drill', 'groove']
+    assert program['travel'] <= program['baseline_travel']
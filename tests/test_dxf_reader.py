@@ -0,0 +1,74 @@
+import ezdxf
+import pytest
+
+from cut_list import build_cut_list
+from dxf_reader import DxfReader
+from edge_banding import BandingTotals
+from fingerprint import canonical_panel
+
+
+def _write_panel(path, thickness_block, labels=()):
+    """Панель 100x50 с одним сквозным и одним глухим отверстием внутри блока толщины"""
+    doc = ezdxf.new('R12')
+    group = doc.blocks.new('GROUP1_1')
+    for start, end in (((0, 0), (-100, 0)), ((-100, 0), (-100, 50)), ((-100, 50), (0, 50)), ((0, 50), (0, 0))):
+        group.add_line(start, end, dxfattribs={'layer': 'ABF_CUTTINGLINES'})
+    group.add_circle((-20, 25), 4, dxfattribs={'layer': 'D8_0_DEPTHF'})
+    group.add_circle((-60, 25), 2.5, dxfattribs={'layer': 'D5_0_DEPTH8_0'})
+    doc.blocks.new('_______1').add_blockref('GROUP1_1', (0, 0))
+    doc.blocks.new(thickness_block).add_blockref('_______1', (0, 0))
+    doc.modelspace().add_blockref(thickness_block, (0, 0))
+    for i, text in enumerate(labels):
+        doc.modelspace().add_text(text, dxfattribs={'layer': 'ABF_LABEL', 'insert': (-50, 30 - 10 * i)})
+    doc.saveas(path)
+
+
+@pytest.mark.parametrize('block, thickness', [('___16__THICKNESS_16', 16.0), ('_4__THICKNESS_4', 4.0)])
+def test_through_hole_depth_is_panel_thickness(tmp_path, block, thickness):
+    path = str(tmp_path / 'panel.dxf')
+    _write_panel(path, block)
+    [panel] = DxfReader(path).get_panels_data(['size', 'holes'])
+    assert panel['size']['thickness'] == thickness
+    depths = {hole['diameter']: hole['depth'] for hole in panel['holes']}
+    assert depths == {8.0: thickness, 5.0: 8.0}
+
+
+def test_material_from_label(tmp_path):
+    path = str(tmp_path / 'panel.dxf')
+    _write_panel(path, '___16__THICKNESS_16', labels=('Дно', 'ЛДСП Белый 16'))
+    [panel] = DxfReader(path).get_panels_data()
+    assert panel['label']['name'] == 'Дно'
+    assert panel['material'] == 'ЛДСП Белый 16'
+
+    # потребители материала видят его на верхнем уровне
+    assert build_cut_list([panel])[0]['material'] == 'ЛДСП Белый 16'
+    totals = BandingTotals()
+    totals.add_panel(dict(panel, edges=[{'thickness': 1.0, 'length': 100.0}]))
+    assert totals.report()[0]['material'] == 'ЛДСП Белый 16'
+    assert canonical_panel(panel)[0] == 'ЛДСП Белый 16'
+
+
+def _write_polyline_panel(path, points, closed):
+    doc = ezdxf.new('R12')
+    group = doc.blocks.new('GROUP1_1')
+    group.add_polyline2d(points, close=closed, dxfattribs={'layer': 'ABF_CUTTINGLINES'})
+    if not closed:
+        group.add_line(points[-1], points[0], dxfattribs={'layer': 'ABF_CUTTINGLINES'})
+    doc.blocks.new('_______1').add_blockref('GROUP1_1', (0, 0))
+    doc.blocks.new('___16__THICKNESS_16').add_blockref('_______1', (0, 0))
+    doc.modelspace().add_blockref('___16__THICKNESS_16', (0, 0))
+    doc.saveas(path)
+
+
+@pytest.mark.parametrize('points, closed', [
+    ([(0, 0), (-100, 0), (-100, 50), (0, 50)], True),
+    ([(0, 0), (-100, 0), (-100, 50), (0, 50), (0, 0)], True),  # замыкающая вершина повторяет первую
+    ([(0, 0), (-100, 0), (-100, 50), (0, 50)], False),  # открытая полилиния, замкнута отрезком
+])
+def test_polyline_contour_edges(tmp_path, points, closed):
+    path = str(tmp_path / 'panel.dxf')
+    _write_polyline_panel(path, points, closed)
+    [panel] = DxfReader(path).get_panels_data(['size', 'contour'])
+    assert (panel['size']['width'], panel['size']['height']) == (100.0, 50.0)
+    assert len(panel['contour']) == 4
+    assert all(line['start'] != line['end'] for line in panel['contour'])
@@ -0,0 +1,29 @@
+from math import pi
+
+from edge_banding import BandingTotals, match_edges
+
+
+def _line(start, end, bulge=0):
+    return {'start': start, 'end': end, 'bulge': bulge}
+
+
+def test_arc_edge_length_and_side():
+    # прямоугольник 100x50 мм, правая сторона - полуокружность наружу (до x = 125 мм)
+    contour = [
+        dict(_line((0, 0), (100000, 0)), length=100000),
+        dict(_line((100000, 0), (100000, 50000), 1.0), length=round(pi * 25000)),
+        dict(_line((100000, 50000), (0, 50000)), length=100000),
+        dict(_line((0, 50000), (0, 0)), length=50000),
+    ]
+    triangles = [{'tip': (120000, 25000)}, {'tip': (50000, 2000)}]
+    edges = {edge['side']: edge for edge in match_edges(triangles, contour, [])}
+
+    # ребро дуги лежит внутри габарита по x, поэтому это не правая сторона
+    assert set(edges) == {'contour', 'bottom'}
+    assert edges['contour']['length'] == 78540
+    assert edges['bottom']['length'] == 100000
+
+    totals = BandingTotals()
+    totals.add_panel({'material': 'ЛДСП', 'edges': [dict(edge, thickness=0.8, length=edge['length'] / 1000)
+                                                    for edge in edges.values()]})
+    assert totals.report() == [{'material': 'ЛДСП', 'thickness': 0.8, 'meters': 0.179}]
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from fingerprint import panel_fingerprint
+
+
+def _moved(point, dx, dy):
+    if isinstance(point, dict):
+        return {'x': point['x'] + dx, 'y': point['y'] + dy}
+    return point[0] + dx, point[1] + dy
+
+
+def _translate(panel, dx, dy):
+    """Та же панель, целиком сдвинутая на (dx, dy) мм"""
+    return dict(
+        panel,
+        contour_origin=_moved(panel['contour_origin'], dx, dy),
+        holes=[dict(hole, center=_moved(hole['center'], dx, dy)) for hole in panel['holes']],
+        grooves=[dict(groove, start=_moved(groove['start'], dx, dy), end=_moved(groove['end'], dx, dy))
+                 for groove in panel['grooves']],
+        edges=[dict(edge, coordinates={key: _moved(value, dx, dy) for key, value in edge['coordinates'].items()})
+               for edge in panel['edges']],
+        cutouts=[dict(cutout, position=_moved(cutout['position'], dx, dy),
+                      points=[_moved(point, dx, dy) for point in cutout['points']])
+                 for cutout in panel['cutouts']],
+    )
+
+
+def test_fingerprint_survives_translation_near_rounding_boundary():
+    panel = {'size': {'width': 200.0, 'height': 100.0, 'thickness': 16.0}, 'contour_origin': (0.0, 0.0),
+             'holes': [{'center': (99.995, 50.005), 'diameter': 8.0, 'depth': 16.0}],
+             'grooves': [], 'edges': [], 'cutouts': []}
+    assert panel_fingerprint(_translate(panel, 1000.0, 0.0)) == panel_fingerprint(panel)
+
+
+def test_fingerprint_survives_translation(sample_panels):
+    rng = random.Random(35)
+    panels = [panel for panels in sample_panels.values() for panel in panels]
+    for panel in panels:
+        fingerprint = panel_fingerprint(panel)
+        for _ in range(5):
+            # координаты читателя - целые микрометры, сдвиг тоже
+            dx, dy = (rng.randint(-5 * 10 ** 6, 5 * 10 ** 6) / 1000 for _ in range(2))
+            assert panel_fingerprint(_translate(panel, dx, dy)) == fingerprint, (panel['name'], dx, dy)
+
+
+@pytest.mark.parametrize('change', [
+    lambda panel: panel['holes'].append({'center': (10.0, 10.0), 'diameter': 5.0, 'depth': 8.0}),
+    lambda panel: panel['size'].update(thickness=panel['size']['thickness'] + 0.001),
+])
+def test_fingerprint_sees_geometry_changes(sample_panels, change):
+    panel = sample_panels['panel2.dxf'][0]
+    changed = dict(panel, holes=list(panel['holes']), size=dict(panel['size']))
+    change(changed)
+    assert panel_fingerprint(changed) != panel_fingerprint(panel)
@@ -0,0 +1,48 @@
+import os
+import xml.etree.ElementTree as ET
+
+import image_creator
+from dxf_reader import DxfReader
+from image_creator import FIELDS, create_panel_image, render_batch
+
+from conftest import ROOT
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def _panels(*names):
+    return [panel for name in names for panel in DxfReader(f'{ROOT}/{name}').get_panels_data(FIELDS)]
+
+
+def test_svg_is_valid():
+    for panel in _panels('panel2.dxf', 'panel7_cutout.dxf', 'panel4.dxf'):
+        root = ET.fromstring(create_panel_image(panel, 'svg'))
+        assert root.tag == f'{SVG}svg'
+        assert len(root.findall(f'.//{SVG}path')) == 1
+        assert len(root.findall(f'.//{SVG}circle')) == len(panel['holes'])
+        assert len(root.findall(f'.//{SVG}line')) == len(panel['edges']) + len(panel['grooves'])
+
+
+def test_png_signature():
+    [panel] = _panels('panel2.dxf')
+    assert create_panel_image(panel, 'png', 64).startswith(b'\x89PNG\r\n\x1a\n')
+
+
+def test_cache_hit(tmp_path, monkeypatch):
+    panels = _panels('panel2.dxf', 'panel3.dxf')
+    panels.append(dict(panels[0], name='копия'))  # та же геометрия под другим именем
+    cache = str(tmp_path)
+
+    first = render_batch(panels, cache, processes=1)
+    assert not any(result['cached'] for result in first)
+    assert first[-1]['path'] == first[0]['path']
+    paths = sorted({result['path'] for result in first})
+    assert sorted(os.path.join(cache, name) for name in os.listdir(cache)) == paths  # без временных файлов
+
+    def fail(*args):
+        raise AssertionError('миниатюра из кеша перерисована')
+
+    monkeypatch.setattr(image_creator, 'create_panel_image', fail)
+    second = render_batch(panels, cache, processes=1)
+    assert all(result['cached'] for result in second)
+    assert [result['path'] for result in second] == [result['path'] for result in first]
@@ -0,0 +1,99 @@
+import pytest
+
+from job_queue import QueueBackend, SqliteBackend, Worker
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SqliteBackend(str(tmp_path / 'queue.db'), max_attempts=2)
+    yield backend
+    backend.close()
+
+
+def _status(backend, job_id):
+    return backend.conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+
+def test_incomplete_backend_is_rejected():
+    class Partial(QueueBackend):
+        def enqueue(self, paths):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_lease_is_exclusive_and_complete(backend):
+    assert backend.enqueue(['a.dxf', 'b.dxf']) == 2
+    first = backend.lease('w1', 60)
+    second = backend.lease('w2', 60)
+    assert (first['path'], second['path']) == ('a.dxf', 'b.dxf')
+    assert first['attempts'] == 1
+    assert backend.lease('w3', 60) is None
+
+    assert backend.heartbeat(first['job_id'], 'w1', 60)
+    assert not backend.heartbeat(first['job_id'], 'w2', 60)
+    backend.complete(first['job_id'], 'w1', {'panels': 3})
+    assert _status(backend, first['job_id']) == 'done'
+    assert not backend.heartbeat(first['job_id'], 'w1', 60)
+
+
+def test_expired_lease_is_reissued_then_failed(backend):
+    backend.enqueue(['a.dxf'])
+    job = backend.lease('w1', -1)  # аренда уже истекла
+    again = backend.lease('w2', -1)
+    assert again['job_id'] == job['job_id'] and again['attempts'] == 2
+
+    # попытки кончились - задание не выдается, а помечается failed
+    assert backend.lease('w3', 60) is None
+    assert _status(backend, job['job_id']) == 'failed'
+    assert backend.stats()['jobs'] == {'failed': 1}
+
+
+def test_late_worker_cannot_close_reissued_job(backend):
+    backend.enqueue(['a.dxf'])
+    job = backend.lease('w1', -1)
+    backend.lease('w2', 60)
+
+    backend.complete(job['job_id'], 'w1', {'panels': 1})
+    backend.fail(job['job_id'], 'w1', 'late')
+    assert _status(backend, job['job_id']) == 'leased'
+
+
+def test_late_completion_does_not_revive_failed_job(backend):
+    backend.enqueue(['a.dxf'])
+    job = backend.lease('w1', 60)
+    backend.fail(job['job_id'], 'w1', 'budget', retry=False)
+    assert _status(backend, job['job_id']) == 'failed'
+
+    backend.complete(job['job_id'], 'w1', {'panels': 1})
+    assert _status(backend, job['job_id']) == 'failed'
+
+
+def test_fail_retries_until_max_attempts(backend):
+    backend.enqueue(['a.dxf'])
+    job = backend.lease('w1', 60)
+    backend.fail(job['job_id'], 'w1', 'boom')
+    assert _status(backend, job['job_id']) == 'queued'
+
+    job = backend.lease('w1', 60)
+    assert job['attempts'] == 2
+    backend.fail(job['job_id'], 'w1', 'boom')
+    assert _status(backend, job['job_id']) == 'failed'
+
+
+def test_worker_records_results_and_metrics(backend):
+    backend.enqueue(['good.dxf', 'bad.dxf'])
+
+    def handler(path):
+        if path == 'bad.dxf':
+            raise ValueError('нет контура')
+        return {'panels': 2}
+
+    worker = Worker(backend, handler, worker_id='w1', lease_seconds=60)
+    worker.run(once=True)
+
+    stats = backend.stats()
+    assert stats['jobs'] == {'done': 1, 'failed': 1}
+    assert stats['workers']['w1']['done'] == 1
+    assert stats['workers']['w1']['failed'] == 2
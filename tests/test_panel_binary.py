@@ -0,0 +1,76 @@
+import pytest
+
+import panel_binary
+from dxf_reader import DxfReader
+from panel_binary import CUTOUT_TYPES, FIELDS, PanelFile, write_panels
+
+from conftest import ROOT
+
+USE_NUMPY = [pytest.param(True, marks=pytest.mark.skipif(panel_binary.np is None, reason='нет numpy')), False]
+
+
+def _stored(panel):
+    """Поля панели DxfReader, которые хранит бинарный формат"""
+    return {
+        'size': panel['size'],
+        'holes': [{key: hole[key] for key in ('center', 'diameter', 'depth')} for hole in panel['holes']],
+        'grooves': [{key: groove[key] for key in ('start', 'end', 'width', 'depth')} for groove in panel['grooves']],
+        'edges': [{key: edge[key] for key in ('thickness', 'side', 'coordinates')} for edge in panel['edges']],
+        'cutouts': [{key: cutout[key] for key in ('type', 'position', 'size')} for cutout in panel['cutouts']],
+    }
+
+
+def _synthetic_panel():
+    """Панель со всеми секциями и всеми типами вырезов"""
+    return {
+        'size': {'width': 600.5, 'height': 400.25, 'thickness': 16.0},
+        'edges': [
+            {'thickness': 0.4, 'side': 'left', 'coordinates': {'start': (0.0, 0.0), 'end': (0.0, 400.25)}},
+            {'thickness': 2.0, 'side': 'contour', 'coordinates': {'start': (10.125, 5.0), 'end': (20.0, 5.5)}},
+        ],
+        'holes': [
+            {'center': (37.0, 32.0), 'diameter': 5.0, 'depth': 12.5},
+            {'center': (100.001, 9.0), 'diameter': 8.0, 'depth': 16.0},
+        ],
+        'grooves': [
+            {'start': (0.0, 16.0), 'end': (600.5, 16.0), 'width': 4.0, 'depth': 8.0},
+        ],
+        'cutouts': [
+            {'type': kind, 'position': {'x': 1.0 + i, 'y': 2.5}, 'size': {'x': 50.0, 'y': 25.125}}
+            for i, kind in enumerate(CUTOUT_TYPES)
+        ],
+    }
+
+
+@pytest.mark.parametrize('use_numpy', USE_NUMPY)
+def test_round_trip(sample_panels, tmp_path, use_numpy):
+    panels = [_stored(panel) for items in sample_panels.values() for panel in items]
+    panels.append(_synthetic_panel())
+    path = str(tmp_path / 'panels.abfp')
+    write_panels(path, panels)
+
+    with PanelFile(path, use_numpy=use_numpy) as panel_file:
+        assert len(panel_file) == len(panels)
+        restored = [view.to_dict() for view in panel_file]
+    assert restored == panels
+
+
+@pytest.mark.parametrize('use_numpy', USE_NUMPY)
+def test_reader_drillings_survive(tmp_path, use_numpy):
+    [panel] = DxfReader(f'{ROOT}/panel2.dxf').read(FIELDS)
+    assert len(panel['holes']) == 5 and len(panel['grooves']) == 8
+    path = str(tmp_path / 'panel2.abfp')
+    write_panels(path, [panel])
+
+    with PanelFile(path, use_numpy=use_numpy) as panel_file:
+        view = panel_file[0]
+        assert (len(view.holes), len(view.grooves)) == (5, 8)
+        assert view.to_dict() == _stored(panel)
+        del view
+
+
+def test_unknown_cutout_type(tmp_path):
+    panel = _synthetic_panel()
+    panel['cutouts'][0]['type'] = 'unknown'
+    with pytest.raises(ValueError, match='unknown'):
+        write_panels(str(tmp_path / 'panels.abfp'), [panel])
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from panel_builder import PanelBuilder
+from panel_serializer import PanelSerializer
+
+
+def _reference(panel, compact):
+    if compact:
+        return json.dumps(PanelBuilder(panel).build(), separators=(',', ':'), ensure_ascii=False)
+    return json.dumps(PanelBuilder(panel).build())
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_dumps_matches_json(sample_panels, compact):
+    serializer = PanelSerializer(compact=compact)
+    for name, panels in sample_panels.items():
+        for panel in panels:
+            assert serializer.dumps(panel).decode('utf-8') == _reference(panel, compact), (name, panel['name'])
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_dumps_many_matches_json(sample_panels, compact):
+    panels = [panel for items in sample_panels.values() for panel in items]
+    expected = json.dumps([PanelBuilder(panel).build() for panel in panels],
+                          **({'separators': (',', ':'), 'ensure_ascii': False} if compact else {}))
+    assert PanelSerializer(compact=compact).dumps_many(panels).decode('utf-8') == expected
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_dumps_special_floats(compact):
+    panel = {
+        'size': {'width': float('nan'), 'height': 1e-07, 'thickness': float('inf')},
+        'edges': [{'side': 'top', 'thickness': 1e+16,
+                   'coordinates': {'start': (-2.5e-05, float('-inf')), 'end': (1e22, 0.0)}}],
+        'cutouts': [{'type': 'L', 'position': {'x': float('nan'), 'y': 3e-9}, 'size': {'x': 1.0, 'y': 2e+20}}],
+    }
+    assert PanelSerializer(compact=compact).dumps(panel).decode('utf-8') == _reference(panel, compact)
@@ -0,0 +1,66 @@
+from panel_validator import PanelValidator, validate_file
+
+from conftest import ROOT
+
+SIZE = {'width': 200.0, 'height': 100.0, 'thickness': 16.0}
+# L-вырез в левом верхнем углу со скругленным внутренним углом R10:
+# точка (29.5, 60.5) лежит в габарите выреза, но вне его контура
+L_CUTOUT = {
+    'type': 'L', 'edge': 'left-top',
+    'position': {'x': 0.0, 'y': 60.0}, 'size': {'x': 30.0, 'y': 40.0},
+    'points': [(0.0, 60.0), (20.0, 60.0), (30.0, 70.0), (30.0, 100.0), (0.0, 100.0)],
+    'bulges': [0.0, 0.41421356, 0.0, 0.0, 0.0],
+}
+
+
+def _hole(x, y, diameter=1.0):
+    return {'center': (x, y), 'diameter': diameter, 'depth': 10.0}
+
+
+def _violations(panel, **kwargs):
+    return PanelValidator(dict({'size': SIZE}, **panel), **kwargs).validate()
+
+
+def test_panel2_groove_outline_is_not_an_overlap():
+    # пазы panel2 нарисованы контуром прямоугольника 4 мм, а не осевыми линиями
+    assert validate_file(f'{ROOT}/panel2.dxf') == {'_______2': []}
+
+
+def test_hole_in_cut_away_corner_of_l_cutout():
+    assert _violations({'holes': [_hole(29.5, 60.5)], 'cutouts': [L_CUTOUT]}) == []
+
+
+def test_hole_inside_cutout():
+    [violation] = _violations({'holes': [_hole(10.0, 80.0)], 'cutouts': [L_CUTOUT]})
+    assert violation['type'] == 'overlap'
+    assert sorted(violation['features']) == [('cutout', 0), ('hole', 0)]
+
+
+def test_cutout_without_points_falls_back_to_rect():
+    cutout = {key: L_CUTOUT[key] for key in ('type', 'edge', 'position', 'size')}
+    [violation] = _violations({'holes': [_hole(29.5, 60.5)], 'cutouts': [cutout]})
+    assert violation['type'] == 'overlap'
+
+
+def test_banding_is_counted_once():
+    edge = {'side': 'left', 'thickness': 2.0, 'coordinates': {'start': (0.0, 0.0), 'end': (0.0, 100.0)}}
+    # отступ 5 от края реза выдержан; толщина кромки к нему не прибавляется
+    assert _violations({'holes': [_hole(9.0, 50.0, 8.0)], 'edges': [edge]}, min_edge_clearance=5.0) == []
+    # кромка учитывается как полоса: отверстие, заходящее на нее, - перекрытие
+    [violation] = _violations({'holes': [_hole(3.0, 50.0, 4.0)], 'edges': [edge]})
+    assert violation['type'] == 'overlap'
+
+
+def test_hole_groove_overlap():
+    grooves = [{'start': (0.0, 20.0), 'end': (200.0, 20.0), 'width': 4.0, 'depth': 8.0}]
+    [violation] = _violations({'holes': [_hole(50.0, 23.0, 4.0)], 'grooves': grooves})
+    assert violation['type'] == 'overlap' and violation['distance'] == -1.0
+
+
+def test_hole_inside_groove_outline():
+    corners = [(0.0, 16.0), (200.0, 16.0), (200.0, 20.0), (0.0, 20.0)]
+    grooves = [{'start': a, 'end': b, 'width': 8.0, 'depth': 8.0}
+               for a, b in zip(corners, corners[1:] + corners[:1])]
+    assert _violations({'holes': [_hole(50.0, 25.0, 4.0)], 'grooves': grooves}) == []
+    [violation] = _violations({'holes': [_hole(50.0, 18.0, 2.0)], 'grooves': grooves})
+    assert violation['type'] == 'overlap'
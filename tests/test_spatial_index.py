@@ -0,0 +1,38 @@
+import random
+from math import hypot
+
+from drilling import _order_grooves
+from spatial_index import UniformGrid
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(7)
+    points = {i: (rng.uniform(0, 1000), rng.uniform(0, 500)) for i in range(500)}
+    grid = UniformGrid(25.0)
+    for key, (x, y) in points.items():
+        grid.insert(key, (x, y, x, y))
+
+    for step in range(450):
+        x, y = rng.uniform(-200, 1200), rng.uniform(-200, 700)
+        expected = min(hypot(p[0] - x, p[1] - y) for p in points.values())
+        found = grid.nearest(x, y)
+        assert hypot(points[found][0] - x, points[found][1] - y) == expected
+        if step % 2:  # сетка пустеет, как при жадном обходе
+            grid.remove(found)
+            del points[found]
+
+
+def test_order_grooves_matches_greedy():
+    rng = random.Random(3)
+    grooves = [((x, y), (x + rng.uniform(10, 300), y)) for x, y in
+               ((rng.uniform(0, 2000), rng.uniform(0, 1000)) for _ in range(200))]
+
+    remaining, current, expected = list(range(len(grooves))), (0.0, 0.0), []
+    while remaining:
+        _, i, flip = min((hypot(current[0] - grooves[i][f][0], current[1] - grooves[i][f][1]), i, f)
+                         for i in remaining for f in (0, 1))
+        remaining.remove(i)
+        a, b = grooves[i] if not flip else grooves[i][::-1]
+        expected.append((a, b))
+        current = b
+    assert _order_grooves(grooves, (0.0, 0.0)) == expected